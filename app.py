@@ -5,12 +5,21 @@ from dotenv import load_dotenv
 from src.browser import Browser
 from src.models.gemini import GeminiProvider
 from src.models.groq import GroqProvider
+from src.models.cache import CachedModel
+from src.models.router import RoutedModel
 from src.agent.agent import Agent
 load_dotenv()
 
 async def main():
     gemini_model = GeminiProvider(api_key=os.getenv('GOOGLE_API_KEY'))
     # groq_model = GroqProvider(api_key=os.getenv('GROQ_API_KEY'))
+    # Re-runs of the same task are answered from .cache/llm, use mode='replay' to run offline
+    # gemini_model = CachedModel(gemini_model, mode='record')
+    # Routine planning on a fast model, extraction and failed steps on a strong one
+    # gemini_model = RoutedModel(
+    #     fast=GeminiProvider(api_key=os.getenv('GOOGLE_API_KEY'), model='gemini-2.5-flash-lite'),
+    #     strong=gemini_model
+    # )
 
     schema = {
         "type": "object",
@@ -0,0 +1,125 @@
+from src.models import BaseModel, Message, to_message_dicts
+from src.tracing import start_span, record_llm_usage
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import json
+
+class _Attr(dict):
+    """A dict that also allows attribute access, like litellm's ModelResponse."""
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self[key]
+        except KeyError as e:
+            raise AttributeError(key) from e
+
+def make_response(content: str, prompt_tokens: int = 0) -> _Attr:
+    """
+    Wraps content into a completion response supporting both
+    `response.choices[0].message.content` and `response['choices'][0]['message']['content']`.
+    """
+
+    completion_tokens = max(1, len(content) // 4)
+    return _Attr(
+        choices = [_Attr(message = _Attr(role = 'assistant', content = content), finish_reason = 'stop', index = 0)],
+        usage = _Attr(
+            prompt_tokens = prompt_tokens,
+            completion_tokens = completion_tokens,
+            total_tokens = prompt_tokens + completion_tokens
+        ),
+        model = 'scripted'
+    )
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token estimate (4 characters per token), good enough to compare runs."""
+    return sum(len(str(message.get('content', ''))) for message in messages) // 4
+
+def extract_items(markdown: str, limit: int = 50) -> List[Dict[str, str]]:
+    """
+    Deterministic stand-in for LLM extraction: every heading or table row becomes an item.
+    """
+
+    items = []
+    for line in markdown.splitlines():
+        line = line.strip()
+        if line.startswith('#') or (line.startswith('|') and not set(line) <= set('|- ')):
+            text = line.strip('#| ').replace(' | ', ', ')
+            if text:
+                items.append({'text': text})
+        if len(items) >= limit:
+            break
+    return items
+
+class ScriptedModel(BaseModel):
+    """
+    Deterministic stand-in provider for benchmarks.
+
+    Planner calls are answered from a script of `{tool_name, tool_args, thought}` steps, scraper
+    calls with items derived from the markdown they receive, and output calls with a fixed report.
+    Every call records the prompt size so runs can be compared without a real provider.
+
+    Args:
+        planner_steps (List[Dict[str, Any]]): Responses returned to the planner, in order.
+            Once exhausted, the planner receives `finish`.
+        latency (float): Simulated model latency in seconds
+        responder (Optional[Callable]): Overrides the built-in responses, receives the messages and
+            returns the response content
+    """
+
+    def __init__(
+            self,
+            planner_steps: Optional[List[Dict[str, Any]]] = None,
+            latency: float = 0.0,
+            responder: Optional[Callable[[List[Dict[str, Any]]], str]] = None
+        ) -> None:
+        self.planner_steps = list(planner_steps or [])
+        self.latency = latency
+        self.responder = responder
+        self.model = 'scripted'
+        self._step = 0
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.prompt_bytes = 0
+
+    def reset(self) -> None:
+        self._step = 0
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.prompt_bytes = 0
+
+    def _respond(self, messages: List[Dict[str, Any]]) -> str:
+        if self.responder:
+            return self.responder(messages)
+
+        system_prompt = str(messages[0].get('content', '')) if messages else ''
+        if 'Final Answering AI' in system_prompt:
+            markdown = str(messages[-1].get('content', ''))
+            return json.dumps({'response': extract_items(markdown)})
+        if 'Final Reporting AI' in system_prompt:
+            return json.dumps({'response': 'Task completed.'})
+
+        if self._step < len(self.planner_steps):
+            step = self.planner_steps[self._step]
+            self._step += 1
+        else:
+            step = {'tool_name': 'finish', 'tool_args': {}, 'thought': 'Script exhausted.'}
+        return json.dumps({'observation': '', **step})
+
+    async def generate(self, messages: List[Message], **kwargs) -> Any:
+        messages = to_message_dicts(messages)
+        prompt_tokens = estimate_tokens(messages)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.prompt_bytes += sum(len(str(message.get('content', '')).encode('utf-8')) for message in messages)
+
+        with start_span('llm.generate', **{'llm.model': self.model}) as span:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            response = make_response(self._respond(messages), prompt_tokens)
+            record_llm_usage(span, messages, response)
+        return response
+
+    def configure(self, **kwargs) -> None:
+        for key, value in kwargs.items():
+            if value is not None:
+                setattr(self, key, value)
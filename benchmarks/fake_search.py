@@ -0,0 +1,60 @@
+from src.search import SearchBackend, SearchResult
+from typing import List, Optional
+import asyncio
+import re
+
+class FixtureSearchBackend(SearchBackend):
+    """
+    Deterministic stand-in search backend for benchmarks.
+
+    Ranks a fixed corpus by the number of query terms found in the title and snippet of each
+    result, so runs are reproducible and never leave the machine.
+
+    Args:
+        corpus (List[SearchResult]): The documents that can be found, usually pages of the fixture server
+        latency (float): Simulated search latency in seconds
+    """
+
+    name = 'fixture'
+
+    def __init__(self, corpus: List[SearchResult], latency: float = 0.0) -> None:
+        self.corpus = list(corpus)
+        self.latency = latency
+        self.calls = 0
+        self.queries: List[str] = []
+
+    @staticmethod
+    def _terms(text: str) -> List[str]:
+        return re.findall(r'\w+', text.lower())
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        self.calls += 1
+        self.queries.append(query)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        terms = set(self._terms(query))
+        scored = []
+        for index, result in enumerate(self.corpus):
+            words = self._terms(f"{result['title']} {result['snippet']}")
+            score = sum(1 for word in words if word in terms)
+            if score:
+                scored.append((-score, index, result))
+        return [result for _, _, result in sorted(scored, key = lambda row: row[:2])[:max_results]]
+
+def fixture_corpus(base_url: str, pages: Optional[List[str]] = None) -> List[SearchResult]:
+    """
+    Builds a search corpus out of the fixture site served at `base_url`.
+    """
+
+    pages = pages or ['big_table.html?rows=200', 'heavy_spa.html', 'infinite_scroll.html']
+    titles = {
+        'big_table': ('Product catalogue', 'Products with category, price and rating'),
+        'heavy_spa': ('Dashboard application', 'A client-side rendered dashboard with product widgets'),
+        'infinite_scroll': ('Product feed', 'An endless feed of products loaded while scrolling')
+    }
+    corpus = []
+    for page in pages:
+        title, snippet = titles.get(page.split('.')[0], (page, page))
+        corpus.append(SearchResult(title = title, url = f"{base_url.rstrip('/')}/{page}", snippet = snippet))
+    return corpus
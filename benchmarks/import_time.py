@@ -0,0 +1,130 @@
+"""
+Import-time benchmark for the agent entry points.
+
+Imports every module in a fresh interpreter with `-X importtime`, reports the cumulative import
+time and the slowest dependencies, and fails when a module exceeds its budget or loads one of
+the heavy optional dependencies that must only be imported when they are used.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --modules src.agent.agent --repeat 5 --top 15
+    python -m benchmarks.import_time --scale 2 --output benchmarks/results/import_time.json
+"""
+
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+# Cumulative import time allowed per module, in milliseconds
+BUDGETS_MS = {
+    'src.agent.agent': 2000,
+    'src.models.gemini': 150,
+    'src.models.groq': 150,
+    'src.browser': 150,
+    'src.tools.register': 150
+}
+
+# Imported by a module only when the feature needing them runs
+LAZY_DEPENDENCIES = [
+    'litellm', 'groq', 'ddgs', 'bs4', 'markdownify',
+    'playwright', 'playwright_stealth', 'fake_useragent', 'httpx', 'numpy'
+]
+
+# Dependencies that are loaded eagerly by design, e.g. langgraph imports httpx through langsmith
+ALLOWED_DEPENDENCIES = {
+    'src.agent.agent': {'httpx'}
+}
+
+def measure(module: str) -> List[Tuple[str, int, int]]:
+    """
+    Imports the module in a new interpreter and parses the `-X importtime` report.
+
+    Returns:
+        List[Tuple[str, int, int]]: The imported modules with their self and cumulative time in microseconds
+    """
+
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd = ROOT_DIR,
+        capture_output = True,
+        text = True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f'Importing {module} failed:\n{process.stderr[-2000:]}')
+
+    rows = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def bench_module(module: str, repeat: int, top: int) -> Dict[str, object]:
+    runs = [measure(module) for _ in range(repeat)]
+    # The fastest run is the least disturbed by the machine
+    rows = min(runs, key = lambda rows: next((cumulative for name, _, cumulative in rows if name == module), 0))
+
+    total_us = next((cumulative for name, _, cumulative in rows if name == module), 0)
+    imported = {name for name, _, _ in rows}
+    lazy_loaded = sorted(
+        dependency for dependency in LAZY_DEPENDENCIES
+        if dependency in imported and dependency not in ALLOWED_DEPENDENCIES.get(module, set())
+    )
+    top_level = sorted(
+        ((name, cumulative) for name, _, cumulative in rows if '.' not in name and name != module),
+        key = lambda row: row[1],
+        reverse = True
+    )[:top]
+
+    return {
+        'module': module,
+        'total_ms': round(total_us / 1000, 1),
+        'modules_imported': len(imported),
+        'unexpected_dependencies': lazy_loaded,
+        'slowest_packages': [{'package': name, 'ms': round(cumulative / 1000, 1)} for name, cumulative in top_level]
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = 'Measure and guard the import time of the agent modules.')
+    parser.add_argument('--modules', nargs = '+', default = list(BUDGETS_MS))
+    parser.add_argument('--repeat', type = int, default = 3, help = 'Fresh interpreters per module, the fastest one is kept')
+    parser.add_argument('--top', type = int, default = 8, help = 'Slowest packages listed per module')
+    parser.add_argument('--scale', type = float, default = 1.0, help = 'Multiplier of the budgets, for slower machines')
+    parser.add_argument('--output', help = 'Writes the results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    for module in args.modules:
+        result = bench_module(module, args.repeat, args.top)
+        budget = BUDGETS_MS.get(module)
+        result['budget_ms'] = budget * args.scale if budget else None
+        results.append(result)
+
+        over_budget = result['budget_ms'] is not None and result['total_ms'] > result['budget_ms']
+        status = 'FAIL' if over_budget or result['unexpected_dependencies'] else 'ok'
+        failed = failed or status == 'FAIL'
+
+        budget_text = f"budget {result['budget_ms']:.0f} ms" if result['budget_ms'] else 'no budget'
+        print(f"{status:<4} {module:<22} {result['total_ms']:>8.1f} ms ({budget_text}, {result['modules_imported']} modules)")
+        for package in result['slowest_packages']:
+            print(f"       {package['package']:<28} {package['ms']:>8.1f} ms")
+        if result['unexpected_dependencies']:
+            print(f"       eagerly imported: {', '.join(result['unexpected_dependencies'])}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok = True)
+        with open(args.output, 'w', encoding = 'utf-8') as f:
+            json.dump(results, f, indent = 2)
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
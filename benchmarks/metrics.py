@@ -0,0 +1,135 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+import asyncio
+import functools
+import json
+import os
+import resource
+import statistics
+import time
+
+class PhaseRecorder:
+    """
+    Collects per-phase latencies and byte counts for one benchmark scenario.
+    """
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, List[float]] = {}
+        self.cdp_bytes = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations.setdefault(name, []).append(time.perf_counter() - start)
+
+    def add_bytes(self, value: Any) -> None:
+        if isinstance(value, (bytes, bytearray)):
+            self.cdp_bytes += len(value)
+        elif isinstance(value, str):
+            self.cdp_bytes += len(value.encode('utf-8'))
+        elif value is not None:
+            self.cdp_bytes += len(json.dumps(value, default=str).encode('utf-8'))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        phases = {}
+        for name, values in sorted(self.durations.items()):
+            ordered = sorted(values)
+            phases[name] = {
+                'count': len(values),
+                'total_ms': round(sum(values) * 1000, 3),
+                'mean_ms': round(statistics.fmean(values) * 1000, 3),
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+            }
+        return phases
+
+def time_method(get_recorder: Callable[[], PhaseRecorder], obj: Any, method_name: str, phase: str) -> None:
+    """
+    Wraps an async method of an object (or class) so every call is recorded under `phase`
+    in whichever recorder `get_recorder` returns at call time.
+    """
+
+    original = getattr(obj, method_name)
+
+    @functools.wraps(original)
+    async def wrapper(*args, **kwargs):
+        with get_recorder().phase(phase):
+            return await original(*args, **kwargs)
+
+    setattr(obj, method_name, wrapper)
+
+def count_page_transfer(get_recorder: Callable[[], PhaseRecorder]) -> None:
+    """
+    Counts the payload of values returned from pages (evaluate results and inner HTML), which is
+    what travels back over CDP for DOM snapshots and scrapes. Patches the Playwright classes once,
+    the bytes are added to whichever recorder `get_recorder` returns at call time.
+    """
+
+    from playwright.async_api import Page, Locator
+
+    original_evaluate = Page.evaluate
+    original_inner_html = Locator.inner_html
+
+    @functools.wraps(original_evaluate)
+    async def evaluate(self, *args, **kwargs):
+        result = await original_evaluate(self, *args, **kwargs)
+        get_recorder().add_bytes(result)
+        return result
+
+    @functools.wraps(original_inner_html)
+    async def inner_html(self, *args, **kwargs):
+        result = await original_inner_html(self, *args, **kwargs)
+        get_recorder().add_bytes(result)
+        return result
+
+    Page.evaluate = evaluate
+    Locator.inner_html = inner_html
+
+def _process_tree_rss_kb(pid: int) -> int:
+    """Sums VmRSS of a process and all its descendants (Linux /proc)."""
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+                        break
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError, ValueError):
+            continue
+    return total
+
+class RssSampler:
+    """
+    Samples the resident memory of this process plus its children (the browser) in the
+    background and keeps the peak. Falls back to `ru_maxrss` where /proc is unavailable.
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.peak_kb = 0
+        self._task: asyncio.Task = None
+
+    async def _run(self) -> None:
+        while True:
+            self.peak_kb = max(self.peak_kb, _process_tree_rss_kb(os.getpid()))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> float:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if not self.peak_kb:
+            self.peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(self.peak_kb / 1024, 2)
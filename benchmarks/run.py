@@ -0,0 +1,357 @@
+"""
+Deterministic end-to-end benchmarks for the agent.
+
+Runs the agent loop, session replay, DOM snapshots and the scraper tools against a local
+fixture site with a scripted model in place of a real provider, and writes wall time, per-phase
+latency, bytes returned over CDP, tokens sent and peak RSS to a JSON file.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --scenarios dom_get_state scraper_tool --repeat 5
+    python -m benchmarks.run --output new.json --compare benchmarks/results/baseline.json
+"""
+
+from .server import FixtureServer
+from .fake_model import ScriptedModel
+from .metrics import PhaseRecorder, RssSampler, count_page_transfer, time_method
+from src.browser import Browser
+from src.dom import DOM
+from src.dom.vision import PageVision, estimate_image_tokens
+from src.dom.ranker import ElementRanker
+from src.dom.compact import CompactElements, decode_packed_state
+from src.agent.agent import Agent
+from src.agent.executor import AgentExecutor
+from src.agent.graph.agent_graph import AgentGraph
+from src.tools.scraper import ScraperTool, ScraperArgs
+from src.tools.scroll_and_scrape import ScrollAndScrapeTool, ScrollAndScrapeArgs
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+MEMORY_PATH = os.path.join(os.path.dirname(__file__), '../src/memory/memory.json')
+
+class BenchmarkContext:
+    def __init__(self, server: FixtureServer, browser: Browser, model: ScriptedModel, repeat: int, table_rows: int) -> None:
+        self.server = server
+        self.browser = browser
+        self.model = model
+        self.repeat = repeat
+        self.table_rows = table_rows
+        self.recorder = PhaseRecorder()
+        self.session = None
+
+    async def open(self, path: str):
+        await self.browser.init_browser()
+        page = self.browser.page
+        await page.goto(self.server.url(path))
+        await page.wait_for_load_state('networkidle')
+        return page
+
+async def bench_dom_get_state(ctx: BenchmarkContext) -> Dict[str, Any]:
+    element_counts = {}
+    for path in [f'big_table.html?rows={ctx.table_rows}', 'heavy_spa.html', 'infinite_scroll.html']:
+        page = await ctx.open(path)
+        # Every repeat extracts again, the frame cache would skip the unchanged page
+        dom = DOM(page = page, frame_cache = False)
+        for _ in range(ctx.repeat):
+            dom_state = await dom.get_state()
+            with ctx.recorder.phase('dom.format'):
+                dom.format_elements_for_prompt(dom_state.get('interactive_elements', []))
+                dom.format_elements_for_prompt(dom_state.get('informative_elements', []))
+        element_counts[path] = {key: len(value) for key, value in dom_state.items()}
+        element_counts[path]['column_bytes'] = sum(value.nbytes() for value in dom_state.values() if isinstance(value, CompactElements))
+        await ctx.browser.close_browser()
+    return {'elements': element_counts}
+
+async def bench_scraper_tool(ctx: BenchmarkContext) -> Dict[str, Any]:
+    items = 0
+    for _ in range(ctx.repeat):
+        page = await ctx.open(f'big_table.html?rows={ctx.table_rows}')
+        tool = ScraperTool(page = page, dom = DOM(page = page), model = ctx.model, scraper_response_json_format = None)
+        with ctx.recorder.phase('tool.scraper'):
+            response = await tool.run(ScraperArgs(user_input = 'Scrape every product with its price'))
+        items += len(response) if isinstance(response, list) else 0
+        await ctx.browser.close_browser()
+    return {'items': items}
+
+async def bench_scroll_and_scrape(ctx: BenchmarkContext) -> Dict[str, Any]:
+    page = await ctx.open('infinite_scroll.html')
+    tool = ScrollAndScrapeTool(page = page, dom = DOM(page = page), model = ctx.model)
+    with ctx.recorder.phase('tool.scroll_and_scrape'):
+        response = await tool.run(ScrollAndScrapeArgs(
+            user_query = 'Scrape every job title',
+            max_attempts = 8,
+            scroll_step = 2000,
+            wait_timeout = 0
+        ))
+    await ctx.browser.close_browser()
+    return {'items': len(response) if isinstance(response, list) else 0}
+
+async def bench_agent_arun(ctx: BenchmarkContext) -> Dict[str, Any]:
+    steps = []
+    for page_number in range(1, 4):
+        steps.append({
+            'thought': f'Navigate to page {page_number}.',
+            'tool_name': 'navigate',
+            'tool_args': {'url': ctx.server.url(f'pagination/page{page_number}.html')}
+        })
+        steps.append({
+            'thought': f'Scrape page {page_number}.',
+            'tool_name': 'scraper',
+            'tool_args': {'user_input': 'Scrape every project'}
+        })
+    ctx.model.planner_steps = steps
+
+    agent = Agent(browser = ctx.browser, model = ctx.model, max_iterations = 50)
+    result = await agent.arun(query = 'Scrape all projects on the 3 pages', memorize = True)
+    ctx.session = agent._executor._session
+    return {'items': len(result) if isinstance(result, list) else 0}
+
+async def bench_replay_session(ctx: BenchmarkContext) -> Dict[str, Any]:
+    if not ctx.session:
+        # Record a session first, without counting it towards the replay
+        recorder = ctx.recorder
+        ctx.recorder = PhaseRecorder()
+        await bench_agent_arun(ctx)
+        ctx.recorder = recorder
+        ctx.model.reset()
+
+    agent = Agent(browser = ctx.browser, model = ctx.model, max_iterations = 50)
+    result = await agent.replay_session(ctx.session, wait_between_actions = 0)
+    return {'items': len(result) if isinstance(result, list) else 0}
+
+async def bench_page_state_modes(ctx: BenchmarkContext) -> Dict[str, Any]:
+    """
+    Compares the prompt cost of the page state sent as an element list (text mode) and as a
+    numbered screenshot with its element table (vision mode).
+    """
+
+    modes = {}
+    for path in [f'big_table.html?rows={ctx.table_rows}', 'heavy_spa.html', 'infinite_scroll.html']:
+        page = await ctx.open(path)
+        dom = DOM(page = page)
+        vision = PageVision(page = page)
+        for _ in range(ctx.repeat):
+            dom_state = await dom.get_state()
+            with ctx.recorder.phase('page_state.text'):
+                text = dom.format_elements_for_prompt(dom_state.get('interactive_elements', []))
+            with ctx.recorder.phase('page_state.vision'):
+                vision_state = await vision.capture(dom_state.get('interactive_elements', []))
+                table = vision.format_table()
+
+        text_bytes = len(text.encode('utf-8'))
+        table_bytes = len(table.encode('utf-8'))
+        image_tokens = estimate_image_tokens(vision_state['width'], vision_state['height'])
+        modes[path] = {
+            'text': {'bytes': text_bytes, 'tokens': text_bytes // 4},
+            'vision': {
+                'table_bytes': table_bytes,
+                'image_bytes': len(vision_state['image']) * 3 // 4,
+                'elements': len(vision_state['elements']),
+                'dropped': vision_state['dropped'],
+                'tokens': table_bytes // 4 + image_tokens
+            }
+        }
+        print(f"{path}: text {modes[path]['text']['tokens']} tokens, vision {modes[path]['vision']['tokens']} tokens")
+        await ctx.browser.close_browser()
+    return {'modes': modes}
+
+async def bench_element_ranking(ctx: BenchmarkContext) -> Dict[str, Any]:
+    """
+    Ranks the interactive elements of the fixture pages, repeated up to 5000 elements, against a task query.
+    """
+
+    ranker = ElementRanker(top_n = 60)
+    ranking = {}
+    for path in [f'big_table.html?rows={ctx.table_rows}', 'heavy_spa.html']:
+        page = await ctx.open(path)
+        dom_state = await DOM(page = page).get_state()
+        await ctx.browser.close_browser()
+        elements = dom_state.get('interactive_elements', [])
+        if not elements:
+            continue
+
+        elements = (elements * (5000 // len(elements) + 1))[:5000]
+        for _ in range(ctx.repeat):
+            with ctx.recorder.phase('dom.rank'):
+                ranked = ranker.rank(elements, 'Scrape every product with its price', 'Go to the next page of products')
+        ranking[path] = {'elements': len(elements), 'kept': len(ranked['elements']), 'dropped': ranked['dropped']}
+    return {'ranking': ranking}
+
+async def bench_dom_transfer(ctx: BenchmarkContext) -> Dict[str, Any]:
+    """
+    Compares the nested-object snapshot (`getElements()`) with the packed one (`getElementsPacked()`):
+    payload size, and the time to evaluate and decode into the DOM state.
+    """
+
+    with open(os.path.join(os.path.dirname(__file__), '../src/dom/script.js')) as f:
+        script = f.read()
+
+    transfer = {}
+    for path in [f'big_table.html?rows={ctx.table_rows}', 'heavy_spa.html', 'infinite_scroll.html']:
+        page = await ctx.open(path)
+        for _ in range(ctx.repeat):
+            with ctx.recorder.phase('transfer.objects'):
+                all_elements = await page.evaluate(f"{script}\ngetElements()")
+            with ctx.recorder.phase('transfer.packed'):
+                payload = await page.evaluate(f"{script}\ngetElementsPacked()")
+                with ctx.recorder.phase('transfer.packed.decode'):
+                    decode_packed_state(payload)
+        transfer[path] = {
+            'elements': sum(len(value) for value in all_elements.values()),
+            'objects_bytes': len(json.dumps(all_elements).encode('utf-8')),
+            'packed_bytes': len(payload.encode('utf-8'))
+        }
+        await ctx.browser.close_browser()
+    return {'transfer': transfer}
+
+async def bench_dom_frames(ctx: BenchmarkContext) -> Dict[str, Any]:
+    """
+    Extracts a page embedding a payment form, a nested frame and a dashboard: main frame only,
+    every frame, and every frame again with the frame cache on an unchanged page.
+    """
+
+    page = await ctx.open('framed_checkout.html')
+    modes = {
+        'main_frame': DOM(page = page, frames = False, frame_cache = False),
+        'all_frames': DOM(page = page, frame_cache = False),
+        'all_frames_cached': DOM(page = page)
+    }
+    counts = {}
+    for mode, dom in modes.items():
+        for _ in range(ctx.repeat):
+            with ctx.recorder.phase(f'frames.{mode}'):
+                dom_state = await dom.get_state()
+        counts[mode] = {key: len(value) for key, value in dom_state.items()}
+    await ctx.browser.close_browser()
+    return {'elements': counts}
+
+SCENARIOS: Dict[str, Callable[[BenchmarkContext], Awaitable[Dict[str, Any]]]] = {
+    'dom_get_state': bench_dom_get_state,
+    'scraper_tool': bench_scraper_tool,
+    'scroll_and_scrape': bench_scroll_and_scrape,
+    'agent_arun': bench_agent_arun,
+    'replay_session': bench_replay_session,
+    'page_state_modes': bench_page_state_modes,
+    'element_ranking': bench_element_ranking,
+    'dom_transfer': bench_dom_transfer,
+    'dom_frames': bench_dom_frames,
+}
+
+async def run_benchmarks(scenarios: List[str], repeat: int, table_rows: int, keep_alive: bool) -> Dict[str, Any]:
+    results = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'table_rows': table_rows,
+            'keep_alive': keep_alive,
+        },
+        'scenarios': {}
+    }
+
+    with open(MEMORY_PATH, 'rb') as f:
+        original_memory = f.read()
+
+    server = FixtureServer().start()
+    browser = Browser(headless = True, keep_alive = keep_alive)
+    model = ScriptedModel()
+    ctx = BenchmarkContext(server, browser, model, repeat, table_rows)
+
+    get_recorder = lambda: ctx.recorder
+    time_method(get_recorder, DOM, 'get_state', 'dom.get_state')
+    time_method(get_recorder, ScriptedModel, 'generate', 'llm.generate')
+    time_method(get_recorder, AgentExecutor, '_execute_tool', 'agent.tool')
+    time_method(get_recorder, AgentGraph, 'model_node', 'graph.model_node')
+    time_method(get_recorder, AgentGraph, 'tool_node', 'graph.tool_node')
+    time_method(get_recorder, AgentGraph, 'output_node', 'graph.output_node')
+    count_page_transfer(get_recorder)
+
+    try:
+        for name in scenarios:
+            print(f"\n=== {name} ===")
+            ctx.recorder = PhaseRecorder()
+            model.reset()
+            sampler = RssSampler()
+            sampler.start()
+
+            start = time.perf_counter()
+            extra = await SCENARIOS[name](ctx)
+            wall_time = time.perf_counter() - start
+
+            results['scenarios'][name] = {
+                'wall_time_s': round(wall_time, 4),
+                'phases': ctx.recorder.summary(),
+                'cdp_bytes': ctx.recorder.cdp_bytes,
+                'llm_calls': model.calls,
+                'tokens_sent': model.prompt_tokens,
+                'prompt_bytes': model.prompt_bytes,
+                'peak_rss_mb': await sampler.stop(),
+                **extra
+            }
+    finally:
+        await browser.shutdown()
+        server.stop()
+        with open(MEMORY_PATH, 'wb') as f:
+            f.write(original_memory)
+
+    return results
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """
+    Prints the relative change of the headline metrics and returns False if any scenario's
+    wall time or tokens regressed by more than `threshold`.
+    """
+
+    ok = True
+    print(f"\n{'scenario':<20}{'metric':<14}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, metrics in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric in ['wall_time_s', 'tokens_sent', 'cdp_bytes', 'peak_rss_mb']:
+            old, new = previous.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if metric in ('wall_time_s', 'tokens_sent') and change > threshold:
+                flag = '  REGRESSION'
+                ok = False
+            print(f"{name:<20}{metric:<14}{old:>14}{new:>14}{change:>+10.1%}{flag}")
+    return ok
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = 'Run the deterministic agent benchmarks.')
+    parser.add_argument('--scenarios', nargs = '+', choices = list(SCENARIOS), default = list(SCENARIOS))
+    parser.add_argument('--repeat', type = int, default = 3, help = 'Repetitions for the micro benchmarks')
+    parser.add_argument('--table-rows', type = int, default = 2000, help = 'Rows of the big table fixture')
+    parser.add_argument('--keep-alive', action = 'store_true', help = 'Reuse a warm browser between runs')
+    parser.add_argument('--output', default = os.path.join(RESULTS_DIR, 'latest.json'))
+    parser.add_argument('--compare', help = 'A previous results file to diff against')
+    parser.add_argument('--threshold', type = float, default = 0.2, help = 'Allowed relative regression')
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.scenarios, args.repeat, args.table_rows, args.keep_alive))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok = True)
+    with open(args.output, 'w', encoding = 'utf-8') as f:
+        json.dump(results, f, indent = 4)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding = 'utf-8') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from functools import partial
+from urllib.parse import urlparse, parse_qs
+import os
+import threading
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def render_big_table(rows: int) -> str:
+    """
+    Renders a deterministic product table with the given number of rows.
+    It is generated instead of saved so the size can be scaled from the command line.
+    """
+
+    body = '\n'.join(
+        f'<tr><td><a href="/products/{i}">Product {i}</a></td><td>Category {i % 23}</td>'
+        f'<td>{(i * 7919) % 100000 / 100:.2f}</td><td>{(i * 31) % 5 + 1} stars</td>'
+        f'<td><button data-id="{i}">Add to cart</button></td></tr>'
+        for i in range(1, rows + 1)
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Big table fixture</title></head>'
+        '<body><h1>Product catalogue</h1><table><thead><tr><th>Name</th><th>Category</th><th>Price</th>'
+        f'<th>Rating</th><th></th></tr></thead><tbody>\n{body}\n</tbody></table></body></html>'
+    )
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        if parsed.path == '/big_table.html':
+            rows = int(parse_qs(parsed.query).get('rows', ['2000'])[0])
+            payload = render_big_table(rows).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        super().do_GET()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+class FixtureServer:
+    """
+    Serves the fixture site from a background thread on localhost.
+
+    Attributes:
+        host (str): The interface to bind to
+        port (int): The port to bind to, 0 picks a free one
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer = None
+        self._thread: threading.Thread = None
+
+    def start(self) -> 'FixtureServer':
+        handler = partial(FixtureHandler, directory=FIXTURES_DIR)
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}:{self.port}/{path.lstrip('/')}"
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
@@ -2,10 +2,14 @@ from .__init__ import BaseAgent
 from .executor import AgentExecutor
 from .graph.agent_graph import AgentGraph
 from .graph.memory_graph import MemoryGraph
+from .checkpoint import SQLiteCheckpointSaver, DEFAULT_CHECKPOINT_PATH
 from .state import AgentState, MemoryState
 from ..models import BaseModel
+from ..search import SearchBackend
 from ..browser import Browser
-from typing import Optional, Dict, Any
+from ..browser.screenshots import ScreenshotWriter
+from ..tracing import Tracer, activate, deactivate
+from typing import Literal, Optional, Dict, Any
 from colorama import Fore, Style
 from uuid import uuid4
 import json
@@ -21,6 +25,22 @@ class Agent(BaseAgent):
         model (BaseModel): The model instance to use for the agent
         max_iterations (int): The maximum number of iterations to run the agent for
         scraper_response_json_format (Optional[Dict[str, Any]]): The JSON format to use for the scraper response
+        prefetch (bool): Whether to speculatively load likely next pages while the model is planning
+        http_fast_path (bool): Whether multi-page tools try a plain HTTP fetch before opening a browser tab
+        rule_planner (bool): Whether obvious steps (navigating to the URL of the query, finishing after
+            a plain scrape) are planned by rules instead of a model call
+        search_backend (Optional[SearchBackend]): The backend of the web search tools, DuckDuckGo by default
+        screenshots (Optional[ScreenshotWriter]): Format, sampling and location of the screenshots taken with
+            `screenshot_each_step`, JPEG files in `screenshots/<session>/` by default
+        page_state_mode (Literal['text', 'vision']): How the page is shown to the model: 'text' sends the list of
+            interactive elements, 'vision' a downscaled screenshot with numbered elements and a short table of them,
+            plus the `view_region` tool to zoom in on parts of the page
+        max_elements (Optional[int]): Pages with more interactive elements than this only show the ones most relevant
+            to the query and the current plan, plus inputs and pagination controls. None shows every element
+        checkpoint (bool | str): Whether to persist the state after every step so an interrupted run can be
+            resumed with `resume`. A path selects the SQLite file, True uses `checkpoints/agent.sqlite`
+        last_trace (Optional[Tracer]): The tracer of the most recent traced run
+        last_run_id (Optional[str]): The id of the most recent run, the one `resume` takes
     """
 
     def __init__(
@@ -29,17 +49,37 @@ class Agent(BaseAgent):
             model: BaseModel, 
             max_iterations: int = 100, 
             scraper_response_json_format: Optional[Dict[str, Any]] = None,
+            prefetch: bool = False,
+            http_fast_path: bool = True,
+            rule_planner: bool = True,
+            search_backend: Optional[SearchBackend] = None,
+            screenshots: Optional[ScreenshotWriter] = None,
+            page_state_mode: Literal['text', 'vision'] = 'text',
+            max_elements: Optional[int] = None,
+            checkpoint: bool | str = False
         ) -> None:
         self._executor = AgentExecutor(
             model = model,
             browser = browser,
             scraper_response_json_format = scraper_response_json_format,
-            session = str(uuid4())
+            session = str(uuid4()),
+            prefetch = prefetch,
+            http_fast_path = http_fast_path,
+            rule_planner = rule_planner,
+            search_backend = search_backend,
+            screenshots = screenshots,
+            page_state_mode = page_state_mode,
+            max_elements = max_elements
         )
-        self._graph_instance = AgentGraph(self._executor, AgentState)
+        self.checkpointer = None
+        if checkpoint:
+            self.checkpointer = SQLiteCheckpointSaver(checkpoint if isinstance(checkpoint, str) else DEFAULT_CHECKPOINT_PATH)
+        self._graph_instance = AgentGraph(self._executor, AgentState, checkpointer = self.checkpointer)
         self._compiled_graph = self._graph_instance.create_graph()
         self.max_iterations = max_iterations
         self.browser = browser
+        self.last_trace: Optional[Tracer] = None
+        self.last_run_id: Optional[str] = None
 
     async def arun(
             self, 
@@ -47,7 +87,8 @@ class Agent(BaseAgent):
             verbose: bool = False, 
             wait_between_actions: int = 0,
             memorize: bool = False,
-            screenshot_each_step: bool = False
+            screenshot_each_step: bool = False,
+            trace: bool | str = False
         ) -> str | dict | list:
         """
         The arun as Async Run method is the driver method to run the agent to do the task.
@@ -58,11 +99,41 @@ class Agent(BaseAgent):
             verbose (bool): Whether to print verbose output
             wait_between_actions (int): Wait between actions in seconds (default: 0)
             memorize (bool): Whether to memorize the steps being taken
+            trace (bool | str): Whether to trace the run and print a latency breakdown at the end.
+                A path writes the trace there as OpenTelemetry (OTLP/JSON), True writes it to `traces/<session>.json`
 
         Returns:
             str or dict: The final output of the agent
         """
 
+        # Every run gets its own id, its checkpoint thread, trace, screenshots and memorized steps are kept under it
+        self._executor._session = str(uuid4())
+        self.last_run_id = self._executor._session
+
+        if not trace:
+            return await self._arun(query, verbose, wait_between_actions, memorize, screenshot_each_step)
+
+        export_path = trace if isinstance(trace, str) else os.path.join(os.path.dirname(__file__), f'../../traces/{self._executor._session}.json')
+        tracer = Tracer(export_path = export_path)
+        token = activate(tracer)
+        try:
+            with tracer.span('agent.arun', query = query, session = self._executor._session):
+                return await self._arun(query, verbose, wait_between_actions, memorize, screenshot_each_step)
+        finally:
+            deactivate(token)
+            self.last_trace = tracer
+            tracer.print_summary()
+            path = tracer.export()
+            print(Fore.LIGHTBLUE_EX + f'Trace written to {os.path.abspath(path)}' + Style.RESET_ALL)
+
+    async def _arun(
+            self,
+            query: str,
+            verbose: bool,
+            wait_between_actions: int,
+            memorize: bool,
+            screenshot_each_step: bool
+        ) -> str | dict | list:
         await self.browser.init_browser()
         self._executor._finish_initialization(self.browser.page)
 
@@ -70,24 +141,99 @@ class Agent(BaseAgent):
             input = query,
             output = "",
             previous_actions = [],
+            history_summary = None,
             page_state = None,
             response = None,
             scraped_data = [],
             verbose = verbose,
             wait_between_actions = wait_between_actions,
             memorize = memorize,
+            memorized_steps = [],
             screenshot_each_step = screenshot_each_step
         )
 
         print(Fore.BLUE + Style.BRIGHT + f'User input: {query}\n' + Style.RESET_ALL)
-        
-        result = await self._compiled_graph.ainvoke(initial_state, { 'recursion_limit': self.max_iterations })
 
+        config = { 'recursion_limit': self.max_iterations }
+        if self.checkpointer:
+            config['configurable'] = { 'thread_id': self._executor._session }
+            print(Fore.LIGHTBLUE_EX + f'Checkpointing run {self._executor._session}\n' + Style.RESET_ALL)
+        else:
+            print(Fore.LIGHTBLUE_EX + f'Run {self._executor._session}\n' + Style.RESET_ALL)
+
+        result = await self._compiled_graph.ainvoke(initial_state, config)
+        return await self._finish_run(result)
+
+    async def resume(self, run_id: str, verbose: Optional[bool] = None) -> str | dict | list:
+        """
+        Resumes a checkpointed run from its last completed step.
+        The browser is opened on the page the run was on, and the graph continues with the
+        saved actions, history summary and scraped data.
+
+        Args:
+            run_id (str): The id of the run, printed when it started
+            verbose (Optional[bool]): Overrides the verbosity of the original run
+
+        Returns:
+            str or dict: The final output of the agent, or a message if the run can't be resumed
+        """
+
+        if not self.checkpointer:
+            return 'Checkpointing is not enabled for this agent'
+
+        config = { 'recursion_limit': self.max_iterations, 'configurable': { 'thread_id': run_id } }
+        snapshot = await self._compiled_graph.aget_state(config)
+        if not snapshot.values:
+            return 'Run not found'
+        if not snapshot.next:
+            print(Fore.LIGHTBLUE_EX + f'Run {run_id} already finished' + Style.RESET_ALL)
+            return snapshot.values['output'] or snapshot.values
+
+        # The resumed run writes under its own id, the session of the agent is restored afterwards
+        previous_session = self._executor._session
+        self._executor._session = run_id
+        try:
+            # The folded steps are only counted in the history summary
+            summary = snapshot.values.get('history_summary') or {}
+            self._executor._iterations = summary.get('steps', 0) + len(snapshot.values.get('previous_actions', []))
+            await self.browser.init_browser()
+            self._executor._finish_initialization(self.browser.page)
+
+            current_url = snapshot.values.get('current_url')
+            if current_url and current_url != 'about:blank':
+                await self.browser.page.goto(current_url)
+                await self.browser.page.wait_for_load_state('domcontentloaded')
+
+            if verbose is not None:
+                await self._compiled_graph.aupdate_state(config, { 'verbose': verbose })
+
+            print(Fore.BLUE + Style.BRIGHT + f"Resuming run {run_id} at step {self._executor._iterations}: {snapshot.values['input']}\n" + Style.RESET_ALL)
+
+            result = await self._compiled_graph.ainvoke(None, config)
+            return await self._finish_run(result)
+        finally:
+            self._executor._session = previous_session
+
+    async def _finish_run(self, result: AgentState) -> str | dict | list:
+        if self._executor.prefetcher:
+            await self._executor.prefetcher.discard_all()
+            stats = self._executor.prefetcher.stats()
+            print(Fore.LIGHTBLUE_EX + f"Prefetch: {stats['hits']}/{stats['prefetched']} hits (hit rate {stats['hit_rate']:.0%}), {stats['wasted']} wasted loads" + Style.RESET_ALL)
+
+        if self._executor.fetcher:
+            await self._executor.fetcher.close()
+
+        await self._executor.screenshots.close()
         await self.browser.close_browser()
 
         if result['output']:
             return result['output']
         return result
+
+    @property
+    def prefetch_stats(self) -> Dict[str, float] | None:
+        """Prefetch counters and hit rate accumulated over the runs of this agent."""
+        return self._executor.prefetcher.stats() if self._executor.prefetcher else None
         
 
     def get_memory(self) -> str:
@@ -178,6 +324,9 @@ class Agent(BaseAgent):
 
         result = await graph.ainvoke(initial_memory_state, { 'recursion_limit': self.max_iterations })
 
+        if self._executor.fetcher:
+            await self._executor.fetcher.close()
+        await self._executor.screenshots.close()
         await self.browser.close_browser()
 
         if result['output']:
@@ -0,0 +1,320 @@
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langchain_core.runnables import RunnableConfig
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+import copy
+import os
+import sqlite3
+import threading
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), '../../checkpoints/agent.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    base_version TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+class _ListTail:
+    """The last stored version of a list channel, used to detect appends."""
+
+    def __init__(self, version: str, items: List[Any], depth: int) -> None:
+        self.version = version
+        self.items = items
+        self.depth = depth
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[int]):
+    """
+    LangGraph checkpointer storing the graph state in a local SQLite file.
+
+    Like the built-in savers, a checkpoint only stores the channels that changed since the previous
+    one. On top of that, list channels that only grew (`previous_actions`, `scraped_data`) are stored
+    as the appended suffix plus a reference to the previous version, so a checkpoint after step 60
+    costs about as much as one after step 1. A full copy is written every `max_delta_chain` versions
+    to bound the work of restoring a state.
+
+    Args:
+        path (str): The SQLite database file, created if missing
+        max_delta_chain (int): The number of appended suffixes after which a list is stored in full again
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, max_delta_chain: int = 20) -> None:
+        super().__init__()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_delta_chain = max_delta_chain
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._lock = threading.Lock()
+        self._tails: Dict[Tuple[str, str, str], _ListTail] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # --- blobs ---
+
+    def _dump_channel(self, thread_id: str, checkpoint_ns: str, channel: str, version: str, value: Any) -> Tuple[str, bytes, Optional[str]]:
+        if not isinstance(value, list):
+            self._tails.pop((thread_id, checkpoint_ns, channel), None)
+            type_, blob = self.serde.dumps_typed(value)
+            return type_, blob, None
+
+        tail = self._tails.get((thread_id, checkpoint_ns, channel))
+        size = len(tail.items) if tail else 0
+        if tail and tail.depth < self.max_delta_chain and 0 < size <= len(value) and value[:size] == tail.items:
+            base_version = tail.version
+            type_, blob = self.serde.dumps_typed(value[size:])
+            tail.items.extend(copy.deepcopy(value[size:]))
+            tail.version = version
+            tail.depth += 1
+            return f'append:{type_}', blob, base_version
+
+        self._tails[(thread_id, checkpoint_ns, channel)] = _ListTail(version, copy.deepcopy(value), 0)
+        type_, blob = self.serde.dumps_typed(value)
+        return type_, blob, None
+
+    def _load_channel(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> Any:
+        suffixes = []
+        while True:
+            row = self.conn.execute(
+                "SELECT type, blob, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, version)
+            ).fetchone()
+            if row is None:
+                raise KeyError(channel)
+
+            type_, blob, base_version = row
+            if type_ == 'empty':
+                raise KeyError(channel)
+            if not type_.startswith('append:'):
+                value = self.serde.loads_typed((type_, blob))
+                break
+            suffixes.append(self.serde.loads_typed((type_[len('append:'):], blob)))
+            version = base_version
+
+        for suffix in reversed(suffixes):
+            value = value + suffix
+        return value
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            try:
+                value = self._load_channel(thread_id, checkpoint_ns, channel, str(version))
+            except KeyError:
+                continue
+            values[channel] = value
+        return values
+
+    # --- checkpoints ---
+
+    def _row_to_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_blob))
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+
+        return CheckpointTuple(
+            config = {'configurable': {'thread_id': thread_id, 'checkpoint_ns': checkpoint_ns, 'checkpoint_id': checkpoint_id}},
+            checkpoint = {
+                **checkpoint,
+                'channel_values': self._load_blobs(thread_id, checkpoint_ns, checkpoint['channel_versions'])
+            },
+            metadata = self.serde.loads_typed((metadata_type, metadata_blob)),
+            parent_config = (
+                {'configurable': {'thread_id': thread_id, 'checkpoint_ns': checkpoint_ns, 'checkpoint_id': parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+            pending_writes = [(task_id, channel, self.serde.loads_typed((type_, blob))) for task_id, channel, type_, blob in writes]
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config['configurable']['thread_id']
+        checkpoint_ns = config['configurable'].get('checkpoint_ns', '')
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            return self._row_to_tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+            self,
+            config: Optional[RunnableConfig],
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            before: Optional[RunnableConfig] = None,
+            limit: Optional[int] = None
+        ) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata FROM checkpoints"
+        conditions, params = [], []
+        if config:
+            conditions.append("thread_id = ?")
+            params.append(config['configurable']['thread_id'])
+            if config['configurable'].get('checkpoint_ns') is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(config['configurable']['checkpoint_ns'])
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        for row in rows:
+            thread_id, checkpoint_ns = row[0], row[1]
+            with self._lock:
+                checkpoint_tuple = self._row_to_tuple(thread_id, checkpoint_ns, row[2:])
+            if filter and not all(checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield checkpoint_tuple
+
+    def put(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions
+        ) -> RunnableConfig:
+        thread_id = config['configurable']['thread_id']
+        checkpoint_ns = config['configurable'].get('checkpoint_ns', '')
+        checkpoint = checkpoint.copy()
+        values: Dict[str, Any] = checkpoint.pop('channel_values')
+
+        with self._lock:
+            for channel, version in new_versions.items():
+                if channel in values:
+                    type_, blob, base_version = self._dump_channel(thread_id, checkpoint_ns, channel, str(version), values[channel])
+                else:
+                    type_, blob, base_version = 'empty', b'', None
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob, base_version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, channel, str(version), type_, blob, base_version)
+                )
+
+            type_, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+            metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint['id'], config['configurable'].get('checkpoint_id'), type_, checkpoint_blob, metadata_type, metadata_blob)
+            )
+            self.conn.commit()
+
+        return {'configurable': {'thread_id': thread_id, 'checkpoint_ns': checkpoint_ns, 'checkpoint_id': checkpoint['id']}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = '') -> None:
+        thread_id = config['configurable']['thread_id']
+        checkpoint_ns = config['configurable'].get('checkpoint_ns', '')
+        checkpoint_id = config['configurable']['checkpoint_id']
+
+        with self._lock:
+            for index, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, index)
+                type_, blob = self.serde.dumps_typed(value)
+                # Regular writes are kept on retries, special writes (errors, interrupts) are replaced
+                verb = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                self.conn.execute(
+                    f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, blob, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type_, blob, task_path)
+                )
+            self.conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ('checkpoints', 'blobs', 'writes'):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self.conn.commit()
+            for key in [key for key in self._tails if key[0] == thread_id]:
+                del self._tails[key]
+
+    # SQLite calls are short and local, so the async API runs them inline
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+            self,
+            config: Optional[RunnableConfig],
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            before: Optional[RunnableConfig] = None,
+            limit: Optional[int] = None
+        ) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions
+        ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = '') -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
@@ -1,24 +1,49 @@
+from __future__ import annotations
 from ..dom import DOM
+from ..dom.vision import PageVision
 from ..browser import Browser
-from ..tools.register import get_tool_classes
+from ..browser.prefetch import Prefetcher
+from ..browser.screenshots import ScreenshotWriter
+from ..fetch import HttpFetcher
+from ..search import WebSearch, SearchBackend
+from ..tools.register import get_tool_registry, get_constructor_params, generate_tools_markdown
+from ..tracing import start_span
 from .state import AgentState, MemoryState
-from .utils import extract_json, read_markdown_file
-from playwright.async_api import Page
-from typing import Optional, Dict, Any, List
+from .planner import RulePlanner
+from .history import HistoryManager
+from .utils import extract_json, read_markdown_file, build_system_prompt, PROMPTS_ROOT
+from typing import TYPE_CHECKING, Literal, Optional, Dict, Any, List
 from pydantic import Field, ValidationError, BaseModel
 from colorama import Fore, Style
-import inspect
 import asyncio
 import json
 import os
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+    from ..dom.ranker import ElementRanker
+
 # These tools wont be available for the agent
 # The name of the tools must be the same, i.e. the name of the file of the tool
 IGNORE_TOOLS = ['scroll_and_scrape', 'get_html', 'get_markdown']
 
+# These tools are only available when the page state is sent as a screenshot
+VISION_TOOLS = ['view_region']
+
+# Responses of these tools are implicitly accumulated into the scraped data
+SCRAPER_TOOLS = ['scraper', 'scroll_and_scrape', 'batch_scrape', 'research']
+
 class ToolExecutionResult(BaseModel):
     tool_response: List | Dict | str | None
     scraped_data_accumulator: List[Dict | str | None]
+    ok: bool = True
+    items: int = 0
+
+def is_error_response(tool_response: Any) -> bool:
+    """Whether a raw tool response reports a failure: an `error` dict or an "Error: ..." message."""
+    if isinstance(tool_response, dict):
+        return 'error' in tool_response
+    return isinstance(tool_response, str) and tool_response.startswith('Error')
 
 class AgentExecutor:
     """
@@ -35,6 +60,15 @@ class AgentExecutor:
         dom (DOM): The DOM instance to use for the agent
         scraper_response_json_format (Optional[Dict[str, Any]]): The JSON format to use for the scraper response
         session (str): The session ID for the agent
+        prefetcher (Optional[Prefetcher]): Speculatively loads likely next pages while the model is planning
+        fetcher (Optional[HttpFetcher]): Plain HTTP client used before the browser for static pages
+        search (WebSearch): Runs the web searches of the tools, with cached results
+        screenshots (ScreenshotWriter): Captures and writes the step screenshots in the background
+        page_state_mode (Literal['text', 'vision']): Whether the page state is sent as an element list or as a numbered screenshot
+        vision (Optional[PageVision]): Captures the numbered screenshots and the region crops in vision mode
+        ranker (Optional[ElementRanker]): Keeps the interactive elements relevant to the task when a page has more than `max_elements`
+        rule_planner (Optional[RulePlanner]): Plans the obvious first and last steps without a model call
+        history (HistoryManager): Compacts the action records and folds old steps into a summary
     """
 
     def __init__(
@@ -42,7 +76,14 @@ class AgentExecutor:
             model: BaseModel = Field(..., description="Model to use for agent"), 
             browser: Browser = Field(..., description="Browser to use for agent"), 
             scraper_response_json_format: Optional[Dict[str, Any]] = None,
-            session: str = ''
+            session: str = '',
+            prefetch: bool = False,
+            http_fast_path: bool = True,
+            rule_planner: bool = True,
+            search_backend: Optional[SearchBackend] = None,
+            screenshots: Optional[ScreenshotWriter] = None,
+            page_state_mode: Literal['text', 'vision'] = 'text',
+            max_elements: Optional[int] = None
         ) -> None:
         self._model = model
         self._browser = browser
@@ -52,72 +93,135 @@ class AgentExecutor:
         self.dom = None
         self._scraper_response_json_format = scraper_response_json_format
         self._session = session
-        self._tools = []
+        self.tools = []
+        self._tools_by_name = {}
         self._system_prompt = ''
         self._output_prompt = ''
+        self._last_dom_state = None
+        self.prefetcher = Prefetcher() if prefetch else None
+        if self.prefetcher:
+            self.prefetcher.attach(self._swap_page)
+        self.fetcher = HttpFetcher(user_agent = browser.user_agent) if http_fast_path else None
+        self.search = WebSearch(backend = search_backend)
+        self.screenshots = screenshots or ScreenshotWriter()
+        self.page_state_mode = page_state_mode
+        self.vision = None
+        self.ranker: Optional[ElementRanker] = None
+        if max_elements:
+            from ..dom.ranker import ElementRanker
+            self.ranker = ElementRanker(top_n = max_elements)
+        self.rule_planner = RulePlanner() if rule_planner else None
+        self.history = HistoryManager()
 
     def _finish_initialization(self, page: Page) -> None:
         """
         Finish the initialization of the agent executor.
+        The tools are instantiated on the first run only, later runs rebind them to the new page
+        and reset their per-run state. The tool discovery and the prompts come from process-wide caches.
         """
 
+        ignored_tools = IGNORE_TOOLS + ([] if self.page_state_mode == 'vision' else VISION_TOOLS)
+        tool_classes = get_tool_registry(ignored_tools)
+        if self.tools and [type(tool) for tool in self.tools] == list(tool_classes.values()):
+            self._bind_page(page)
+            for tool in self.tools:
+                tool.reset()
+            return
+
         self._page = page
         self.dom = DOM(page = self._page)
+        self.vision = PageVision(page = self._page) if self.page_state_mode == 'vision' else None
 
         available_dependencies = {
             "page": self._page,
             "dom": self.dom,
             "model": self._model,
-            "scraper_response_json_format": self._scraper_response_json_format
+            "scraper_response_json_format": self._scraper_response_json_format,
+            "prefetcher": self.prefetcher,
+            "fetcher": self.fetcher,
+            "search": self.search,
+            "vision": self.vision
         }
 
         self.tools = []
-        markdown_list = []
-        for tool_class in get_tool_classes():
-            sig = inspect.signature(tool_class.__init__)
-            tool_kwargs = {}
-
-            if tool_class.name in IGNORE_TOOLS:
-                continue
-
-            markdown_list.append(f"- {tool_class.name}: {tool_class.description}")
-            args_schema = tool_class.args_schema
-
-            if args_schema and args_schema.model_fields:
-                for field_name, field_info in args_schema.model_fields.items():
-                    if field_info.is_required():
-                        req_or_default = "required"
-                    else:   
-                        req_or_default = f"default = {field_info.default}"
-                    
-                    arg_type = field_info.annotation.__name__
-                    arg_desc = field_info.description or ""
-                    
-                    markdown_list.append(f"    - Args: `{field_name}` ({arg_type}, {req_or_default}) - {arg_desc}")
-
-            for param in sig.parameters.values():
-                if param.name in available_dependencies:
-                    tool_kwargs[param.name] = available_dependencies[param.name]
-            
+        for tool_class in tool_classes.values():
+            tool_kwargs = {
+                name: dependency for name, dependency in available_dependencies.items()
+                if name in get_constructor_params(tool_class)
+            }
             self.tools.append(tool_class(**tool_kwargs))
-
-        tools_markdown = "\n".join(markdown_list)
-        system_prompt_template = read_markdown_file(os.path.join(os.path.dirname(__file__), '../prompts', 'system.md'))
-        final_system_prompt = system_prompt_template.replace("TOOL_REGISTRY", tools_markdown)
-        output_prompt_template = read_markdown_file(os.path.join(os.path.dirname(__file__), '../prompts', 'output.md'))
+        self._tools_by_name = {tool.name: tool for tool in self.tools}
 
         # initialize prompts
-        self._system_prompt = final_system_prompt
-        self._output_prompt = output_prompt_template
+        self._system_prompt = build_system_prompt(generate_tools_markdown(tool_classes.values()))
+        self._output_prompt = read_markdown_file(os.path.join(PROMPTS_ROOT, 'output.md'))
 
         print(Fore.LIGHTWHITE_EX + "Tools:")
         for tool in self.tools:
             print(f"- {tool.name}")
         print(Style.RESET_ALL + Fore.LIGHTRED_EX + 'Ignored tools:')
-        for tool in IGNORE_TOOLS:
+        for tool in ignored_tools:
             print(f"- {tool}")
         print(Style.RESET_ALL)
 
+    def _bind_page(self, page: Page) -> None:
+        """
+        Points the executor, the DOM helper and every tool at another page of the same context.
+        """
+
+        self._page = page
+        self._browser.page = page
+        self.dom = DOM(page = page)
+        if self.vision:
+            self.vision.page = page
+            self.vision.grabber.reset()
+        for tool in self.tools:
+            tool.page = page
+            if tool.dom is not None:
+                tool.dom = self.dom
+
+    async def _swap_page(self, page: Page) -> None:
+        """
+        Makes a prefetched page the current page and closes the previous one.
+        """
+
+        previous_page = self._page
+        self._bind_page(page)
+        await page.bring_to_front()
+        if previous_page and previous_page is not page and not previous_page.is_closed():
+            await previous_page.close()
+
+    async def _recover_browser(self, state: AgentState | MemoryState) -> bool:
+        """
+        Moves the run to a healthy browser node when the current one has dropped. When the browser
+        is fine but the page was closed (e.g. by the tool), a new page of the same context is opened
+        instead, so the session is kept.
+
+        Returns:
+            bool: True if the page was replaced and the tools were rebound to it
+        """
+
+        if self._browser.is_connected():
+            if self._page is None or not self._page.is_closed():
+                return False
+            try:
+                page = await self._browser.browser_context.new_page()
+            except Exception as e:
+                print(Fore.RED + Style.BRIGHT + '❗' + f"Could not reopen the closed page: {e}" + Style.RESET_ALL)
+                return False
+            self._bind_page(page)
+            return True
+
+        print(Fore.LIGHTRED_EX + Style.BRIGHT + '❗ Browser connection lost, failing over to another node...' + Style.RESET_ALL)
+        try:
+            page = await self._browser.failover()
+        except Exception as e:
+            print(Fore.RED + Style.BRIGHT + '❗' + f"Browser failover failed: {e}" + Style.RESET_ALL)
+            return False
+
+        self._bind_page(page)
+        return True
+
     async def close(self):
         """Public method to close the browser manually."""
         if self._browser.page and not self._browser.page.is_closed():
@@ -129,7 +233,8 @@ class AgentExecutor:
         self, 
         tool_name: str, 
         tool_args: Dict[str, Any], 
-        state: AgentState | MemoryState
+        state: AgentState | MemoryState,
+        retried: bool = False
     ) -> ToolExecutionResult | None:
         """
         This method is being used both in the agent graph and memory graph.
@@ -139,9 +244,11 @@ class AgentExecutor:
             tool_name (str): The name of the tool to execute
             tool_args (Dict[str, Any]): The arguments to pass to the tool
             state (AgentState | MemoryState): The state of the agent
+            retried (bool): Whether this is the retry after a browser recovery, which is not recovered again
 
         Returns:
-            ToolExecutionResult | None: The result of the tool execution
+            ToolExecutionResult | None: The result of the tool execution, `ok` telling whether it succeeded and
+                `items` how many items it added to the scraped data
         """
 
         if state.get('verbose'):
@@ -150,22 +257,21 @@ class AgentExecutor:
             print('\n'.join(f"{key}: {item}" for key, item in tool_args.items()))
             print(Style.RESET_ALL)
 
-        found_tool = None
-        for tool in self.tools:
-            if tool.name == tool_name:
-                found_tool = tool
-                break
+        found_tool = self._tools_by_name.get(tool_name)
 
         if found_tool:
             try:
                 args_model = found_tool.args_schema(**tool_args)
-                tool_response = await found_tool.run(args=args_model)
+                with start_span(f'tool.{tool_name}', **{'tool.name': tool_name}) as span:
+                    tool_response = await found_tool.run(args=args_model)
+                    span.set_attribute('tool.items', len(tool_response) if isinstance(tool_response, list) else 0)
 
                 if state.get('verbose'):
                     print(Fore.GREEN + Style.BRIGHT + f'Tool response: {str(tool_response)}' + Style.RESET_ALL, '\n')
                     print(Fore.LIGHTYELLOW_EX + 'Waiting for networkidle...' + Style.RESET_ALL)
                 
-                await self._page.wait_for_load_state("networkidle", timeout=10000)
+                with start_span('wait.networkidle', caller='executor'):
+                    await self._page.wait_for_load_state("networkidle", timeout=10000)
 
                 if state.get('wait_between_actions'):
                     if state.get('verbose'):
@@ -176,9 +282,14 @@ class AgentExecutor:
                 tool_response = f"Error: Tool argument validation error: {e}"
             except Exception as e:
                 tool_response = f"Error: Error executing tool '{tool_name}': {e}"
+                if not retried and await self._recover_browser(state):
+                    return await self._execute_tool(tool_name, tool_args, state, retried = True)
         
+            ok = not is_error_response(tool_response)
             scraped_data_accumulator = state.get('scraped_data', [])
-            if tool_name in ["scraper", "scroll_and_scrape"]:
+            scraped_before = len(scraped_data_accumulator)
+            # A failed scrape is reported to the model, it is not data
+            if tool_name in SCRAPER_TOOLS and ok:
                 try:
                     if self._scraper_response_json_format or isinstance(tool_response, (dict, list)):
                         if isinstance(tool_response, (dict, list)):
@@ -211,6 +322,8 @@ class AgentExecutor:
 
             return ToolExecutionResult(
                 tool_response=tool_response,
-                scraped_data_accumulator=scraped_data_accumulator
+                scraped_data_accumulator=scraped_data_accumulator,
+                ok=ok,
+                items=len(scraped_data_accumulator) - scraped_before
             )
         return None
\ No newline at end of file
@@ -2,15 +2,29 @@ from ..executor import AgentExecutor
 from ..state import AgentState
 from ...message import SystemMessage, UserMessage
 from ..utils import extract_json
+from ...dom.vision import image_part
+from ...dom.compact import json_default
+from ...tracing import start_span, traced
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from colorama import Fore, Style
 from datetime import datetime
 from json import JSONDecodeError
+from typing import Optional
 import asyncio
 import json
 import os
 
+# The most actions the model may batch into one turn
+MAX_BATCH_ACTIONS = 10
+
+# Cheap page identity checked between batched actions: the URL and the number of interactive elements
+FINGERPRINT_SCRIPT = """() => [
+    location.href,
+    document.querySelectorAll('a, button, input, select, textarea, [role=button], [role=link], [onclick]').length
+]"""
+
 class AgentGraph:
     """
     Manages the stateful, cyclical execution of the web agent using a LangGraph state machine.
@@ -27,14 +41,17 @@ class AgentGraph:
     Attributes:
         _executor (AgentExecutor): An instance containing the tools, model, and browser state.
         _agent_state (AgentState): The TypedDict class defining the graph's state structure.
+        _checkpointer (Optional[BaseCheckpointSaver]): Persists the state after every node, so a run can be resumed.
         _graph (CompiledStateGraph): The compiled, runnable LangGraph object.
     """
 
-    def __init__(self, executor: AgentExecutor, agent_state: AgentState) -> None:
+    def __init__(self, executor: AgentExecutor, agent_state: AgentState, checkpointer: Optional[BaseCheckpointSaver] = None) -> None:
         self._executor = executor
         self._agent_state = agent_state 
+        self._checkpointer = checkpointer
         self._graph = self.create_graph()
     
+    @traced('model_node')
     async def model_node(self, state: AgentState) -> AgentState:
         """
         The "brain" of the agent. It decides the next action based on the current state.
@@ -42,6 +59,7 @@ class AgentGraph:
         This node builds a comprehensive prompt including the user's query, a summary of
         previous actions, and the current state of the web page's DOM. It then calls the
         language model to get the next `thought`, `tool_name`, and `tool_args`.
+        Obvious steps are answered by the executor's rule planner without calling the model.
 
         Args:
             state (AgentState): The current state of the graph.
@@ -50,38 +68,37 @@ class AgentGraph:
             dict: A dictionary containing the `response` from the model to update the state.
         """
 
-        system_prompt = SystemMessage(content = self._executor._system_prompt).to_dict()
-        user_prompt = UserMessage(content = f'User Query: {state["input"]}').to_dict()
-        model_messages = [system_prompt, user_prompt]
-        self._executor._model.messages = model_messages
-
-        if state.get('previous_actions'):
-            history = []
-            for ind, action in enumerate(state['previous_actions']):
-                # if len(action) == 4:
-                thought = action.get('thought')
-                tool_call = action.get('tool_name')
-                tool_args = action.get('tool_args')
-                tool_response = action.get('tool_response')
-                
-                if isinstance(tool_response, list):
-                    response_summary = f"Successfully scraped {len(tool_response)} items."
-                else:
-                    response_summary = str(tool_response)[:500] 
-
-                if ind == len(state['previous_actions']) - 1:
-                    history.append(f"LAST ACTION:\nThought: {thought}\nTool Call: {tool_call}\nTool Args: {tool_args}\nResponse: {response_summary}")
-                else:
-                    history.append(f"Step {ind + 1}: Called tool: `{tool_call}`\nArgs: {tool_args}")
-                
-            history_str = "\n".join(history)
-            self._executor._model.add_message(UserMessage(content = f'Previous Actions Summary:\n{history_str}').to_dict())
-            self._executor._model.add_message(UserMessage(content = f"Current interactive elements on the page:\n{state.get('page_state').get('interactive_elements')}").to_dict())
-            # self._executor._model.add_message(UserMessage(content = f"Current informative elements on the page:\n{state.get('page_state').get('informative_elements')}").to_dict())
-            # self._executor._model.add_message(UserMessage(content = f"Current scrollable elements on the page:\n{state.get('page_state').get('scrollable_elements')}").to_dict())
+        if self._executor.rule_planner:
+            with start_span('planner.rule') as span:
+                planned = self._executor.rule_planner.plan(state, [tool.name for tool in self._executor.tools])
+                span.set_attribute('planned', planned is not None)
+            if planned:
+                print(Fore.CYAN + Style.BRIGHT + f'Iteration: {self._executor._iterations}' + Style.RESET_ALL)
+                print(Fore.GREEN + Style.BRIGHT + f'Planned thought: {planned.get("thought")}' + Style.RESET_ALL)
+                return { 'response': planned }
+
+        with start_span('prompt.build') as span:
+            system_prompt = SystemMessage(content = self._executor._system_prompt).to_dict()
+            user_prompt = UserMessage(content = f'User Query: {state["input"]}').to_dict()
+            model_messages = [system_prompt, user_prompt]
+
+            if state.get('previous_actions'):
+                history_str = self._executor.history.render(state['previous_actions'], state.get('history_summary'))
+                model_messages.append(UserMessage(content = f'Previous Actions Summary:\n{history_str}').to_dict())
+                model_messages.append(self._page_state_message(state))
+                # model_messages.append(UserMessage(content = f"Current informative elements on the page:\n{state.get('page_state').get('informative_elements')}").to_dict())
+                # model_messages.append(UserMessage(content = f"Current scrollable elements on the page:\n{state.get('page_state').get('scrollable_elements')}").to_dict())
+            if span.recording:
+                span.set_attribute('payload.bytes', sum(len(str(message.get('content', '')).encode('utf-8')) for message in model_messages))
+
+        await self._start_prefetch(state)
 
         try:
-            response = await self._executor._model.generate()
+            response = await self._executor._model.generate(
+                messages = model_messages,
+                call_site = 'planner',
+                escalate = self._should_escalate(state)
+            )
             # response_content = response['choices'][0]['message']['content']
             response_content = response.choices[0].message.content
             json_response = extract_json(response_content)
@@ -90,7 +107,7 @@ class AgentGraph:
             print(Fore.GREEN + Style.BRIGHT + f'Model thought: {json_response.get("thought")}' + Style.RESET_ALL)
 
             if json_response is not None:
-                return { 'response': json_response }
+                return { 'response': self._normalize_actions(json_response) }
             else: 
                 return { 
                     'response': {
@@ -110,62 +127,215 @@ class AgentGraph:
                 } 
             }
         
+    def _page_state_message(self, state: AgentState) -> dict:
+        """
+        The page state part of the prompt. In vision mode the element table goes out with the numbered
+        screenshot and the regions cropped since the last step, instead of the full element list.
+        """
+
+        page_state = state.get('page_state') or {}
+        vision = self._executor.vision
+        if not vision or not vision.last_state:
+            return UserMessage(content = f"Current interactive elements on the page:\n{page_state.get('interactive_elements')}").to_dict()
+
+        content = [
+            {'type': 'text', 'text': f"Screenshot of the page, the numbers mark these interactive elements:\n{page_state.get('interactive_elements')}"},
+            image_part(vision.last_state['image'])
+        ]
+        for crop in vision.take_crops():
+            region = crop['region']
+            content.append({'type': 'text', 'text': f"Region at ({region['x']:.0f}, {region['y']:.0f}), {region['width']:.0f}x{region['height']:.0f} px:"})
+            content.append(image_part(crop['image']))
+        return UserMessage(content = content).to_dict()
+
+    @staticmethod
+    def _normalize_actions(response: dict) -> dict:
+        """
+        Validates a batched `actions` list and mirrors its first action into `tool_name`/`tool_args`,
+        so the router and single-action code paths keep working.
+        """
+
+        actions = response.get('actions')
+        if not isinstance(actions, list):
+            return response
+
+        actions = [
+            {'tool_name': action['tool_name'], 'tool_args': action.get('tool_args') or {}}
+            for action in actions if isinstance(action, dict) and action.get('tool_name')
+        ][:MAX_BATCH_ACTIONS]
+        if not actions:
+            response.pop('actions')
+            return response
+
+        response['actions'] = actions
+        response['tool_name'] = actions[0]['tool_name']
+        response['tool_args'] = actions[0]['tool_args']
+        return response
+
+    @staticmethod
+    def _is_error_response(action: dict) -> bool:
+        """Whether the recorded action failed, as reported by the executor."""
+        return not action.get('ok', True)
+
+    def _should_escalate(self, state: AgentState) -> bool:
+        """
+        Whether the last step failed (a tool error or an unparsable model response), in which case
+        a routed model plans the next step with its strong model.
+        """
+
+        if not state.get('previous_actions'):
+            return False
+
+        return self._is_error_response(state['previous_actions'][-1])
+
+    async def _start_prefetch(self, state: AgentState) -> None:
+        """
+        Opens the predicted next pages in background tabs so they load while the model is planning.
+        """
+
+        prefetcher = self._executor.prefetcher
+        if not prefetcher or not self._executor._page:
+            return
+
+        try:
+            interactive_elements = (self._executor._last_dom_state or {}).get('interactive_elements', [])
+            visited_urls = list((state.get('history_summary') or {}).get('urls', [])) + [
+                action.get('tool_args', {}).get('url', '') for action in state.get('previous_actions', [])
+                if action.get('tool_name') == 'navigate'
+            ]
+            urls = prefetcher.predict(interactive_elements, state['input'], self._executor._page.url, visited_urls)
+            await prefetcher.prefetch(self._executor._page.context, urls)
+        except Exception as e:
+            print(Fore.RED + Style.BRIGHT + '❗' + f"Error starting prefetch: {e}" + Style.RESET_ALL)
+
+    @traced('tool_node')
     async def tool_node(self, state: AgentState) -> dict:
         """
         It executes the tool call planned by the model_node.
         Calls the tool from the given tool_call along with the tool_args provided by the model_node.
+        A batch of `actions` is executed in order, stopping early when an action fails or the page
+        fingerprint changes, as the remaining actions were planned against the old page.
 
         Args:
             state (AgentState): The current state of the graph.
 
         Returns:
-            dict: A dictionary with updates for `page_state`, `previous_actions`, and `scraped_data`.
+            dict: A dictionary with updates for `page_state`, `previous_actions`, `scraped_data` and `current_url`.
         """
 
-        tool_name = state.get('response', {}).get('tool_name')
-        tool_args = state.get('response', {}).get('tool_args', {})
-
-        result = await self._executor._execute_tool(tool_name, tool_args, state)
-        tool_response = f"Error: Tool '{tool_name}' not found or failed to execute."
+        response = state.get('response', {})
+        actions = response.get('actions') or [{'tool_name': response.get('tool_name'), 'tool_args': response.get('tool_args', {})}]
 
+        all_actions = state.get('previous_actions', [])
+        # The replayable steps outlive the history fold, they are only kept when the run is memorized
+        memorized_steps = list(state.get('memorized_steps') or [])
         scraped_data_accumulator = state.get('scraped_data', [])
-        if result:
-            tool_response = result.tool_response
-            scraped_data_accumulator = result.scraped_data_accumulator
+        finished = False
+        fingerprint = await self._page_fingerprint() if len(actions) > 1 else None
+
+        for index, action in enumerate(actions):
+            tool_name = action.get('tool_name')
+            tool_args = action.get('tool_args', {})
+            if tool_name == 'finish':
+                finished = True
+                break
+
+            result = await self._executor._execute_tool(tool_name, tool_args, {**state, 'scraped_data': scraped_data_accumulator})
+            tool_response, ok, items = f"Error: Tool '{tool_name}' not found or failed to execute.", False, 0
+            if result:
+                tool_response, ok, items = result.tool_response, result.ok, result.items
+                scraped_data_accumulator = result.scraped_data_accumulator
+
+            new_action = self._executor.history.record(
+                thought = response.get('thought', '') if index == 0 else f'(batched action {index + 1}/{len(actions)})',
+                tool_name = tool_name,
+                tool_args = tool_args,
+                tool_response = tool_response,
+                ok = ok,
+                items = items
+            )
+            all_actions.append(new_action)
+            if state.get('memorize') and ok:
+                memorized_steps.append({
+                    'thought': new_action['thought'],
+                    'tool_call': tool_name,
+                    'tool_args': tool_args,
+                    'tool_response': new_action['tool_response']
+                })
+
+            if index == len(actions) - 1:
+                break
+
+            reason = None
+            if self._is_error_response(new_action):
+                reason = 'the action failed'
+            else:
+                current_fingerprint = await self._page_fingerprint()
+                if current_fingerprint != fingerprint:
+                    reason = 'the page changed'
+                fingerprint = current_fingerprint
+
+            if reason:
+                skipped = ', '.join(remaining.get('tool_name', '') for remaining in actions[index + 1:])
+                print(Fore.LIGHTYELLOW_EX + f'Stopped the action batch after step {index + 1} because {reason}' + Style.RESET_ALL)
+                new_action['tool_response'] += f"\nStopped the action batch because {reason}, these actions were not executed: {skipped}"
+                break
 
         page_state_dict = {}
         try:
-            dom_state = await self._executor.dom.get_state()
-            page_state_dict = {
-                'interactive_elements': self._executor.dom.format_elements_for_prompt(dom_state.get('interactive_elements', [])),
-                'informative_elements': self._executor.dom.format_elements_for_prompt(dom_state.get('informative_elements', [])),
-                'scrollable_elements': self._executor.dom.format_elements_for_prompt(dom_state.get('scrollable_elements', []))
-            }
+            with start_span('dom.get_state'):
+                dom_state = await self._executor.dom.get_state()
+            self._executor._last_dom_state = dom_state
+            interactive_elements = dom_state.get('interactive_elements', [])
+            dropped_note = ''
+            if self._executor.ranker:
+                ranked = self._executor.ranker.rank(interactive_elements, state['input'], response.get('thought', ''))
+                interactive_elements = ranked['elements']
+                dropped_note = self._executor.ranker.describe_dropped(ranked)
+                if dropped_note and state.get('verbose'):
+                    print(Fore.LIGHTYELLOW_EX + f"Kept {len(interactive_elements)} relevant elements {dropped_note}" + Style.RESET_ALL)
+            with start_span('dom.format'):
+                page_state_dict = {
+                    'interactive_elements': '\n'.join(filter(None, [self._executor.dom.format_elements_for_prompt(interactive_elements), dropped_note])),
+                    'informative_elements': self._executor.dom.format_elements_for_prompt(dom_state.get('informative_elements', [])),
+                    'scrollable_elements': self._executor.dom.format_elements_for_prompt(dom_state.get('scrollable_elements', []))
+                }
+            if self._executor.vision:
+                # The screenshot stays on the executor, only the short element table goes into the checkpointed state
+                await self._executor.vision.capture(dom_state.get('interactive_elements', []))
+                page_state_dict['interactive_elements'] = self._executor.vision.format_table()
         except Exception as e:
             print(Fore.RED + Style.BRIGHT + '❗' + f"Error getting DOM state: {e}" + Style.RESET_ALL)
 
-        new_action = {
-            'thought': state.get('response', {}).get('thought', ''),
-            'tool_name': tool_name,
-            'tool_args': tool_args,
-            'tool_response': tool_response
-        }
-        all_actions = state.get('previous_actions', [])
-        all_actions.append(new_action)
-
-        # screenshot at each step
         if state.get('screenshot_each_step'):
-            path = os.path.join(os.path.dirname(__file__), '../../../screenshots/')
-            if not os.path.exists(path):
-                os.makedirs(path)
-            await self._executor._page.screenshot(path=os.path.join(path, f'screenshot_{self._executor._session}_{self._executor._iterations}.png'))
-
-        return {
+            await self._executor.screenshots.capture(
+                self._executor._page,
+                session = self._executor._session,
+                step = self._executor._iterations,
+                error = self._is_error_response(all_actions[-1]) if all_actions else False
+            )
+
+        kept_actions, history_summary = self._executor.history.fold(all_actions, state.get('history_summary'))
+        update = {
             "page_state": page_state_dict,
-            "previous_actions": all_actions,
-            "scraped_data": scraped_data_accumulator
+            "previous_actions": kept_actions,
+            "history_summary": history_summary,
+            "scraped_data": scraped_data_accumulator,
+            "current_url": self._executor._page.url
         }
+        if state.get('memorize'):
+            update['memorized_steps'] = memorized_steps
+        if finished:
+            update['response'] = {**response, 'tool_name': 'finish', 'tool_args': {}}
+        return update
 
+    async def _page_fingerprint(self) -> tuple:
+        try:
+            return tuple(await self._executor._page.evaluate(FINGERPRINT_SCRIPT))
+        except Exception:
+            return ()
+
+    @traced('output_node')
     async def output_node(self, state: AgentState) -> AgentState:
         """
         The final node in the graph. It prepares the agent's definitive final answer for the user.
@@ -205,15 +375,8 @@ class AgentGraph:
             else:
                 memory = []
 
-            steps = []
-            for action in state.get('previous_actions', []):
-                if 'Error' not in action['tool_response']:
-                    steps.append({
-                        'thought': action['thought'],
-                        'tool_call': action['tool_name'],
-                        'tool_args': action['tool_args'],
-                        'tool_response': action['tool_response'] if isinstance(action['tool_response'], str) else "Scraped data"
-                    })
+            # The successful steps, collected by tool_node as the history drops the folded records
+            steps = list(state.get('memorized_steps') or [])
 
             memory.append({
                 'session': self._executor._session,
@@ -224,7 +387,7 @@ class AgentGraph:
 
             try:
                 with open(MEMORY_PATH, 'w', encoding='utf-8') as f:
-                    json.dump(memory, f, indent=4, ensure_ascii=False)
+                    json.dump(memory, f, indent=4, ensure_ascii=False, default=json_default)
                 
                 print(Fore.GREEN + Style.BRIGHT + '* Steps memorized successfully')
                 print(Fore.GREEN + Style.BRIGHT + '* Memory path: ' + MEMORY_PATH + Style.RESET_ALL)
@@ -247,7 +410,11 @@ class AgentGraph:
         try:
             system_prompt = SystemMessage(content=self._executor._output_prompt).to_dict()
             # history = "\n".join([f"Step {i+1}: {action[0]}" for i, action in enumerate(state.get('previous_actions', []))])
-            history = "\n".join([f"Step {i + 1}: {action['thought']}" for i, action in enumerate(state.get('previous_actions', []))])
+            summary = state.get('history_summary')
+            start = summary.get('steps', 0) if summary else 0
+            history = "\n".join(self._executor.history.describe_summary(summary) + [
+                f"Step {i + 1}: {action['thought']}" for i, action in enumerate(state.get('previous_actions', []), start = start)
+            ])
 
             messages = [
                 system_prompt,
@@ -255,8 +422,7 @@ class AgentGraph:
                 UserMessage(content=f'Summary of Actions Taken:\n{history}').to_dict()
             ]
             
-            self._executor._model.messages = messages
-            response = await self._executor._model.generate()
+            response = await self._executor._model.generate(messages = messages, call_site = 'output')
             response_content = response['choices'][0]['message']['content']
             final_output = json.loads(response_content).get("response", "Task completed.")
 
@@ -292,6 +458,15 @@ class AgentGraph:
             return 'call_output'
         return 'call_tool'
 
+    def _after_tool(self, state: AgentState) -> str:
+        """
+        Ends the run when a batch of actions ended with `finish`, otherwise hands back to the model.
+        """
+
+        if state.get('response', {}).get('tool_name', '').lower().strip() == 'finish':
+            return 'call_output'
+        return 'call_model'
+
     def create_graph(self) -> CompiledStateGraph:
         graph = StateGraph(AgentState)
         graph.add_node('model_node', self.model_node)
@@ -306,8 +481,15 @@ class AgentGraph:
                 'call_output': 'output_node'
             }
         )
-        graph.add_edge('tool_node', 'model_node')
+        graph.add_conditional_edges(
+            'tool_node',
+            self._after_tool,
+            {
+                'call_model': 'model_node',
+                'call_output': 'output_node'
+            }
+        )
         graph.add_edge('output_node', END)
         graph.set_entry_point('model_node')
 
-        return graph.compile()
+        return graph.compile(checkpointer = self._checkpointer)
@@ -4,7 +4,6 @@ from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
 from colorama import Fore, Style
 import asyncio
-import os
 
 class MemoryGraph:
     """
@@ -59,12 +58,14 @@ class MemoryGraph:
             tool_response = result.tool_response
             scraped_data_accumulator = result.scraped_data_accumulator
 
-        # screenshot at each step
         if state.get('screenshot_each_step'):
-            path = os.path.join(os.path.dirname(__file__), '../../../screenshots/')
-            if not os.path.exists(path):
-                os.makedirs(path)
-            await self._executor._page.screenshot(path=os.path.join(path, f'screenshot_replay_session_{self._executor._session}_{self._executor._iterations}.png'))
+            await self._executor.screenshots.capture(
+                self._executor._page,
+                session = self._executor._session,
+                step = self._executor._iterations,
+                error = not result.ok if result else True,
+                prefix = 'replay_'
+            )
 
         return { 
             'scraped_data': scraped_data_accumulator,
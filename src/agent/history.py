@@ -0,0 +1,174 @@
+from .state import Action
+from ..dom.compact import json_default
+from typing import Any, Dict, List, Optional, Tuple
+import json
+
+class HistoryManager:
+    """
+    Keeps the action history of a run bounded.
+
+    Every executed action is stored as a compact record (thought and tool response capped,
+    scraped lists reduced to their item count). Only the last `detailed_steps` records are
+    kept in the state; older steps are folded, `summary_every` steps at a time, into a running
+    summary of fixed size and dropped, so the state and the prompt cost the same at step 90
+    as at step 10.
+
+    Attributes:
+        detailed_steps (int): The number of most recent steps kept and rendered in detail
+        summary_every (int): How many steps are folded into the summary at once
+        max_response_chars (int): The cap of a tool response held in the state
+        max_thought_chars (int): The cap of a thought held in the state
+        max_arg_chars (int): The cap of a single tool argument in the prompt
+        max_urls (int): The most recently visited URLs kept in the summary
+        max_milestones (int): The most recent scraping milestones kept in the summary
+    """
+
+    def __init__(
+            self,
+            detailed_steps: int = 8,
+            summary_every: int = 10,
+            max_response_chars: int = 500,
+            max_thought_chars: int = 400,
+            max_arg_chars: int = 200,
+            max_urls: int = 10,
+            max_milestones: int = 5
+        ) -> None:
+        self.detailed_steps = detailed_steps
+        self.summary_every = summary_every
+        self.max_response_chars = max_response_chars
+        self.max_thought_chars = max_thought_chars
+        self.max_arg_chars = max_arg_chars
+        self.max_urls = max_urls
+        self.max_milestones = max_milestones
+
+    @staticmethod
+    def _cap(text: str, limit: int) -> str:
+        return text if len(text) <= limit else text[:limit] + f'... [{len(text) - limit} more characters]'
+
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        # Compact DOM elements are serialized as dicts, anything else as its text
+        try:
+            return json_default(value)
+        except TypeError:
+            return str(value)
+
+    def compact_response(self, tool_response: Any) -> str:
+        """
+        Reduces a tool response to what the planner needs to know about it.
+        """
+
+        if isinstance(tool_response, list):
+            return f"Successfully scraped {len(tool_response)} items." if tool_response else "No new items were scraped."
+        if isinstance(tool_response, dict):
+            if 'error' in tool_response:
+                tool_response = f"Error: {tool_response['error']}"
+            else:
+                tool_response = json.dumps(tool_response, ensure_ascii=False, default=self._json_default)
+        return self._cap(str(tool_response), self.max_response_chars)
+
+    def record(self, thought: str, tool_name: str, tool_args: Dict[str, Any], tool_response: Any, ok: bool = True, items: int = 0) -> Action:
+        """
+        Builds the compact record of an executed action. The arguments are kept intact so
+        memorized sessions can still be replayed.
+
+        Args:
+            thought (str): The thought of the model for the step
+            tool_name (str): The executed tool
+            tool_args (Dict[str, Any]): The arguments of the tool
+            tool_response (Any): The raw tool response, compacted into text for the prompt
+            ok (bool): Whether the tool succeeded, read instead of the response text
+            items (int): How many items the step added to the scraped data
+        """
+
+        return {
+            'thought': self._cap(str(thought or ''), self.max_thought_chars),
+            'tool_name': tool_name,
+            'tool_args': tool_args,
+            'tool_response': self.compact_response(tool_response),
+            'ok': ok,
+            'items': items
+        }
+
+    def fold(self, actions: List[Action], summary: Optional[Dict[str, Any]]) -> Tuple[List[Action], Optional[Dict[str, Any]]]:
+        """
+        Folds the steps that fell out of the detailed window into the summary, once enough of them
+        piled up, and drops their records.
+
+        Args:
+            actions (List[Action]): The action records not folded yet
+            summary (Optional[Dict[str, Any]]): The current summary, None before the first fold
+
+        Returns:
+            Tuple[List[Action], Optional[Dict[str, Any]]]: The records still kept and the refreshed summary,
+                the given ones if nothing was folded
+        """
+
+        folded = summary.get('steps', 0) if summary else 0
+        if len(actions) < self.detailed_steps + self.summary_every:
+            return actions, summary
+
+        summary = {
+            'steps': folded,
+            'tools': dict(summary.get('tools', {})) if summary else {},
+            'urls': list(summary.get('urls', [])) if summary else [],
+            'errors': summary.get('errors', 0) if summary else 0,
+            'scraped_items': summary.get('scraped_items', 0) if summary else 0,
+            'milestones': list(summary.get('milestones', [])) if summary else []
+        }
+        end = len(actions) - self.detailed_steps
+        for index, action in enumerate(actions[:end], start = folded):
+            tool_name = action.get('tool_name') or ''
+            summary['tools'][tool_name] = summary['tools'].get(tool_name, 0) + 1
+
+            url = (action.get('tool_args') or {}).get('url')
+            if tool_name == 'navigate' and url:
+                summary['urls'] = ([visited for visited in summary['urls'] if visited != url] + [url])[-self.max_urls:]
+            if not action.get('ok', True):
+                summary['errors'] += 1
+            elif action.get('items'):
+                summary['scraped_items'] += action['items']
+                summary['milestones'] = (summary['milestones'] + [f"Step {index + 1}: {tool_name} -> {action.get('tool_response')}"])[-self.max_milestones:]
+        summary['steps'] = folded + end
+        return actions[end:], summary
+
+    @staticmethod
+    def describe_summary(summary: Optional[Dict[str, Any]]) -> List[str]:
+        """
+        The lines describing the folded steps, empty before the first fold.
+        """
+
+        if not summary or not summary.get('steps'):
+            return []
+        tools = ', '.join(f"{name} x{count}" for name, count in summary['tools'].items())
+        lines = [f"Steps 1-{summary['steps']} (summarized): {tools}."]
+        if summary['urls']:
+            lines.append(f"Visited URLs: {', '.join(summary['urls'])}")
+        lines.append(f"Items scraped in these steps: {summary['scraped_items']}. Failed steps: {summary['errors']}.")
+        lines.extend(summary['milestones'])
+        return lines
+
+    def render(self, actions: List[Action], summary: Optional[Dict[str, Any]]) -> str:
+        """
+        Renders the history for the planner prompt: the summary of the folded steps, the
+        recent steps and the last action with its thought and response.
+        """
+
+        lines = self.describe_summary(summary)
+        start = summary.get('steps', 0) if summary else 0
+        for index, action in enumerate(actions, start = start):
+            tool_args = self._render_args(action.get('tool_args'))
+            if index == start + len(actions) - 1:
+                lines.append(
+                    f"LAST ACTION:\nThought: {action.get('thought')}\nTool Call: {action.get('tool_name')}\n"
+                    f"Tool Args: {tool_args}\nResponse: {action.get('tool_response')}"
+                )
+            else:
+                lines.append(f"Step {index + 1}: Called tool: `{action.get('tool_name')}`\nArgs: {tool_args}")
+        return '\n'.join(lines)
+
+    def _render_args(self, tool_args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            key: self._cap(value, self.max_arg_chars) if isinstance(value, str) else value
+            for key, value in (tool_args or {}).items()
+        }
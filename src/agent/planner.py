@@ -0,0 +1,99 @@
+from .state import AgentState, Response
+from typing import Any, List, Optional
+import re
+
+URL_PATTERN = re.compile(r'(?:https?://|www\.)[^\s,\'"<>()\[\]]+', re.IGNORECASE)
+
+# Queries asking to pull data out of pages
+SCRAPE_INTENT = re.compile(r'\b(scrape|extract|collect|list|fetch|get|grab|pull)\b', re.IGNORECASE)
+
+# Anything beyond "open and scrape" is left to the model
+INTERACTION_INTENT = re.compile(
+    r'\b(click|type|write|enter|fill|press|scroll|search|select|choose|log ?in|sign ?in|submit|'
+    r'next|pages?\s*\d|\d+\s*pages|pagination|paginate|load more|show more|wait|play|download|'
+    r'upload|hover|open each|each of|every page|compare|summar\w*|answer|tell me|explain|if)\b',
+    re.IGNORECASE
+)
+
+SCRAPER_TOOLS = ('scraper', 'batch_scrape')
+
+class RulePlanner:
+    """
+    Deterministic pre-planner for the steps that need no reasoning.
+
+    It navigates to the URL of the query (or scrapes several URLs at once) on the first step,
+    and finishes right after a successful scrape when the query asked for nothing but scraping.
+    Everything else returns None and is planned by the model as usual.
+
+    Attributes:
+        planned (int): The number of steps planned without a model call
+    """
+
+    def __init__(self) -> None:
+        self.planned = 0
+
+    @staticmethod
+    def extract_urls(query: str) -> List[str]:
+        urls = []
+        for url in URL_PATTERN.findall(query):
+            url = url.rstrip('.,;:!?')
+            if url.lower().startswith('www.'):
+                url = 'https://' + url
+            if url not in urls:
+                urls.append(url)
+        return urls
+
+    @staticmethod
+    def is_simple_scrape(query: str) -> bool:
+        """Whether the query asks only to open pages and scrape them."""
+        text = URL_PATTERN.sub(' ', query)
+        return bool(SCRAPE_INTENT.search(text)) and not INTERACTION_INTENT.search(text)
+
+    def plan(self, state: AgentState, tool_names: List[str]) -> Optional[Response]:
+        """
+        Plans the next step if it is obvious from the query and the previous actions.
+
+        Args:
+            state (AgentState): The current state of the graph
+            tool_names (List[str]): The names of the tools available to the agent
+
+        Returns:
+            Optional[Response]: The step in the model's response format, None to ask the model
+        """
+
+        query = state.get('input', '')
+        actions = state.get('previous_actions') or []
+        urls = self.extract_urls(query)
+        response = None
+
+        if not actions:
+            if len(urls) > 1 and self.is_simple_scrape(query) and 'batch_scrape' in tool_names:
+                response = self._response(
+                    f'The query asks to scrape {len(urls)} given URLs, scraping them in parallel.',
+                    'batch_scrape', {'urls': urls, 'user_input': query}
+                )
+            elif urls and 'navigate' in tool_names:
+                response = self._response(
+                    f'The query starts at {urls[0]}, navigating there first.',
+                    'navigate', {'url': urls[0]}
+                )
+        elif self._scraped_successfully(actions[-1], state) and self.is_simple_scrape(query):
+            response = self._response('The requested data has been scraped, the task is complete.', 'finish', {})
+
+        if response:
+            self.planned += 1
+        return response
+
+    def _scraped_successfully(self, action: Any, state: AgentState) -> bool:
+        # The outcome recorded by the executor, the response text is only meant for the model
+        if action.get('tool_name') not in SCRAPER_TOOLS or not state.get('scraped_data'):
+            return False
+        return bool(action.get('ok')) and action.get('items', 0) > 0
+
+    def _response(self, thought: str, tool_name: str, tool_args: dict) -> Response:
+        return Response(
+            thought = f'(rule-based) {thought}',
+            tool_name = tool_name,
+            tool_args = tool_args,
+            observation = ''
+        )
@@ -1,11 +1,16 @@
 from ..dom.state import DOMState
-from typing import TypedDict, Optional
+from typing import TypedDict, Optional, NotRequired
+
+class PlannedAction(TypedDict):
+    tool_name: str
+    tool_args: dict
 
 class Response(TypedDict):
     tool_name: str
     tool_args: dict
     thought: str
     observation: str
+    actions: NotRequired[list[PlannedAction]]
 
 class Action(TypedDict):
     thought: str
@@ -13,14 +18,18 @@ class Action(TypedDict):
     tool_call: str | None
     tool_args: dict | None
     tool_response: str | None
+    ok: NotRequired[bool]
+    items: NotRequired[int]
 
 class AgentState(TypedDict):
     input: str
     output: str
     previous_actions: list[Action]
+    history_summary: dict | None
     page_state: DOMState | None
     response: Optional[Response]
     scraped_data: list
+    current_url: NotRequired[str | None]
     verbose: bool
     wait_between_actions: int
     memorize: bool
@@ -1,9 +1,22 @@
+from ..message import SystemMessage, UserMessage
+from ..fetch import HttpFetcher, fetch_body_html
+from typing import TYPE_CHECKING, Optional, Dict, Any
+from functools import lru_cache
 import re
 import json
+import asyncio
 import os
-from typing import Optional, Dict, Any
 
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+
+MARKDOWN_STRIP_TAGS = ["script", "style", "noscript", "iframe", "object", "embed", "link", "meta", "svg", "canvas"]
+
+@lru_cache(maxsize = 32)
 def read_markdown_file(file_path: str) -> str:
+    """
+    Reads a prompt template. Templates are read once per process.
+    """
     with open(file_path, "r", encoding="utf-8") as f:
         return f.read()
 
@@ -22,16 +35,110 @@ PROMPTS_DIR = os.path.join(os.path.dirname(__file__), '../prompts/scraper')
 def build_scraper_prompt(scraper_output_json_schema: Optional[Dict[str, Any]] = None) -> str:
     """
     Dynamically assembles the scraper system prompt from template files
-    based on whether a JSON schema is provided.
+    based on whether a JSON schema is provided. The prompt is built once per schema.
     """
+    schema_key = json.dumps(scraper_output_json_schema) if scraper_output_json_schema else None
+    return _build_scraper_prompt(schema_key)
+
+@lru_cache(maxsize = 32)
+def _build_scraper_prompt(schema_key: Optional[str]) -> str:
     base_template = read_markdown_file(os.path.join(PROMPTS_DIR, "scraper.md"))
 
-    if scraper_output_json_schema:
+    if schema_key:
         instruction_template = read_markdown_file(os.path.join(PROMPTS_DIR, "scraper_schema.md"))
-        schema_as_string = json.dumps(scraper_output_json_schema, indent=2)
+        schema_as_string = json.dumps(json.loads(schema_key), indent=2)
         instructions = instruction_template.replace("[JSON_SCHEMA_HERE]", schema_as_string)
     else:
         instructions = read_markdown_file(os.path.join(PROMPTS_DIR, "scraper_non_schema.md"))
 
     final_prompt = base_template.replace("[OUTPUT_FORMAT_INSTRUCTIONS]", instructions)
-    return final_prompt
\ No newline at end of file
+    return final_prompt
+
+PROMPTS_ROOT = os.path.join(os.path.dirname(__file__), '../prompts')
+
+@lru_cache(maxsize = 32)
+def build_system_prompt(tools_markdown: str) -> str:
+    """
+    Fills the tool registry into the planner system prompt, once per tool set.
+    """
+    return read_markdown_file(os.path.join(PROMPTS_ROOT, 'system.md')).replace("TOOL_REGISTRY", tools_markdown)
+
+def html_to_markdown(html: str) -> str:
+    """
+    Converts the body HTML of a page into the markdown fed to the scraper prompt.
+    """
+    from markdownify import markdownify as md
+    return md(html, strip = MARKDOWN_STRIP_TAGS)
+
+async def extract_from_markdown(
+        model: Any, 
+        user_query: str, 
+        markdown: str, 
+        scraper_output_json_schema: Optional[Dict[str, Any]] = None
+    ) -> Any:
+    """
+    Sends page markdown to the model with the scraper prompt and returns the value
+    of the "response" key of the model's JSON answer.
+
+    Raises:
+        ValueError: If the model did not return a JSON object with a "response" key.
+    """
+
+    messages = [
+        SystemMessage(content = build_scraper_prompt(scraper_output_json_schema)).to_dict(),
+        UserMessage(content = f'User Query: {user_query}').to_dict(),
+        UserMessage(content = f'HTML Content in Markdown Format\n: {markdown}').to_dict(),
+    ]
+
+    response = await model.generate(messages = messages, call_site = 'scraper')
+    final_response = extract_json(response.choices[0].message.content)
+    if not final_response or 'response' not in final_response:
+        raise ValueError("LLM failed to return a valid JSON object with a 'response' key.")
+    return final_response.get('response')
+
+async def scrape_url(
+        url: str,
+        user_query: str,
+        context: 'BrowserContext',
+        model: Any,
+        fetcher: Optional[HttpFetcher] = None,
+        scraper_output_json_schema: Optional[Dict[str, Any]] = None,
+        timeout: int = 30000,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[str, Any]:
+    """
+    Loads a URL outside of the current page (HTTP fast path first, then a new tab of the context)
+    and extracts the data asked for by the query.
+
+    Args:
+        semaphore (Optional[asyncio.Semaphore]): Bounds the number of pages loading at once,
+            the extraction runs outside of it
+
+    Returns:
+        Dict[str, Any]: The `url` with either the extracted `response` or an `error`
+    """
+
+    try:
+        if semaphore:
+            async with semaphore:
+                html, tier = await fetch_body_html(url, context, fetcher, timeout)
+        else:
+            html, tier = await fetch_body_html(url, context, fetcher, timeout)
+        print(f"Loaded {url} via {tier}.")
+    except Exception as e:
+        return {"url": url, "error": f"Failed to load {url}: {e}"}
+
+    markdown = html_to_markdown(html)
+    if not markdown.strip():
+        return {"url": url, "error": f"No textual content found on {url}"}
+
+    try:
+        response = await extract_from_markdown(
+            model = model,
+            user_query = user_query,
+            markdown = markdown,
+            scraper_output_json_schema = scraper_output_json_schema
+        )
+        return {"url": url, "response": response}
+    except Exception as e:
+        return {"url": url, "error": f"Failed to scrape {url}: {e}"}
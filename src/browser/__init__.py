@@ -1,14 +1,16 @@
+from __future__ import annotations
 from .config import BROWSER_ARGS, IGNORE_DEFAULT_ARGS, SECURITY_ARGS
-from playwright.async_api import (
-    Page, 
-    Playwright, 
-    Browser, 
-    async_playwright, 
-    BrowserContext
-)
-from playwright_stealth import Stealth
-from fake_useragent import UserAgent
-from typing import Literal
+from .pool import ContextPool
+from .endpoints import EndpointPool
+from typing import TYPE_CHECKING, List, Literal, Union
+
+if TYPE_CHECKING:
+    from playwright.async_api import (
+        Page, 
+        Playwright, 
+        Browser, 
+        BrowserContext
+    )
 
 class Browser:
     """
@@ -23,6 +25,11 @@ class Browser:
         browser_instance (Browser): The browser instance
         browser_context (BrowserContext): The browser context
         page (Page): The page instance
+        ws_endpoint (Union[str, List[str]]): One or more remote browser endpoints (Playwright server or CDP).
+            With several endpoints, new contexts are routed to the least loaded healthy node
+        keep_alive (bool): Whether to keep the browser process warm between runs and lease
+            pre-warmed contexts from a pool instead of launching a new browser every time
+        pool_size (int): The number of idle contexts kept warm in keep_alive mode, every run gets a fresh one
     """
 
     def __init__(
@@ -32,7 +39,9 @@ class Browser:
         user_agent: str = None,
         random_user_agent: bool = False,
         executable_path: str = None,
-        ws_endpoint: str = None
+        ws_endpoint: Union[str, List[str]] = None,
+        keep_alive: bool = False,
+        pool_size: int = 2
     ) -> None:
         self.headless = headless
         self.browser_type = browser_type
@@ -44,8 +53,13 @@ class Browser:
         self.page: Page = None
         self.executable_path = executable_path
         self.ws_endpoint = ws_endpoint
+        self.keep_alive = keep_alive
+        self.pool_size = pool_size
+        self._pool: ContextPool = None
+        self._endpoints: EndpointPool = None
 
         if self.random_user_agent:
+            from fake_useragent import UserAgent
             if browser_type == 'chrome':
                 self.user_agent = UserAgent().chrome
             elif browser_type == 'firefox':
@@ -66,10 +80,55 @@ class Browser:
         await self.close_browser()
     
     async def init_browser(self) -> Browser:
+        """
+        Prepares a page for a run.
+        In keep_alive mode a pre-warmed context is leased from the pool (starting the browser
+        on first use), otherwise a new browser process is launched.
+        """
+
+        if self.keep_alive:
+            if self._pool is None:
+                await self.start()
+            self.browser_context, self.page = await self._pool.acquire()
+            return self
+
+        await self._launch()
+        self.browser_context = await self._new_context()
+        self.page = await self.browser_context.new_page()
+        await self.page.goto('about:blank') # default page to be opened
+        await self.page.wait_for_load_state('domcontentloaded')
+
+        return self
+
+    async def start(self) -> Browser:
+        """
+        Launches the long-lived browser process and pre-warms the context pool.
+        Only needed in keep_alive mode; calling it ahead of time moves the launch cost
+        out of the first run.
+        """
+
+        if self.browser_instance is None and self._endpoints is None:
+            await self._launch()
+
+        if self._pool is None:
+            self._pool = ContextPool(factory = self._new_context, size = self.pool_size)
+            await self._pool.fill()
+
+        return self
+
+    async def _launch(self) -> None:
+        """
+        Starts the Playwright driver and launches (or connects to) the browser process.
+        """
+
+        from playwright.async_api import async_playwright
         self.playwright = await async_playwright().start()
 
         if self.ws_endpoint:
-            browser_instance = await self.playwright.chromium.connect(self.ws_endpoint, timeout=30000)
+            endpoints = [self.ws_endpoint] if isinstance(self.ws_endpoint, str) else list(self.ws_endpoint)
+            self._endpoints = EndpointPool(self.playwright, endpoints)
+            await self._endpoints.connect()
+            return
 
         else:
             if self.browser_type == 'chrome':
@@ -90,39 +149,119 @@ class Browser:
                     args = BROWSER_ARGS,
                     ignore_default_args = IGNORE_DEFAULT_ARGS,
                 )
-    
-        self.browser_context = await browser_instance.new_context(
-            user_agent = self.user_agent
-        )
 
+        self.browser_instance = browser_instance
+
+    async def _new_context(self) -> BrowserContext:
+        """
+        Creates a new browser context with the stealth patches applied.
+        """
+
+        if self._endpoints:
+            browser_context = await self._endpoints.new_context(user_agent = self.user_agent)
+        else:
+            browser_context = await self.browser_instance.new_context(
+                user_agent = self.user_agent
+            )
+
+        from playwright_stealth import Stealth
         stealth = Stealth()
-        await stealth.apply_stealth_async(self.browser_context)
-        self.page = await self.browser_context.new_page()
-        await self.page.goto('about:blank') # default page to be opened
-        await self.page.wait_for_load_state('domcontentloaded')
+        await stealth.apply_stealth_async(browser_context)
+        return browser_context
 
-        return self
+    def is_connected(self) -> bool:
+        """
+        Whether the browser serving the current context is still reachable. A closed page does not
+        count as a dropped browser, its context and session are still usable.
+        """
+
+        if self._endpoints:
+            return self._endpoints.is_context_alive(self.browser_context)
+        return self.browser_instance is not None and self.browser_instance.is_connected()
+
+    async def failover(self) -> Page:
+        """
+        Moves the run to a new context on another healthy node after the current one dropped,
+        and navigates back to the URL the page was on.
+
+        Returns:
+            Page: The new page
+        """
+
+        last_url = self.page.url if self.page else 'about:blank'
+
+        if self.keep_alive and self._pool is not None:
+            if self.browser_context:
+                try:
+                    await self._pool.release(self.browser_context)
+                except Exception:
+                    pass
+            self.browser_context, self.page = await self._pool.acquire()
+        else:
+            if self.browser_context:
+                try:
+                    await self.browser_context.close()
+                except Exception:
+                    pass
+            self.browser_context = await self._new_context()
+            self.page = await self.browser_context.new_page()
+
+        if last_url and last_url != 'about:blank':
+            await self.page.goto(last_url)
+            await self.page.wait_for_load_state('domcontentloaded')
+        else:
+            await self.page.goto('about:blank')
+
+        return self.page
 
     async def close_browser(self) -> None:
         """
         Closes the browser instance and releases resources.
+        In keep_alive mode the leased context is handed back to the pool and the browser
+        process keeps running; use `shutdown` to stop it.
+        """
+
+        if self.keep_alive and self._pool is not None:
+            browser_context = self.browser_context
+            self.page = None
+            self.browser_context = None
+            if browser_context:
+                try:
+                    await self._pool.release(browser_context)
+                except Exception as e:
+                    print(f"Error releasing browser context: {e}")
+            return
+
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """
+        Closes every page, context and the browser process, and stops the Playwright driver.
         """
 
         try:
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
+
             if self.page and not self.page.is_closed():
                 await self.page.close()
-                self.page = None
+            self.page = None
 
             if self.browser_context:
                 await self.browser_context.close()
                 self.browser_context = None
 
             if self.browser_instance:
-                await self.browser_instance.close_browser()
+                await self.browser_instance.close()
                 self.browser_instance = None
 
+            if self._endpoints:
+                await self._endpoints.close()
+                self._endpoints = None
+
             if self.playwright:
                 await self.playwright.stop()
                 self.playwright = None
         except Exception as e:
-            print(f"Error closing browser: {e}")
\ No newline at end of file
+            print(f"Error closing browser: {e}")
@@ -0,0 +1,220 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Set
+import asyncio
+import random
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Playwright
+
+class BrowserNode:
+    """
+    A single remote browser endpoint and its connection state.
+
+    Attributes:
+        endpoint (str): The websocket / http endpoint of the node
+        protocol (Literal['playwright', 'cdp']): Whether the endpoint is a Playwright server
+            (`playwright run-server`, browserless, ...) or a raw Chrome DevTools endpoint
+        browser (Optional[Browser]): The connected browser, None while disconnected
+        active_contexts (int): The number of open contexts routed to this node
+        failures (int): The number of consecutive failed connection attempts
+        last_error (Optional[str]): The last connection error seen on this node
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.protocol: Literal['playwright', 'cdp'] = self.detect_protocol(endpoint)
+        self.browser: Optional[Browser] = None
+        self.active_contexts = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def detect_protocol(endpoint: str) -> Literal['playwright', 'cdp']:
+        """
+        Endpoints exposed over http(s) or pointing at `/devtools/` are CDP endpoints,
+        everything else is treated as a Playwright server.
+        """
+
+        if endpoint.startswith(('http://', 'https://')) or '/devtools/' in endpoint:
+            return 'cdp'
+        return 'playwright'
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+class EndpointPool:
+    """
+    Keeps persistent connections to a set of remote browser nodes and routes new
+    contexts to the least loaded healthy node.
+
+    Nodes are connected with retries and exponential backoff. A node that drops is
+    detected through the browser's `disconnected` event and reconnected by the
+    periodic health check, while new contexts are routed to the remaining nodes.
+    Local stand-ins (`playwright run-server`, or Chromium started with
+    `--remote-debugging-port`) can be used in place of production nodes.
+
+    Attributes:
+        playwright (Playwright): The Playwright driver used to connect
+        nodes (List[BrowserNode]): The configured browser nodes
+        connect_timeout (int): The connection timeout in milliseconds
+        max_retries (int): The number of connection attempts per node before giving up
+        health_check_interval (float): The number of seconds between health checks
+    """
+
+    def __init__(
+            self,
+            playwright: Playwright,
+            endpoints: List[str],
+            connect_timeout: int = 30000,
+            max_retries: int = 3,
+            health_check_interval: float = 15.0
+        ) -> None:
+        self.playwright = playwright
+        self.nodes = [BrowserNode(endpoint) for endpoint in endpoints]
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.health_check_interval = health_check_interval
+        self._context_nodes: Dict[int, BrowserNode] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self._reconnecting: Set[str] = set()
+
+    async def connect(self) -> None:
+        """
+        Connects to every node concurrently and starts the background health check.
+
+        Raises:
+            ConnectionError: If no node could be connected
+        """
+
+        await asyncio.gather(*[self._connect_node(node) for node in self.nodes])
+        if not any(node.healthy for node in self.nodes):
+            errors = '; '.join(f"{node.endpoint}: {node.last_error}" for node in self.nodes)
+            raise ConnectionError(f"Could not connect to any browser endpoint ({errors})")
+
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def new_context(self, **kwargs) -> BrowserContext:
+        """
+        Creates a new context on the least loaded healthy node, trying the next node
+        if the chosen one fails.
+
+        Args:
+            **kwargs: Forwarded to `Browser.new_context`
+
+        Returns:
+            BrowserContext: The new context
+        """
+
+        last_error = None
+        for node in self._ranked_nodes():
+            try:
+                context = await node.browser.new_context(**kwargs)
+            except Exception as e:
+                last_error = e
+                node.last_error = str(e)
+                continue
+
+            node.active_contexts += 1
+            self._context_nodes[id(context)] = node
+            context.on('close', lambda _, node=node, key=id(context): self._on_context_closed(node, key))
+            return context
+
+        raise ConnectionError(f"No healthy browser endpoint available: {last_error}")
+
+    def node_for(self, context: BrowserContext) -> Optional[BrowserNode]:
+        """Returns the node a context was routed to."""
+        return self._context_nodes.get(id(context))
+
+    def is_context_alive(self, context: BrowserContext) -> bool:
+        """Whether the node serving the given context is still connected."""
+        node = self.node_for(context)
+        return node is not None and node.healthy
+
+    async def health_check(self) -> None:
+        """
+        Reconnects every node that is currently disconnected.
+        """
+
+        await asyncio.gather(*[self._connect_node(node) for node in self.nodes if not node.healthy])
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Returns the health and load of every node."""
+        return [{
+            'endpoint': node.endpoint,
+            'protocol': node.protocol,
+            'healthy': node.healthy,
+            'active_contexts': node.active_contexts,
+            'last_error': node.last_error
+        } for node in self.nodes]
+
+    async def close(self) -> None:
+        """
+        Stops the health check and closes every connection.
+        """
+
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+        for node in self.nodes:
+            if node.browser:
+                try:
+                    await node.browser.close()
+                except Exception as e:
+                    print(f"Error closing browser endpoint {node.endpoint}: {e}")
+                node.browser = None
+
+    def _ranked_nodes(self) -> List[BrowserNode]:
+        healthy_nodes = [node for node in self.nodes if node.healthy]
+        return sorted(healthy_nodes, key=lambda node: (node.active_contexts, node.failures))
+
+    async def _connect_node(self, node: BrowserNode) -> None:
+        if node.endpoint in self._reconnecting:
+            return
+        self._reconnecting.add(node.endpoint)
+
+        try:
+            for attempt in range(self.max_retries):
+                try:
+                    if node.protocol == 'cdp':
+                        browser = await self.playwright.chromium.connect_over_cdp(node.endpoint, timeout=self.connect_timeout)
+                    else:
+                        browser = await self.playwright.chromium.connect(node.endpoint, timeout=self.connect_timeout)
+                except Exception as e:
+                    node.failures += 1
+                    node.last_error = str(e)
+                    if attempt < self.max_retries - 1:
+                        await asyncio.sleep(min(2 ** attempt, 10) + random.uniform(0, 0.5))
+                    continue
+
+                node.browser = browser
+                node.failures = 0
+                node.last_error = None
+                node.active_contexts = 0
+                browser.on('disconnected', lambda _, node=node: self._on_disconnected(node))
+                return
+        finally:
+            self._reconnecting.discard(node.endpoint)
+
+    async def _health_check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                print(f"Error during browser endpoint health check: {e}")
+
+    def _on_disconnected(self, node: BrowserNode) -> None:
+        print(f"Browser endpoint disconnected: {node.endpoint}")
+        node.browser = None
+        node.last_error = 'disconnected'
+        for key in [key for key, context_node in self._context_nodes.items() if context_node is node]:
+            del self._context_nodes[key]
+        node.active_contexts = 0
+
+    def _on_context_closed(self, node: BrowserNode, key: int) -> None:
+        if self._context_nodes.pop(key, None) is not None:
+            node.active_contexts = max(0, node.active_contexts - 1)
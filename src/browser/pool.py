@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Set, Tuple
+import asyncio
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+class PooledContext:
+    """
+    A pre-warmed browser context together with its ready-to-use page.
+
+    Attributes:
+        context (BrowserContext): The stealth-applied browser context
+        page (Page): A page of the context already sitting on `about:blank`
+    """
+
+    def __init__(self, context: BrowserContext, page: Page) -> None:
+        self.context = context
+        self.page = page
+
+class ContextPool:
+    """
+    Keeps a small number of pre-warmed browser contexts ready for a long-lived browser.
+
+    Leasing a context is just a pop from the idle list, so starting a task does not pay
+    for context creation, stealth injection or the first navigation. A context serves a
+    single task: on release it is closed, so cookies, storage, IndexedDB, service workers
+    and the HTTP cache never leak into the next task, and the idle list is refilled with
+    fresh contexts in the background.
+
+    Attributes:
+        factory (Callable[[], Awaitable[BrowserContext]]): Creates a new stealth-applied context
+        size (int): The number of idle contexts to keep warm
+    """
+
+    def __init__(self, factory: Callable[[], Awaitable[BrowserContext]], size: int = 2) -> None:
+        self.factory = factory
+        self.size = size
+        self._idle: List[PooledContext] = []
+        self._leased: Dict[int, PooledContext] = {}
+        self._warming = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def fill(self) -> None:
+        """
+        Warms up contexts until the idle pool reaches its target size.
+        """
+
+        needed = self.size - len(self._idle) - self._warming
+        if needed <= 0 or self._closed:
+            return
+
+        self._warming += needed
+        try:
+            entries = await asyncio.gather(*[self._warm() for _ in range(needed)], return_exceptions=True)
+        finally:
+            self._warming -= needed
+
+        for entry in entries:
+            if isinstance(entry, PooledContext):
+                if self._closed:
+                    await self._dispose(entry)
+                else:
+                    self._idle.append(entry)
+            else:
+                print(f"Error warming browser context: {entry}")
+
+    async def acquire(self) -> Tuple[BrowserContext, Page]:
+        """
+        Leases a warm context and its blank page. Falls back to creating one on the spot
+        if the pool is empty, and schedules a background refill either way.
+
+        Returns:
+            Tuple[BrowserContext, Page]: The leased context and its page
+        """
+
+        entry = None
+        while self._idle:
+            candidate = self._idle.pop()
+            browser = candidate.context.browser
+            if browser is None or browser.is_connected():
+                entry = candidate
+                break
+            await self._dispose(candidate)
+        if entry is None:
+            entry = await self._warm()
+
+        self._leased[id(entry.context)] = entry
+        self._schedule_fill()
+        return entry.context, entry.page
+
+    async def release(self, context: BrowserContext) -> None:
+        """
+        Closes a leased context. The next task gets a fresh pre-warmed one, a used context
+        is never handed out again.
+
+        Args:
+            context (BrowserContext): The context previously handed out by `acquire`
+        """
+
+        entry = self._leased.pop(id(context), None)
+        if entry is None:
+            await context.close()
+            return
+
+        await self._dispose(entry)
+        self._schedule_fill()
+
+    async def close(self) -> None:
+        """
+        Closes every idle and leased context and stops pending warm-ups.
+        """
+
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        entries = self._idle + list(self._leased.values())
+        self._idle = []
+        self._leased = {}
+        for entry in entries:
+            await self._dispose(entry)
+
+    async def _warm(self) -> PooledContext:
+        context = await self.factory()
+        page = await context.new_page()
+        await page.goto('about:blank')
+        return PooledContext(context, page)
+
+    async def _dispose(self, entry: PooledContext) -> None:
+        try:
+            await entry.context.close()
+        except Exception as e:
+            print(f"Error closing browser context: {e}")
+
+    def _schedule_fill(self) -> None:
+        if self._closed:
+            return
+        task = asyncio.create_task(self.fill())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urljoin, urldefrag
+import asyncio
+import re
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+URL_PATTERN = re.compile(r'https?://[^\s,\'"<>]+')
+
+NEXT_PATTERNS = [
+    r'^next',
+    r'next page',
+    r'^more results',
+    r'^older',
+    r'^[›»→]$',
+]
+
+class Prefetcher:
+    """
+    Speculatively loads the pages the agent is likely to navigate to next.
+
+    While the model is planning, the predicted URLs (pagination "Next" links and URLs of the
+    user query that were not visited yet) are opened in background tabs of the current context.
+    If the model then navigates to one of them, `swap_in` hands the already loaded tab over
+    to the agent instead of loading the URL again.
+
+    Attributes:
+        max_pages (int): The maximum number of background tabs kept at a time
+        timeout (int): The navigation timeout of a prefetch in milliseconds
+        prefetched (int): The number of prefetches started
+        hits (int): The number of prefetched pages that were used by a navigation
+        wasted (int): The number of prefetched pages that were thrown away unused
+    """
+
+    def __init__(self, max_pages: int = 2, timeout: int = 15000) -> None:
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.prefetched = 0
+        self.hits = 0
+        self.wasted = 0
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._on_swap: Optional[Callable[[Page], Awaitable[None]]] = None
+
+    def attach(self, on_swap: Callable[[Page], Awaitable[None]]) -> None:
+        """
+        Sets the callback that makes a prefetched page the agent's current page.
+        """
+        self._on_swap = on_swap
+
+    @staticmethod
+    def normalize_url(url: str, base_url: str = '') -> str:
+        url = urljoin(base_url, url.strip()) if base_url else url.strip()
+        return urldefrag(url)[0].rstrip('/')
+
+    def predict(
+            self,
+            interactive_elements: List[Dict[str, Any]],
+            query: str,
+            current_url: str,
+            visited_urls: List[str]
+        ) -> List[str]:
+        """
+        Predicts the URLs the agent is most likely to navigate to next.
+
+        Args:
+            interactive_elements (List[Dict[str, Any]]): The raw interactive elements of the current page
+            query (str): The user query
+            current_url (str): The URL of the current page
+            visited_urls (List[str]): The URLs the agent already navigated to
+
+        Returns:
+            List[str]: At most `max_pages` absolute URLs, most likely first
+        """
+
+        skip = {self.normalize_url(url) for url in visited_urls + [current_url]}
+        candidates = []
+
+        for element in interactive_elements:
+            attributes = element.get('attributes') or {}
+            href = attributes.get('href')
+            if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
+                continue
+
+            name = str(element.get('name', '')).lower().strip()
+            rel = str(attributes.get('rel', '')).lower()
+            label = str(attributes.get('aria-label', '')).lower()
+            if 'next' in rel or 'next' in label or any(re.search(pattern, name) for pattern in NEXT_PATTERNS):
+                candidates.append(self.normalize_url(href, current_url))
+
+        candidates.extend(self.normalize_url(url.rstrip('.')) for url in URL_PATTERN.findall(query))
+
+        predicted = []
+        for url in candidates:
+            if url not in skip and url not in predicted:
+                predicted.append(url)
+        return predicted[:self.max_pages]
+
+    async def prefetch(self, context: BrowserContext, urls: List[str]) -> None:
+        """
+        Starts loading the given URLs in background tabs without waiting for them.
+        The oldest prefetches are evicted when more than `max_pages` would be open.
+        """
+
+        for url in urls:
+            if url in self._pending:
+                continue
+
+            while len(self._pending) >= self.max_pages:
+                oldest = next(iter(self._pending))
+                await self._discard(self._pending.pop(oldest))
+
+            self._pending[url] = asyncio.create_task(self._load(context, url))
+            self.prefetched += 1
+
+    async def swap_in(self, url: str) -> bool:
+        """
+        Makes the prefetched page for the URL the agent's current page.
+
+        Returns:
+            bool: True on a prefetch hit, False if the URL has to be loaded normally
+        """
+
+        task = self._pending.pop(self.normalize_url(url), None)
+        if task is None or self._on_swap is None:
+            return False
+
+        try:
+            page = await task
+        except Exception:
+            self.wasted += 1
+            return False
+
+        self.hits += 1
+        await self._on_swap(page)
+        return True
+
+    async def discard_all(self) -> None:
+        """
+        Closes every unused prefetched page.
+        """
+
+        tasks = list(self._pending.values())
+        self._pending.clear()
+        for task in tasks:
+            await self._discard(task)
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the prefetch counters and hit rate."""
+        return {
+            'prefetched': self.prefetched,
+            'hits': self.hits,
+            'wasted': self.wasted,
+            'hit_rate': round(self.hits / self.prefetched, 3) if self.prefetched else 0.0
+        }
+
+    async def _load(self, context: BrowserContext, url: str) -> Page:
+        page = await context.new_page()
+        try:
+            await page.goto(url, timeout=self.timeout, wait_until='domcontentloaded')
+        except BaseException:
+            await page.close()
+            raise
+        return page
+
+    async def _discard(self, task: asyncio.Task) -> None:
+        self.wasted += 1
+        if not task.done():
+            task.cancel()
+        try:
+            page = await task
+            await page.close()
+        except BaseException:
+            pass
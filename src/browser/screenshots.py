@@ -0,0 +1,217 @@
+from __future__ import annotations
+from ..tracing import start_span
+from typing import TYPE_CHECKING, Any, Dict, Literal, Optional, Set, Tuple
+import asyncio
+import base64
+import os
+import shutil
+import time
+
+if TYPE_CHECKING:
+    from playwright.async_api import CDPSession, Page
+
+DEFAULT_SCREENSHOT_DIR = os.path.join(os.path.dirname(__file__), '../../screenshots')
+
+class FrameGrabber:
+    """
+    Captures the viewport as an image encoded by the browser, downscaled to `max_width`.
+    Chromium pages are captured over a cached CDP session, other browsers with `page.screenshot`.
+
+    Attributes:
+        image_format (Literal['jpeg', 'png']): The image format, JPEG is much cheaper to encode
+        quality (int): The JPEG quality (0-100)
+        max_width (Optional[int]): Captures wider than this are scaled down, None keeps the viewport size
+    """
+
+    def __init__(self, image_format: Literal['jpeg', 'png'] = 'jpeg', quality: int = 70, max_width: Optional[int] = 1280) -> None:
+        self.image_format = image_format
+        self.quality = quality
+        self.max_width = max_width
+        self._cdp: Optional[Tuple[Page, Optional[CDPSession]]] = None
+
+    async def grab(self, page: Page, clip: Optional[Dict[str, float]] = None) -> bytes:
+        """
+        Captures the viewport of the page, or the `clip` region (viewport CSS pixels) at full resolution.
+        """
+
+        session = await self._cdp_session(page)
+        if session is not None:
+            params: Dict[str, Any] = {'format': self.image_format, 'captureBeyondViewport': False}
+            if self.image_format == 'jpeg':
+                params['quality'] = self.quality
+            scale = 1.0 if clip else await self.scale(page)
+            if clip or scale < 1:
+                # CDP clips are in document coordinates
+                viewport = (await session.send('Page.getLayoutMetrics'))['cssVisualViewport']
+                region = clip or {'x': 0, 'y': 0, 'width': viewport['clientWidth'], 'height': viewport['clientHeight']}
+                params['clip'] = {
+                    'x': viewport['pageX'] + region['x'], 'y': viewport['pageY'] + region['y'],
+                    'width': region['width'], 'height': region['height'],
+                    'scale': scale
+                }
+            response = await session.send('Page.captureScreenshot', params)
+            return base64.b64decode(response['data'])
+
+        options: Dict[str, Any] = {'type': self.image_format, 'scale': 'css'}
+        if clip:
+            options['clip'] = clip
+        if self.image_format == 'jpeg':
+            options['quality'] = self.quality
+        return await page.screenshot(**options)
+
+    async def _cdp_session(self, page: Page) -> Optional[CDPSession]:
+        if self._cdp and self._cdp[0] is page:
+            return self._cdp[1]
+
+        session = None
+        try:
+            session = await page.context.new_cdp_session(page)
+        except Exception:
+            # CDP is only available on Chromium
+            pass
+        self._cdp = (page, session)
+        return session
+
+    async def scale(self, page: Page) -> float:
+        """
+        The factor the viewport is scaled by to fit `max_width`.
+        """
+
+        if not self.max_width:
+            return 1.0
+        viewport = page.viewport_size
+        width = viewport['width'] if viewport else await page.evaluate('() => window.innerWidth')
+        return min(1.0, self.max_width / width) if width else 1.0
+
+    def reset(self) -> None:
+        self._cdp = None
+
+class ScreenshotWriter:
+    """
+    Captures step screenshots without holding up the agent loop.
+
+    The browser encodes a downscaled JPEG (through a CDP capture on Chromium, `page.screenshot`
+    elsewhere), and the bytes are handed to a background task that writes them to disk. When
+    the queue is full the frame is dropped instead of making the loop wait.
+
+    Attributes:
+        directory (str): The directory the sessions are written to, one sub-directory per session
+        grabber (FrameGrabber): Captures the frames, built from `image_format`, `quality` and `max_width`
+        every_n (int): Captures every n-th step only
+        only_on_error (bool): Captures only the steps whose action failed
+        queue_size (int): The number of frames waiting to be written before new ones are dropped
+        archive (bool): Whether every session directory is zipped on `close`
+    """
+
+    def __init__(
+            self,
+            directory: str = DEFAULT_SCREENSHOT_DIR,
+            image_format: Literal['jpeg', 'png'] = 'jpeg',
+            quality: int = 70,
+            max_width: Optional[int] = 1280,
+            every_n: int = 1,
+            only_on_error: bool = False,
+            queue_size: int = 8,
+            archive: bool = False
+        ) -> None:
+        self.directory = directory
+        self.grabber = FrameGrabber(image_format, quality, max_width)
+        self.every_n = max(1, every_n)
+        self.only_on_error = only_on_error
+        self.queue_size = queue_size
+        self.archive = archive
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._created_dirs: Set[str] = set()
+        self._sessions: Set[str] = set()
+        self._stats = {'captured': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'capture_ms': 0.0}
+
+    def should_capture(self, step: int, error: bool = False) -> bool:
+        if self.only_on_error:
+            return error
+        return error or step % self.every_n == 0
+
+    async def capture(self, page: Page, session: str, step: int, error: bool = False, prefix: str = '') -> Optional[str]:
+        """
+        Captures the page and queues the image for writing.
+
+        Args:
+            page (Page): The page to capture
+            session (str): The session the screenshot belongs to, names its directory
+            step (int): The step number, used for sampling and the file name
+            error (bool): Whether the action of the step failed
+            prefix (str): Prepended to the file name, e.g. 'replay_'
+
+        Returns:
+            Optional[str]: The path the screenshot will be written to, None if it was skipped or dropped
+        """
+
+        if not self.should_capture(step, error):
+            return None
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize = self.queue_size)
+            self._worker = asyncio.create_task(self._write_loop())
+
+        start = time.perf_counter()
+        try:
+            with start_span('screenshot.capture', format = self.grabber.image_format):
+                data = await self.grabber.grab(page)
+        except Exception as e:
+            self._stats['failed'] += 1
+            print(f"Screenshot failed: {e}")
+            return None
+        self._stats['capture_ms'] += (time.perf_counter() - start) * 1000
+        self._stats['captured'] += 1
+
+        extension = 'jpg' if self.grabber.image_format == 'jpeg' else 'png'
+        path = os.path.join(self.directory, session, f'{prefix}step_{step:04d}{"_error" if error else ""}.{extension}')
+        try:
+            self._queue.put_nowait((path, data))
+        except asyncio.QueueFull:
+            self._stats['dropped'] += 1
+            return None
+        self._sessions.add(session)
+        return path
+
+    async def _write_loop(self) -> None:
+        while True:
+            path, data = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._write, path, data)
+                self._stats['written'] += 1
+            except Exception as e:
+                self._stats['failed'] += 1
+                print(f"Failed to write screenshot {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path: str, data: bytes) -> None:
+        directory = os.path.dirname(path)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok = True)
+            self._created_dirs.add(directory)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    async def close(self) -> None:
+        """
+        Waits for the queued screenshots to be written, stops the writer and archives the sessions.
+        """
+
+        if self._worker is not None and not self._worker.done():
+            await self._queue.join()
+            self._worker.cancel()
+        self._worker = None
+        self.grabber.reset()
+
+        if self.archive:
+            for session in self._sessions:
+                session_dir = os.path.join(self.directory, session)
+                if os.path.isdir(session_dir):
+                    await asyncio.to_thread(shutil.make_archive, session_dir, 'zip', session_dir)
+        self._sessions.clear()
+
+    def stats(self) -> Dict[str, float]:
+        captured = self._stats['captured']
+        return {**self._stats, 'avg_capture_ms': self._stats['capture_ms'] / captured if captured else 0.0}
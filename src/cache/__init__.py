@@ -0,0 +1,146 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import time
+
+class DiskCache:
+    """
+    A content-addressed, on-disk JSON cache.
+
+    Every entry lives in its own file named after the sha256 of its key, so entries can be
+    written concurrently by several processes and inspected by hand. Entries older than `ttl`
+    are treated as missing, and the oldest entries are evicted once the cache grows beyond
+    `max_size_mb`. An entry file is only ever written by `set`, so its modification time is the
+    time it was created and expiry is the same for lookups and eviction.
+
+    Attributes:
+        directory (str): The directory the entries are stored in
+        ttl (Optional[float]): The lifetime of an entry in seconds, None to keep entries forever
+        max_size_mb (Optional[float]): The size (in MB) above which old entries are evicted
+        hits (int): The number of lookups answered from the cache
+        misses (int): The number of lookups that found no fresh entry
+    """
+
+    # Eviction walks the whole directory, so it only runs every few writes
+    EVICT_EVERY = 50
+
+    def __init__(self, directory: str, ttl: Optional[float] = None, max_size_mb: Optional[float] = 512) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size_mb = max_size_mb
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Hashes JSON-serializable parts into a stable cache key.
+        """
+
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the cached value for the key, None if it is missing or expired.
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry.get('created_at', 0) > self.ttl:
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.get('value')
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a JSON-serializable value under the key, evicting old entries if needed.
+        """
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': time.time(), 'value': value}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> int:
+        """
+        Removes expired entries, then the oldest ones until the cache fits `max_size_mb`.
+
+        Returns:
+            int: The number of entries removed
+        """
+
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total_size = sum(size for _, size, _ in entries)
+        max_size = self.max_size_mb * 1024 * 1024 if self.max_size_mb is not None else None
+
+        removed = 0
+        for path, size, created_at in entries:
+            expired = self.ttl is not None and now - created_at > self.ttl
+            if not expired and (max_size is None or total_size <= max_size):
+                continue
+            try:
+                os.remove(path)
+                total_size -= size
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the hit counters and the current size of the cache."""
+        entries = list(self._entries())
+        return {
+            'entries': len(entries),
+            'size_mb': round(sum(size for _, size, _ in entries) / (1024 * 1024), 3),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / (self.hits + self.misses), 3) if self.hits + self.misses else 0.0
+        }
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
@@ -1,48 +1,194 @@
-from playwright.async_api import Page
+from __future__ import annotations
 from .state import DOMState
-from typing import List
+from .compact import CompactElements, StringTable, decode_packed_state, json_default
+from .frames import FRAME_SEPARATOR, shift_elements
+from ..tracing import start_span
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
 import os
 
+if TYPE_CHECKING:
+    from playwright.async_api import Frame, Page
+
+STATE_KEYS = {
+    'interactive_elements': 'interactiveElements',
+    'informative_elements': 'informativeElements',
+    'scrollable_elements': 'scrollableElements'
+}
+
 class DOM:
     """
     DOM class for managing DOM instances.
 
     Attributes:
         page (Page): The page instance to use for the DOM
+        compact (bool): Whether the snapshot is transferred packed (`getElementsPacked()`) and kept as
+            `CompactElements` (columns and a shared string table) instead of lists of dicts
+        frames (bool): Whether the visible child frames (iframes) are extracted too, concurrently with the
+            main frame. Their elements get page coordinates and frame-aware XPaths (`FRAME_SEPARATOR`)
+        max_frames (int): The most child frames extracted, first ones in document order first
+        frame_cache (bool): Whether a child frame whose document and layout did not change since the last state is
+            not extracted again. The main frame is always extracted, hover styles and other changes that neither
+            mutate the document nor move its layout are not seen by the frame version
     """
 
-    def __init__(self, page: Page) -> None:
+    def __init__(self, page: Page, compact: bool = True, frames: bool = True, max_frames: int = 10, frame_cache: bool = True) -> None:
         self.page = page
+        self.compact = compact
+        self.frames = frames
+        self.max_frames = max_frames
+        self.frame_cache = frame_cache
+        # Frame → (version of `getFrameVersion()`, elements of the frame in its own coordinates)
+        self._frame_states: Dict[Frame, Tuple[str, Dict[str, Any]]] = {}
+        with open(os.path.join(os.path.dirname(__file__), 'script.js')) as f:
+            self._script = f.read()
 
     async def get_state(self) -> DOMState | Exception:
         try:
-            script_path = os.path.join(os.path.dirname(__file__), 'script.js')
-            with open(script_path) as f:
-                script = f.read()
-            
-            await self.page.wait_for_load_state('networkidle', timeout=10000)
-            all_elements = await self.page.evaluate(f"""{script}\ngetElements()""") 
-            
-            return DOMState(
-                interactive_elements = all_elements.get('interactiveElements', []),
-                informative_elements = all_elements.get('informativeElements', []),
-                scrollable_elements = all_elements.get('scrollableElements', [])
-            )
+            with start_span('wait.networkidle', caller='dom.get_state'):
+                await self.page.wait_for_load_state('networkidle', timeout=10000)
+
+            with start_span('dom.evaluate', format = 'packed' if self.compact else 'objects') as span:
+                # The child frames are located while the main frame is extracted
+                main_state, child_frames = await asyncio.gather(
+                    self._frame_state(self.page.main_frame),
+                    self._child_frames()
+                )
+                child_states = await asyncio.gather(
+                    *(self._frame_state(frame) for frame, _, _ in child_frames),
+                    return_exceptions = True
+                )
+                span.set_attribute('frames', 1 + len(child_frames))
+
+            # A child frame that detached or failed meanwhile is left out, the rest of the page is still usable
+            frames = [('', (0.0, 0.0), main_state)] + [
+                (prefix, offset, state) for (_, prefix, offset), state in zip(child_frames, child_states)
+                if not isinstance(state, BaseException)
+            ]
+            live = {self.page.main_frame} | {frame for frame, _, _ in child_frames}
+            self._frame_states = {frame: cached for frame, cached in self._frame_states.items() if frame in live}
+
+            with start_span('dom.merge', frames = len(frames)):
+                return self._merge(frames)
         except Exception as e:
             return e
 
-    async def get_interactive_elements(self) -> List[dict]:
-        """Returns the raw interactive elements as a list of dictionaries."""
+    async def _frame_state(self, frame: Frame) -> Dict[str, Any]:
+        """
+        The elements of one frame in the frame coordinates, from the cache when its document did not change.
+        """
+
+        is_main = frame == self.page.main_frame
+        known = self._frame_states.get(frame) if self.frame_cache and not is_main else None
+        with start_span('dom.frame', main = is_main) as span:
+            # Child frames leave their offset out, it is added when merging
+            snapshot = await frame.evaluate(
+                f"{self._script}\ngetFrameSnapshot({json.dumps(known[0] if known else None)}, {json.dumps(self.compact)}, {json.dumps(is_main)})"
+            )
+            span.set_attribute('cache.hit', snapshot['elements'] is None)
+            if snapshot['elements'] is None:
+                return known[1]
+
+            if self.compact:
+                span.set_attribute('payload.bytes', len(snapshot['elements']))
+                with start_span('dom.decode'):
+                    state = decode_packed_state(snapshot['elements'])
+            else:
+                state = {key: snapshot['elements'].get(script_key, []) for key, script_key in STATE_KEYS.items()}
+        self._frame_states[frame] = (snapshot['version'], state)
+        return state
+
+    async def _child_frames(self) -> List[Tuple[Frame, str, Tuple[float, float]]]:
+        """
+        Finds the child frames worth extracting, one nesting level at a time: the attached frames
+        shown inside the viewport, up to `max_frames`.
+
+        Returns:
+            List[Tuple[Frame, str, Tuple[float, float]]]: Every frame with its XPath prefix and its offset in the page
+        """
+
+        if not self.frames:
+            return []
+        viewport = self.page.viewport_size or await self.page.evaluate('() => ({width: window.innerWidth, height: window.innerHeight})')
+        located = []
+        level = [(frame, '') for frame in self.page.main_frame.child_frames]
+        while level and len(located) < self.max_frames:
+            results = await asyncio.gather(
+                *(self._locate_frame(frame, prefix, viewport) for frame, prefix in level),
+                return_exceptions = True
+            )
+            found = [result for result in results if result and not isinstance(result, BaseException)]
+            found = found[:self.max_frames - len(located)]
+            located.extend(found)
+            level = [(child, prefix) for frame, prefix, _ in found for child in frame.child_frames]
+        return located
+
+    async def _locate_frame(self, frame: Frame, parent_prefix: str, viewport: Dict[str, float]) -> Optional[Tuple[Frame, str, Tuple[float, float]]]:
+        """
+        The XPath prefix and page offset of a child frame, None when it is detached or not shown.
+        """
+
+        if frame.is_detached():
+            return None
+        element = await frame.frame_element()
+        # Relative to the viewport of the main frame, whatever the nesting
+        box = await element.bounding_box()
+        if (
+            not box or box['width'] <= 0 or box['height'] <= 0
+            or box['x'] >= viewport['width'] or box['y'] >= viewport['height']
+            or box['x'] + box['width'] <= 0 or box['y'] + box['height'] <= 0
+        ):
+            return None
+        # Evaluated in the parent frame, where the iframe element lives. The frame content starts inside its border and padding
+        xpath, inset_x, inset_y = await element.evaluate(
+            f"(element) => {{\n{self._script}\nconst style = getComputedStyle(element);\n"
+            "return [getXPath(element), parseFloat(style.borderLeftWidth) + parseFloat(style.paddingLeft), "
+            "parseFloat(style.borderTopWidth) + parseFloat(style.paddingTop)];\n}"
+        )
+        return frame, f'{parent_prefix}{xpath}{FRAME_SEPARATOR}', (box['x'] + inset_x, box['y'] + inset_y)
+
+    def _merge(self, frames: List[Tuple[str, Tuple[float, float], Dict[str, Any]]]) -> DOMState:
+        """
+        Merges the elements of the frames into one state, in page coordinates.
+
+        Args:
+            frames (List[Tuple[str, Tuple[float, float], Dict[str, Any]]]): The XPath prefix, offset and elements of
+                every frame, the main frame first
+        """
+
+        _, _, main_state = frames[0]
+        if len(frames) == 1:
+            # Compact lists are never modified in place, the lists of dicts are copied to keep the cache intact
+            return DOMState(**(main_state if self.compact else {key: list(elements) for key, elements in main_state.items()}))
+
+        if self.compact:
+            # A fresh list, the cached frame states are left untouched
+            strings = StringTable()
+            merged = {key: CompactElements(elements.fields, strings) for key, elements in main_state.items()}
+            for prefix, offset, state in frames:
+                for key, elements in state.items():
+                    merged[key].extend(elements, prefix, offset)
+            return DOMState(**merged)
+
+        merged = {key: list(elements) for key, elements in main_state.items()}
+        for prefix, (dx, dy), state in frames[1:]:
+            for key, elements in state.items():
+                merged[key].extend(shift_elements(elements, prefix, dx, dy))
+        return DOMState(**merged)
+
+    async def get_interactive_elements(self) -> List[dict] | CompactElements:
+        """Returns the raw interactive elements, as dict-like views when the state is compact."""
         state = await self.get_state()
         return state.get('interactive_elements', [])
 
-    async def get_informative_elements(self) -> List[dict]:
-        """Returns the raw informative elements as a list of dictionaries."""
+    async def get_informative_elements(self) -> List[dict] | CompactElements:
+        """Returns the raw informative elements, as dict-like views when the state is compact."""
         state = await self.get_state()
         return state.get('informative_elements', [])
 
-    async def get_scrollable_elements(self) -> List[dict]:
-        """Returns the raw scrollable elements as a list of dictionaries."""
+    async def get_scrollable_elements(self) -> List[dict] | CompactElements:
+        """Returns the raw scrollable elements, as dict-like views when the state is compact."""
         state = await self.get_state()
         return state.get('scrollable_elements', [])
 
@@ -58,8 +204,10 @@ class DOM:
         raw_elements = await self.get_state()
         return self.format_elements_for_prompt(raw_elements.get('scrollable_elements', []))
 
-    def format_elements_for_prompt(self, elements: List[dict]) -> str:
-        """Helper method to convert a list of element dicts into a string."""
+    def format_elements_for_prompt(self, elements: Sequence[dict] | CompactElements) -> str:
+        """Helper method to convert a list of element dicts, or compact elements, into a string."""
+        if isinstance(elements, CompactElements):
+            return '\n'.join(elements.prompt_lines())
         return '\n'.join([self.to_prompt_string(element, i) for i, element in enumerate(elements)])
 
     def to_prompt_string(self, element: dict, index: int) -> str:
@@ -0,0 +1,462 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import math
+
+INTERACTIVE_FIELDS = ('tag', 'role', 'name', 'attributes', 'box', 'center', 'xpath')
+INFORMATIVE_FIELDS = ('tag', 'role', 'content', 'center', 'xpath')
+SCROLLABLE_FIELDS = ('tag', 'role', 'name', 'attributes', 'xpath')
+
+BOX_KEYS = ('left', 'top', 'width', 'height')
+CENTER_KEYS = ('x', 'y')
+
+NAN = float('nan')
+
+# Version of the packed snapshot of `getElementsPacked()` in script.js
+PACKED_FORMAT_VERSION = 1
+
+def _number(value: float) -> int | float:
+    # JSON gives whole numbers back as ints, keep them that way in the views and the prompt
+    return int(value) if value.is_integer() else value
+
+class StringTable:
+    """
+    The strings of one DOM snapshot, stored once and referenced by id. Tags, roles, attribute
+    names and values, and the parent paths of the XPaths repeat across thousands of elements.
+
+    Attributes:
+        values (List[str]): The strings by id
+    """
+
+    def __init__(self, values: Optional[List[str]] = None) -> None:
+        self.values: List[str] = values if values is not None else []
+        # Built on the first `add`, a decoded snapshot is usually only read
+        self._ids: Optional[Dict[str, int]] = None if values else {}
+
+    def add(self, value: Optional[str]) -> int:
+        """
+        Returns the id of the string, -1 for None.
+        """
+
+        if value is None:
+            return -1
+        if self._ids is None:
+            self._ids = {string: string_id for string_id, string in enumerate(self.values)}
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return string_id
+
+    def get(self, string_id: int) -> Optional[str]:
+        return self.values[string_id] if string_id >= 0 else None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class ElementView(Mapping):
+    """
+    A read-only, dict-like view of one element of `CompactElements`. Values are built from the
+    columns on access, so `element.get('xpath')` never materializes the rest of the element.
+
+    A view is a `Mapping`, not a dict, so `json.dumps` cannot serialize it on its own: convert it
+    with `dict(view)` or `CompactElements.to_dicts()`, or pass `default=json_default`.
+    """
+
+    __slots__ = ('_elements', '_index')
+
+    def __init__(self, elements: 'CompactElements', index: int) -> None:
+        self._elements = elements
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._elements.value(self._index, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._elements.fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._elements.fields)
+
+    def __len__(self) -> int:
+        return len(self._elements.fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class CompactElements(Sequence):
+    """
+    A columnar list of DOM elements. Tags, roles, names, attributes and XPaths are ids into a
+    `StringTable` shared by the lists of a snapshot, boxes and centers are packed into float
+    arrays, and an XPath is kept as its interned parent path plus its last step. Indexing
+    returns an `ElementView`, so code written for the list of dicts keeps working.
+
+    Attributes:
+        fields (Tuple[str, ...]): The keys of the elements, in the order the page script produces them
+        strings (StringTable): The shared strings
+    """
+
+    def __init__(self, fields: Tuple[str, ...], strings: Optional[StringTable] = None) -> None:
+        self.fields = fields
+        self.strings = strings if strings is not None else StringTable()
+        self._text_key = 'content' if 'content' in fields else 'name'
+        self._tags = array('i')
+        self._roles = array('i')
+        self._texts = array('i')
+        self._xpath_parents = array('i')
+        self._xpath_steps = array('i')
+        # Attribute (name, value) id pairs of element i are _attributes[2 * _offsets[i]:2 * _offsets[i + 1]]
+        self._attribute_offsets = array('i', [0])
+        self._attributes = array('i')
+        self._boxes = array('d')
+        self._centers = array('d')
+
+    @classmethod
+    def from_dicts(cls, elements: Iterable[Dict[str, Any]], fields: Tuple[str, ...], strings: Optional[StringTable] = None) -> 'CompactElements':
+        """
+        Packs the elements returned by `getElements()` of `script.js`.
+
+        Args:
+            elements (Iterable[Dict[str, Any]]): The elements as dicts
+            fields (Tuple[str, ...]): The keys of the elements, e.g. `INTERACTIVE_FIELDS`
+            strings (Optional[StringTable]): The table shared with the other lists of the snapshot
+        """
+
+        compact = cls(fields, strings)
+        for element in elements:
+            compact.append(element)
+        return compact
+
+    @classmethod
+    def from_columns(
+            cls,
+            fields: Tuple[str, ...],
+            strings: StringTable,
+            ids: List[int],
+            attribute_offsets: List[int],
+            attributes: List[int],
+            boxes: List[Optional[float]],
+            centers: List[Optional[float]]
+        ) -> 'CompactElements':
+        """
+        Builds the columns from one list of a packed snapshot, see `decode_packed_state`.
+
+        Args:
+            fields (Tuple[str, ...]): The keys of the elements
+            strings (StringTable): The string table of the snapshot
+            ids (List[int]): Tag, role, name (or content), XPath parent and XPath step ids, five per element
+            attribute_offsets (List[int]): Where the attribute pairs of every element start, plus the end
+            attributes (List[int]): Attribute name and value ids
+            boxes (List[Optional[float]]): Left, top, width and height of every element, null when missing
+            centers (List[Optional[float]]): X and y of every element, null when missing
+        """
+
+        compact = cls(fields, strings)
+        compact._tags = array('i', ids[0::5])
+        compact._roles = array('i', ids[1::5])
+        compact._texts = array('i', ids[2::5])
+        compact._xpath_parents = array('i', ids[3::5])
+        compact._xpath_steps = array('i', ids[4::5])
+        compact._attribute_offsets = array('i', attribute_offsets or [0])
+        compact._attributes = array('i', attributes)
+        # `None in` scans at C speed, the nulls are rare
+        compact._boxes = array('d', [NAN if value is None else value for value in boxes] if None in boxes else boxes)
+        compact._centers = array('d', [NAN if value is None else value for value in centers] if None in centers else centers)
+        return compact
+
+    def append(self, element: Dict[str, Any]) -> None:
+        add = self.strings.add
+        self._tags.append(add(element.get('tag')))
+        self._roles.append(add(element.get('role')))
+        self._texts.append(add(element.get(self._text_key)))
+
+        xpath = element.get('xpath')
+        if xpath is None:
+            self._xpath_parents.append(-1)
+            self._xpath_steps.append(-1)
+        else:
+            parent, separator, step = xpath.rpartition('/')
+            self._xpath_parents.append(add(parent) if separator else -1)
+            self._xpath_steps.append(add(step))
+
+        if 'attributes' in self.fields:
+            for name, value in (element.get('attributes') or {}).items():
+                self._attributes.append(add(name))
+                self._attributes.append(add(value))
+            self._attribute_offsets.append(len(self._attributes) // 2)
+        if 'box' in self.fields:
+            box = element.get('box')
+            self._boxes.extend([box[key] for key in BOX_KEYS] if box else [NAN] * 4)
+        if 'center' in self.fields:
+            center = element.get('center')
+            self._centers.extend([center[key] for key in CENTER_KEYS] if center else [NAN] * 2)
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('element index out of range')
+        return ElementView(self, index)
+
+    def __repr__(self) -> str:
+        return f'CompactElements({len(self)} elements, fields={self.fields})'
+
+    def value(self, index: int, key: str) -> Any:
+        """
+        Builds one field of one element.
+
+        Raises:
+            KeyError: If the elements have no such field
+        """
+
+        if key not in self.fields:
+            raise KeyError(key)
+        get = self.strings.get
+        if key == 'tag':
+            return get(self._tags[index])
+        if key == 'role':
+            return get(self._roles[index])
+        if key == self._text_key:
+            return get(self._texts[index])
+        if key == 'xpath':
+            return self.xpath(index)
+        if key == 'attributes':
+            return self.attributes(index)
+        if key == 'box':
+            box = self._boxes[4 * index:4 * index + 4]
+            return None if math.isnan(box[0]) else dict(zip(BOX_KEYS, map(_number, box)))
+        if key == 'center':
+            center = self._centers[2 * index:2 * index + 2]
+            return None if math.isnan(center[0]) else dict(zip(CENTER_KEYS, map(_number, center)))
+        raise KeyError(key)
+
+    def xpath(self, index: int) -> Optional[str]:
+        step = self.strings.get(self._xpath_steps[index])
+        parent = self._xpath_parents[index]
+        if step is None or parent < 0:
+            return step
+        return f'{self.strings.values[parent]}/{step}'
+
+    def attributes(self, index: int) -> Dict[str, str]:
+        values = self.strings.values
+        pairs = self._attributes[2 * self._attribute_offsets[index]:2 * self._attribute_offsets[index + 1]]
+        return {values[pairs[i]]: values[pairs[i + 1]] for i in range(0, len(pairs), 2)}
+
+    def column(self, key: str) -> List[Any]:
+        """
+        One field of every element, e.g. `column('xpath')`, without building the views.
+        """
+
+        if key in ('tag', 'role', self._text_key):
+            ids = {'tag': self._tags, 'role': self._roles}.get(key, self._texts)
+            values = self.strings.values
+            return [values[string_id] if string_id >= 0 else None for string_id in ids]
+        if key == 'xpath':
+            values = self.strings.values
+            return [
+                (f'{values[parent]}/{values[step]}' if parent >= 0 else values[step]) if step >= 0 else None
+                for parent, step in zip(self._xpath_parents, self._xpath_steps)
+            ]
+        return [self.value(index, key) for index in range(len(self))]
+
+    def attribute_values(self, index: int) -> List[str]:
+        values = self.strings.values
+        return [values[string_id] for string_id in self._attributes[2 * self._attribute_offsets[index] + 1:2 * self._attribute_offsets[index + 1]:2]]
+
+    def take(self, indexes: Iterable[int]) -> 'CompactElements':
+        """
+        A new list holding the given elements, sharing the string table.
+        """
+
+        subset = CompactElements(self.fields, self.strings)
+        for index in indexes:
+            index = int(index)
+            subset._tags.append(self._tags[index])
+            subset._roles.append(self._roles[index])
+            subset._texts.append(self._texts[index])
+            subset._xpath_parents.append(self._xpath_parents[index])
+            subset._xpath_steps.append(self._xpath_steps[index])
+            if 'attributes' in self.fields:
+                subset._attributes.extend(self._attributes[2 * self._attribute_offsets[index]:2 * self._attribute_offsets[index + 1]])
+                subset._attribute_offsets.append(len(subset._attributes) // 2)
+            if 'box' in self.fields:
+                subset._boxes.extend(self._boxes[4 * index:4 * index + 4])
+            if 'center' in self.fields:
+                subset._centers.extend(self._centers[2 * index:2 * index + 2])
+        return subset
+
+    def extend(self, other: 'CompactElements', xpath_prefix: str = '', offset: Tuple[float, float] = (0.0, 0.0)) -> None:
+        """
+        Appends the elements of another list with the same fields, e.g. the snapshot of a child
+        frame. Its strings are interned into this table and the columns are copied whole.
+
+        Args:
+            other (CompactElements): The elements to append
+            xpath_prefix (str): Prepended to the XPaths, the path of the frame element and the separator
+            offset (Tuple[float, float]): Added to the boxes and centers, the position of the frame in the page
+        """
+
+        if other.strings is self.strings:
+            remap = lambda column: column
+        else:
+            mapping = [self.strings.add(value) for value in other.strings.values]
+            remap = lambda column: array('i', [mapping[string_id] if string_id >= 0 else -1 for string_id in column])
+
+        self._tags.extend(remap(other._tags))
+        self._roles.extend(remap(other._roles))
+        self._texts.extend(remap(other._texts))
+        self._xpath_steps.extend(remap(other._xpath_steps))
+        if xpath_prefix:
+            # The parent paths are few, prefix each once
+            parents = {
+                parent: self.strings.add(xpath_prefix + other.strings.values[parent]) if parent >= 0 else -1
+                for parent in set(other._xpath_parents)
+            }
+            self._xpath_parents.extend([parents[parent] for parent in other._xpath_parents])
+        else:
+            self._xpath_parents.extend(remap(other._xpath_parents))
+
+        if 'attributes' in self.fields:
+            base = self._attribute_offsets[-1]
+            self._attribute_offsets.extend([base + start for start in other._attribute_offsets[1:]])
+            self._attributes.extend(remap(other._attributes))
+
+        dx, dy = offset
+        if 'box' in self.fields:
+            boxes = array('d', other._boxes)
+            if dx or dy:
+                for index in range(0, len(boxes), 4):
+                    boxes[index] += dx
+                    boxes[index + 1] += dy
+            self._boxes.extend(boxes)
+        if 'center' in self.fields:
+            centers = array('d', other._centers)
+            if dx or dy:
+                # Centers are whole pixels, as `getElements()` floors them, NaN marks a missing one
+                for index in range(0, len(centers), 2):
+                    if not math.isnan(centers[index]):
+                        centers[index] = math.floor(centers[index] + dx)
+                        centers[index + 1] = math.floor(centers[index + 1] + dy)
+            self._centers.extend(centers)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materializes the elements as plain dicts, e.g. to serialize them."""
+        return [dict(ElementView(self, index)) for index in range(len(self))]
+
+    def prompt_lines(self) -> List[str]:
+        """
+        The lines of `DOM.format_elements_for_prompt`, formatted straight from the columns.
+        """
+
+        tags, roles, texts, xpaths = self.column('tag'), self.column('role'), self.column(self._text_key), self.column('xpath')
+        if self._text_key == 'content':
+            centers = self._format_numbers(self._centers, CENTER_KEYS)
+            return [
+                f"{index} Tag:{tags[index]} Role:{roles[index]} Content:{texts[index]} Center:{centers[index]} Xpath:{xpaths[index]}"
+                for index in range(len(self))
+            ]
+
+        attributes = self._format_attributes()
+        if 'box' not in self.fields:
+            return [
+                f"{index} Tag:{tags[index]} Role:{roles[index]} Name:{texts[index]} Attributes:{attributes[index]} Xpath:{xpaths[index]}"
+                for index in range(len(self))
+            ]
+
+        boxes = self._format_numbers(self._boxes, BOX_KEYS)
+        centers = self._format_numbers(self._centers, CENTER_KEYS)
+        return [
+            f"{index} Tag:{tags[index]} Role:{roles[index]} Name:{texts[index]} Attributes:{attributes[index]} "
+            f"Box:{boxes[index]} Center:{centers[index]} Xpath:{xpaths[index]}"
+            for index in range(len(self))
+        ]
+
+    # The reprs of the dicts the views would build, written without building them
+
+    def _format_attributes(self) -> List[str]:
+        reprs: Dict[int, str] = {}
+        values = self.strings.values
+        formatted = []
+        offsets, pairs = self._attribute_offsets, self._attributes
+        for index in range(len(self)):
+            start, end = 2 * offsets[index], 2 * offsets[index + 1]
+            if start == end:
+                formatted.append('{}')
+                continue
+            parts = []
+            for position in range(start, end):
+                string_id = pairs[position]
+                text = reprs.get(string_id)
+                if text is None:
+                    text = reprs[string_id] = repr(values[string_id])
+                parts.append(text)
+            formatted.append('{' + ', '.join(f'{parts[i]}: {parts[i + 1]}' for i in range(0, len(parts), 2)) + '}')
+        return formatted
+
+    @staticmethod
+    def _format_numbers(column: array, keys: Tuple[str, ...]) -> List[str]:
+        # Boxes repeat the same few numbers, every distinct number is formatted once
+        numbers = list(map(_number, column))
+        reprs = {number: repr(number) for number in set(numbers)}
+        texts = [reprs[number] for number in numbers]
+        template = '{' + ', '.join(f"'{key}': %s" for key in keys) + '}'
+        size = len(keys)
+        return [
+            'None' if numbers[start] != numbers[start] else template % tuple(texts[start:start + size])
+            for start in range(0, len(numbers), size)
+        ]
+
+    def nbytes(self) -> int:
+        """The size of the columns, without the shared string table."""
+        arrays = (
+            self._tags, self._roles, self._texts, self._xpath_parents, self._xpath_steps,
+            self._attribute_offsets, self._attributes, self._boxes, self._centers
+        )
+        return sum(len(column) * column.itemsize for column in arrays)
+
+def json_default(value: Any) -> Any:
+    """
+    The `default` of `json.dumps` for compact elements, e.g. `json.dumps(state, default=json_default)`.
+
+    Raises:
+        TypeError: If the value is neither an `ElementView` nor `CompactElements`
+    """
+
+    if isinstance(value, ElementView):
+        return dict(value)
+    if isinstance(value, CompactElements):
+        return value.to_dicts()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def decode_packed_state(payload: str) -> Dict[str, CompactElements]:
+    """
+    Decodes the packed snapshot of `getElementsPacked()` into compact element lists sharing one
+    string table. The payload is parsed by the C JSON decoder and the flat lists are copied
+    straight into the arrays, no per-element object is created.
+
+    Args:
+        payload (str): The JSON string returned by `getElementsPacked()`
+
+    Returns:
+        Dict[str, CompactElements]: The `interactive_elements`, `informative_elements` and `scrollable_elements`
+
+    Raises:
+        ValueError: If the payload was packed by another version of the script
+    """
+
+    version, values, interactive, informative, scrollable = json.loads(payload)
+    if version != PACKED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported packed DOM format version {version}, expected {PACKED_FORMAT_VERSION}")
+
+    strings = StringTable(values)
+    return {
+        'interactive_elements': CompactElements.from_columns(INTERACTIVE_FIELDS, strings, *interactive),
+        'informative_elements': CompactElements.from_columns(INFORMATIVE_FIELDS, strings, *informative),
+        'scrollable_elements': CompactElements.from_columns(SCROLLABLE_FIELDS, strings, *scrollable)
+    }
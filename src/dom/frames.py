@@ -0,0 +1,48 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, List
+import math
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator, Page
+
+# Joins the XPath of an iframe element and the XPath of an element inside that frame,
+# `/html[1]/body[1]/iframe[1] >> /html[1]/body[1]/form[1]/input[1]`
+FRAME_SEPARATOR = ' >> '
+
+def locate_xpath(page: Page, xpath: str) -> Locator:
+    """
+    A locator for an XPath of the DOM state. Every frame part but the last enters the frame
+    through `frame_locator`, so elements of embedded checkout forms and widgets are reachable.
+
+    Args:
+        page (Page): The page holding the element
+        xpath (str): The XPath, frame-aware when it contains `FRAME_SEPARATOR`
+
+    Returns:
+        Locator: The locator of the element
+    """
+
+    *frames, xpath = xpath.split(FRAME_SEPARATOR)
+    scope = page
+    for frame_xpath in frames:
+        scope = scope.frame_locator(f'xpath={frame_xpath}')
+    return scope.locator(f'xpath={xpath}')
+
+def shift_elements(elements: List[Dict[str, Any]], xpath_prefix: str, dx: float, dy: float) -> List[Dict[str, Any]]:
+    """
+    Copies the elements of a child frame into the coordinates of the page: the frame offset is
+    added to the boxes and centers, and the XPaths are prefixed with the path of the frame.
+    """
+
+    shifted = []
+    for element in elements:
+        element = dict(element)
+        if element.get('xpath') is not None:
+            element['xpath'] = xpath_prefix + element['xpath']
+        if element.get('box'):
+            element['box'] = {**element['box'], 'left': element['box']['left'] + dx, 'top': element['box']['top'] + dy}
+        if element.get('center'):
+            # Centers are whole pixels, as `getElements()` floors them
+            element['center'] = {'x': math.floor(element['center']['x'] + dx), 'y': math.floor(element['center']['y'] + dy)}
+        shifted.append(element)
+    return shifted
@@ -0,0 +1,237 @@
+from .state import InteractiveElement
+from .compact import CompactElements
+from ..search import STOP_WORDS
+from ..tracing import start_span
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypedDict
+import numpy as np
+import re
+
+# Elements kept whatever the task, as the agent needs them to move around the site
+LANDMARK_TAGS = {'input', 'textarea', 'select'}
+LANDMARK_ROLES = {'searchbox', 'textbox', 'combobox', 'tab'}
+LANDMARK_NAMES = ('next', 'prev', 'load more', 'show more', 'see more', 'more results', 'search', 'submit')
+
+def _word_prefix_matches(corpus: str, term: str) -> List[int]:
+    """
+    The offsets where a word starts with `term`. `str.find` skips through the text at C speed,
+    a regex with a word boundary would step through every character instead.
+    """
+
+    positions = []
+    position = corpus.find(term)
+    while position != -1:
+        if position == 0 or not corpus[position - 1].isalnum():
+            positions.append(position)
+        position = corpus.find(term, position + 1)
+    return positions
+
+def _joined(texts: List[str]) -> Tuple[str, np.ndarray]:
+    """
+    Joins lowercased texts with newlines, and returns the offset where every text starts.
+    """
+
+    corpus = '\n'.join(texts)
+    if corpus.isascii():
+        corpus = corpus.lower()
+    else:
+        # Some characters change length when lowercased, which would shift the offsets
+        texts = [text.lower() for text in texts]
+        corpus = '\n'.join(texts)
+    lengths = np.fromiter(map(len, texts), dtype = np.int64, count = len(texts)) + 1
+    return corpus, np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+def _column(elements: List[InteractiveElement] | CompactElements, key: str) -> List:
+    if isinstance(elements, CompactElements):
+        return elements.column(key)
+    return [element.get(key) for element in elements]
+
+class RankedElements(TypedDict):
+    elements: List[InteractiveElement] | CompactElements
+    dropped: int
+    dropped_by_role: Dict[str, int]
+
+class ElementRanker:
+    """
+    Keeps the interactive elements relevant to the task. Every element is scored with BM25 over
+    its name, role, tag and attribute values against the user query and the current plan,
+    and the `top_n` best ones are kept together with the structural landmarks (inputs, search
+    boxes, pagination and "load more" controls).
+
+    The scoring runs over one concatenated text of all the elements: every query term is a single
+    scan of that text, and the matches are mapped back to their elements with numpy, so thousands
+    of elements rank in a few milliseconds.
+
+    Attributes:
+        top_n (int): The number of best scored elements kept, landmarks not included
+        max_landmarks (int): The most landmarks kept, first ones on the page first
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 length normalization
+        plan_weight (float): Weight of the terms of the current plan, the query terms weigh 1
+        embed (Optional[Callable[[List[str]], Sequence[Sequence[float]]]]): Optional local embedding function
+            (e.g. the `encode` of a sentence-transformers model), its cosine similarity is added to the BM25 score
+        embedding_weight (float): Weight of the cosine similarity against the normalized BM25 score
+    """
+
+    def __init__(
+            self,
+            top_n: int = 60,
+            max_landmarks: int = 20,
+            k1: float = 1.2,
+            b: float = 0.75,
+            plan_weight: float = 0.5,
+            embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+            embedding_weight: float = 0.5
+        ) -> None:
+        self.top_n = top_n
+        self.max_landmarks = max_landmarks
+        self.k1 = k1
+        self.b = b
+        self.plan_weight = plan_weight
+        self.embed = embed
+        self.embedding_weight = embedding_weight
+        self._embeddings: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def query_terms(text: str) -> List[str]:
+        return list(dict.fromkeys(
+            word for word in re.findall(r'[a-z0-9]+', text.lower())
+            if len(word) > 1 and word not in STOP_WORDS
+        ))
+
+    @staticmethod
+    def element_text(element: InteractiveElement) -> str:
+        # The attributes are already reduced to the descriptive ones by `script.js`
+        attributes = element.get('attributes')
+        return f"{element.get('name') or ''} {element.get('role') or ''} {element.get('tag') or ''} {' '.join(attributes.values()) if attributes else ''}"
+
+    @classmethod
+    def element_texts(cls, elements: List[InteractiveElement] | CompactElements) -> List[str]:
+        if not isinstance(elements, CompactElements):
+            return [cls.element_text(element) for element in elements]
+        names, roles, tags = elements.column('name'), elements.column('role'), elements.column('tag')
+        return [
+            f"{names[index] or ''} {roles[index] or ''} {tags[index] or ''} {' '.join(elements.attribute_values(index))}"
+            for index in range(len(elements))
+        ]
+
+    def score(self, elements: List[InteractiveElement] | CompactElements, query: str, plan: str = '') -> np.ndarray:
+        """
+        Scores the elements against the query and the plan.
+
+        Returns:
+            np.ndarray: One score per element, higher is more relevant
+        """
+
+        texts = self.element_texts(elements)
+        scores = np.zeros(len(elements))
+        terms = self.query_terms(query)
+        plan_terms = [term for term in self.query_terms(plan) if term not in terms]
+        weights = np.array([1.0] * len(terms) + [self.plan_weight] * len(plan_terms))
+        terms += plan_terms
+
+        if terms and elements:
+            # Underscores would hide words from the matching, `add_to_cart` must still match `cart`
+            corpus, starts = _joined(texts)
+            corpus = corpus.replace('_', ' ')
+            lengths = np.diff(np.append(starts, len(corpus) + 1))
+
+            # Term frequencies of every (element, term) pair, terms match as word prefixes ("price" → "prices")
+            tf = np.zeros((len(elements), len(terms)))
+            for column, term in enumerate(terms):
+                positions = _word_prefix_matches(corpus, term)
+                if positions:
+                    rows = np.searchsorted(starts, positions, side = 'right') - 1
+                    tf[:, column] = np.bincount(rows, minlength = len(elements))
+
+            document_frequency = (tf > 0).sum(axis = 0)
+            idf = np.log(1 + (len(elements) - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths / lengths.mean())
+            scores = ((tf * (self.k1 + 1)) / (tf + norm[:, None]) * (idf * weights)).sum(axis = 1)
+
+        if self.embed and elements:
+            top = scores.max()
+            if top > 0:
+                scores = scores / top
+            scores = scores + self.embedding_weight * self._similarity(texts, f'{query} {plan}')
+
+        return scores
+
+    def _similarity(self, texts: List[str], query: str) -> np.ndarray:
+        missing = [text for text in dict.fromkeys(texts) if text not in self._embeddings]
+        if missing:
+            for text, vector in zip(missing, np.asarray(self.embed(missing), dtype = np.float32)):
+                self._embeddings[text] = vector / (np.linalg.norm(vector) or 1.0)
+
+        query_vector = np.asarray(self.embed([query])[0], dtype = np.float32)
+        query_vector = query_vector / (np.linalg.norm(query_vector) or 1.0)
+        return np.stack([self._embeddings[text] for text in texts]) @ query_vector
+
+    def landmarks(self, elements: List[InteractiveElement] | CompactElements) -> np.ndarray:
+        """
+        The elements always kept: form fields, search boxes, tabs, pagination and "load more" controls.
+        """
+
+        names = [name or '' for name in _column(elements, 'name')]
+        corpus, starts = _joined(names)
+
+        # Numbered links are pages of a pagination
+        mask = np.fromiter(
+            (tag in LANDMARK_TAGS or role in LANDMARK_ROLES or name.isdigit() for tag, role, name in zip(_column(elements, 'tag'), _column(elements, 'role'), names)),
+            dtype = bool, count = len(elements)
+        )
+        for landmark in LANDMARK_NAMES:
+            positions = _word_prefix_matches(corpus, landmark)
+            if positions:
+                mask[np.searchsorted(starts, positions, side = 'right') - 1] = True
+        return mask
+
+    def rank(self, elements: List[InteractiveElement] | CompactElements, query: str, plan: str = '') -> RankedElements:
+        """
+        Keeps the `top_n` most relevant elements and the landmarks, in page order.
+
+        Args:
+            elements (List[InteractiveElement] | CompactElements): The interactive elements of the DOM state
+            query (str): The user query
+            plan (str): The latest thought of the model, its terms weigh `plan_weight`
+
+        Returns:
+            RankedElements: The kept elements (compact if they came compact), how many were dropped and the dropped count per role
+        """
+
+        if len(elements) <= self.top_n:
+            return RankedElements(elements = elements, dropped = 0, dropped_by_role = {})
+
+        with start_span('dom.rank', elements = len(elements)) as span:
+            scores = self.score(elements, query, plan)
+            landmarks = self.landmarks(elements)
+            landmarks[np.flatnonzero(landmarks)[self.max_landmarks:]] = False
+
+            keep = landmarks.copy()
+            # Stable sort, so ties keep the page order
+            candidates = np.argsort(-scores, kind = 'stable')
+            keep[candidates[~landmarks[candidates]][:self.top_n]] = True
+
+            kept = np.flatnonzero(keep)
+            roles, tags = _column(elements, 'role'), _column(elements, 'tag')
+            dropped_by_role: Dict[str, int] = {}
+            for index in np.flatnonzero(~keep):
+                role = roles[index] if roles[index] and roles[index] != 'none' else tags[index] or 'element'
+                dropped_by_role[role] = dropped_by_role.get(role, 0) + 1
+            span.set_attribute('elements.kept', len(kept))
+
+        return RankedElements(
+            elements = elements.take(kept) if isinstance(elements, CompactElements) else [elements[index] for index in kept],
+            dropped = len(elements) - len(kept),
+            dropped_by_role = dict(sorted(dropped_by_role.items(), key = lambda item: item[1], reverse = True))
+        )
+
+    @staticmethod
+    def describe_dropped(ranked: RankedElements) -> str:
+        """
+        A line telling the model which elements were left out of the prompt.
+        """
+
+        if not ranked['dropped']:
+            return ''
+        roles = ', '.join(f'{count} {role}' for role, count in ranked['dropped_by_role'].items())
+        return f"({ranked['dropped']} less relevant elements are not listed: {roles}. Scroll or refine the plan to bring them up.)"
@@ -42,7 +42,8 @@ const SAFE_ATTRIBUTES = new Set([
     'data-cy','href','target','tabindex','class','data-tooltip'
 ]);
 
-const labels = [];
+// Kept on window so unmark_page can remove the boxes drawn by an earlier evaluation
+const labels = window.__markLabels || (window.__markLabels = []);
 
 function getXPath(element) {
     if (!element || element.nodeType !== Node.ELEMENT_NODE) return "";
@@ -75,8 +76,9 @@ function waitForPageToLoad() {
     });
 } 
 
-// Extract visible elements
-async function getElements(node=document.body) {
+// Extract visible elements. A child frame evaluated on its own passes frameOffsets=false,
+// its position in the page is added by `DOM.get_state`, which also works across origins
+async function getElements(node=document.body, frameOffsets=true) {
     const interactiveElements = [];
     const informativeElements = [];
     const scrollableElements = [];
@@ -196,7 +198,7 @@ async function getElements(node=document.body) {
                 let top = rect.top;
                 let width = rect.width;
                 let height = rect.height;
-                let frame = window.frameElement;
+                let frame = frameOffsets ? window.frameElement : null;
                 // If the element is in an iframe, adjust the coordinates
                 while (frame!=null) {
                     let frameRect = frame.getBoundingClientRect();
@@ -264,7 +266,7 @@ async function getElements(node=document.body) {
                 let top = rect.top;
                 let width = rect.width;
                 let height = rect.height;
-                let frame = window.frameElement;
+                let frame = frameOffsets ? window.frameElement : null;
                 // If the element is in an iframe, adjust the coordinates
                 while (frame!=null) {
                     let frameRect = frame.getBoundingClientRect();
@@ -299,6 +301,100 @@ async function getElements(node=document.body) {
     return {interactiveElements,informativeElements,scrollableElements};
 }
 
+// Packed snapshot, decoded by `decode_packed_state` of compact.py. One JSON string crosses CDP
+// instead of nested objects, and the strings repeated across elements are sent once:
+// [version, strings, interactive, informative, scrollable], every list being
+// [ids (tag, role, name or content, xpath parent, xpath step per element), attribute offsets,
+//  attribute (name, value) id pairs, boxes (left, top, width, height), centers (x, y)]
+const PACKED_FORMAT_VERSION = 1;
+
+async function getElementsPacked(node=document.body, frameOffsets=true) {
+    const {interactiveElements, informativeElements, scrollableElements} = await getElements(node, frameOffsets);
+    const strings = [];
+    const stringIds = new Map();
+    function add(value) {
+        if (value === null || value === undefined) return -1;
+        let id = stringIds.get(value);
+        if (id === undefined) {
+            id = strings.length;
+            stringIds.set(value, id);
+            strings.push(value);
+        }
+        return id;
+    }
+
+    function pack(elements, textKey, hasAttributes, hasBox, hasCenter) {
+        const ids = [], offsets = [0], pairs = [], boxes = [], centers = [];
+        for (const element of elements) {
+            const xpath = element.xpath ?? null;
+            const slash = xpath === null ? -1 : xpath.lastIndexOf('/');
+            ids.push(
+                add(element.tag), add(element.role), add(element[textKey]),
+                slash < 0 ? -1 : add(xpath.slice(0, slash)), add(slash < 0 ? xpath : xpath.slice(slash + 1))
+            );
+            if (hasAttributes) {
+                for (const [name, value] of Object.entries(element.attributes || {})) pairs.push(add(name), add(value));
+                offsets.push(pairs.length / 2);
+            }
+            // A missing box or center is sent as nulls
+            if (hasBox) {
+                const box = element.box || {};
+                boxes.push(box.left ?? null, box.top ?? null, box.width ?? null, box.height ?? null);
+            }
+            if (hasCenter) {
+                const center = element.center || {};
+                centers.push(center.x ?? null, center.y ?? null);
+            }
+        }
+        return [ids, offsets, pairs, boxes, centers];
+    }
+
+    return JSON.stringify([
+        PACKED_FORMAT_VERSION,
+        strings,
+        pack(interactiveElements, 'name', true, true, true),
+        pack(informativeElements, 'content', false, false, true),
+        pack(scrollableElements, 'name', true, false, false)
+    ]);
+}
+
+// Changes whenever the frame document mutates, navigates, scrolls, resizes or its layout moves. The
+// mutations are counted by an observer installed on the first call and kept on window across
+// evaluations, the random id tells a reloaded document from the previous one. Layout changes without
+// a mutation (late image and font loads, finished transitions and animations, a resized root) are
+// counted too, and the document size is part of the version
+function getFrameVersion() {
+    if (!window.__domMutations) {
+        const counter = {id: Math.random().toString(36).slice(2), count: 0, layout: 0};
+        const onLayout = () => counter.layout++;
+        window.__domMutations = counter;
+        new MutationObserver(() => counter.count++).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        const resizes = new ResizeObserver(onLayout);
+        resizes.observe(document.documentElement);
+        if (document.body) resizes.observe(document.body);
+        // Load events do not bubble, they are caught while capturing
+        for (const type of ['load', 'transitionend', 'animationend']) {
+            document.addEventListener(type, onLayout, true);
+        }
+        if (document.fonts) document.fonts.addEventListener('loadingdone', onLayout);
+    }
+    const root = document.documentElement;
+    return JSON.stringify([
+        window.__domMutations.id, window.__domMutations.count, window.__domMutations.layout, location.href,
+        window.scrollX, window.scrollY, window.innerWidth, window.innerHeight, root.scrollWidth, root.scrollHeight
+    ]);
+}
+
+// The elements of one frame for `DOM.get_state`, null when the frame is still at knownVersion
+async function getFrameSnapshot(knownVersion, packed, frameOffsets) {
+    const version = getFrameVersion();
+    if (version === knownVersion) return {version, elements: null};
+    const elements = packed ? await getElementsPacked(document.body, frameOffsets) : await getElements(document.body, frameOffsets);
+    return {version, elements};
+}
+
 function mark_page(boxes) {
     function getRandomColor() {
         const letters = '0123456789ABCDEF';
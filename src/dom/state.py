@@ -1,3 +1,4 @@
+from .compact import CompactElements
 from typing import TypedDict
 
 class BoundingBox(TypedDict):
@@ -34,6 +35,6 @@ class ScrollableElement(TypedDict):
     xpath: str
 
 class DOMState(TypedDict):
-    interactive_elements: list[InteractiveElement]
-    informative_elements: list[InformativeElement]
-    scrollable_elements: list[ScrollableElement]
\ No newline at end of file
+    interactive_elements: list[InteractiveElement] | CompactElements
+    informative_elements: list[InformativeElement] | CompactElements
+    scrollable_elements: list[ScrollableElement] | CompactElements
\ No newline at end of file
@@ -0,0 +1,185 @@
+from __future__ import annotations
+from .state import InteractiveElement
+from ..browser.screenshots import FrameGrabber
+from ..tracing import start_span
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TypedDict
+import base64
+import json
+import math
+import os
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+# Gemini bills an image per 768x768 tile, other providers are in the same range
+IMAGE_TILE_SIZE = 768
+TOKENS_PER_TILE = 258
+
+class VisionElement(TypedDict):
+    id: int
+    tag: str
+    role: str
+    name: str
+    center: Dict[str, float]
+    box: Dict[str, float]
+    xpath: str
+
+class VisionState(TypedDict):
+    image: str
+    width: int
+    height: int
+    elements: List[VisionElement]
+    dropped: int
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Rough prompt cost of an image, counted in 768 px tiles."""
+    return math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE) * TOKENS_PER_TILE
+
+def image_part(image: str, image_format: str = 'jpeg') -> Dict[str, Any]:
+    """Wraps a base64 image into a content part of a multimodal user message."""
+    return {'type': 'image_url', 'image_url': {'url': f'data:image/{image_format};base64,{image}'}}
+
+class PageVision:
+    """
+    Builds the vision page state: a downscaled screenshot with numbered boxes drawn over the
+    visible interactive elements (`mark_page` of `script.js`), and a short table mapping the
+    numbers to the elements. Regions of the page can be cropped at full resolution on demand.
+
+    Attributes:
+        page (Page): The page to capture
+        grabber (FrameGrabber): Captures the screenshots
+        max_elements (int): The most elements numbered on a screenshot
+        max_name_chars (int): The cap of an element name in the table
+        last_state (Optional[VisionState]): The most recent capture
+        pending_crops (List[Dict[str, Any]]): Crops waiting to be attached to the next prompt
+    """
+
+    def __init__(self, page: Page, max_width: int = 1024, quality: int = 60, max_elements: int = 80, max_name_chars: int = 60) -> None:
+        self.page = page
+        self.grabber = FrameGrabber('jpeg', quality, max_width)
+        self.max_elements = max_elements
+        self.max_name_chars = max_name_chars
+        self.last_state: Optional[VisionState] = None
+        self.pending_crops: List[Dict[str, Any]] = []
+        with open(os.path.join(os.path.dirname(__file__), 'script.js')) as f:
+            self._script = f.read()
+
+    async def _viewport(self) -> Dict[str, float]:
+        viewport = self.page.viewport_size
+        if viewport:
+            return viewport
+        return await self.page.evaluate('() => ({width: window.innerWidth, height: window.innerHeight})')
+
+    async def capture(self, interactive_elements: List[InteractiveElement]) -> VisionState:
+        """
+        Numbers the interactive elements inside the viewport on a screenshot.
+
+        Args:
+            interactive_elements (List[InteractiveElement]): The elements of the DOM state
+
+        Returns:
+            VisionState: The base64 JPEG, its size, the numbered elements and how many visible elements were left out
+        """
+
+        viewport = await self._viewport()
+        visible = [
+            element for element in interactive_elements
+            if element.get('box') and element['box']['width'] > 0 and element['box']['height'] > 0
+            and element['box']['left'] < viewport['width'] and element['box']['top'] < viewport['height']
+            and element['box']['left'] + element['box']['width'] > 0 and element['box']['top'] + element['box']['height'] > 0
+        ]
+        marked = visible[:self.max_elements]
+        elements = [
+            VisionElement(
+                id = index,
+                tag = element.get('tag'),
+                role = element.get('role'),
+                name = (element.get('name') or '')[:self.max_name_chars],
+                center = element.get('center'),
+                box = element.get('box'),
+                xpath = element.get('xpath')
+            )
+            for index, element in enumerate(marked)
+        ]
+
+        with start_span('vision.capture', elements = len(elements)) as span:
+            await self.page.evaluate(f"{self._script}\nmark_page({json.dumps([element['box'] for element in elements])})")
+            try:
+                data = await self.grabber.grab(self.page)
+            finally:
+                await self.page.evaluate(f"{self._script}\nunmark_page()")
+            scale = await self.grabber.scale(self.page)
+            span.set_attribute('payload.bytes', len(data))
+
+        self.last_state = VisionState(
+            image = base64.b64encode(data).decode('ascii'),
+            width = round(viewport['width'] * scale),
+            height = round(viewport['height'] * scale),
+            elements = elements,
+            dropped = len(visible) - len(marked)
+        )
+        return self.last_state
+
+    def format_table(self, state: Optional[VisionState] = None) -> str:
+        """
+        The id → element table sent next to the screenshot.
+        """
+
+        state = state or self.last_state
+        if not state:
+            return ''
+        lines = [
+            f"{element['id']} {element['tag']} role:{element['role']} name:{element['name']!r} "
+            f"center:({element['center']['x']:.0f},{element['center']['y']:.0f}) xpath:{element['xpath']}"
+            for element in state['elements']
+        ]
+        if state['dropped']:
+            lines.append(f"({state['dropped']} more visible elements are not numbered, scroll or crop to see them)")
+        return '\n'.join(lines)
+
+    async def crop(self, element_id: Optional[int] = None, region: Optional[Dict[str, float]] = None, padding: int = 40) -> Dict[str, Any]:
+        """
+        Captures a region of the viewport at full resolution and queues it for the next prompt.
+
+        Args:
+            element_id (Optional[int]): A number of the last screenshot, the crop is centered on its element
+            region (Optional[Dict[str, float]]): The `x`, `y`, `width` and `height` of the region, in viewport pixels
+            padding (int): The margin added around an element
+
+        Returns:
+            Dict[str, Any]: The clipped region and the base64 JPEG
+
+        Raises:
+            ValueError: If the element id is unknown or no region was given
+        """
+
+        if element_id is not None:
+            elements = self.last_state['elements'] if self.last_state else []
+            if not 0 <= element_id < len(elements):
+                raise ValueError(f"No element with id {element_id} on the last screenshot")
+            box = elements[element_id]['box']
+            region = {
+                'x': box['left'] - padding, 'y': box['top'] - padding,
+                'width': box['width'] + 2 * padding, 'height': box['height'] + 2 * padding
+            }
+        if not region:
+            raise ValueError("Provide an element id or a region to crop")
+
+        viewport = await self._viewport()
+        x = max(0.0, float(region['x']))
+        y = max(0.0, float(region['y']))
+        clip = {
+            'x': x, 'y': y,
+            'width': max(1.0, min(float(region['width']), viewport['width'] - x)),
+            'height': max(1.0, min(float(region['height']), viewport['height'] - y))
+        }
+        with start_span('vision.crop'):
+            data = await self.grabber.grab(self.page, clip = clip)
+
+        crop = {'region': clip, 'image': base64.b64encode(data).decode('ascii')}
+        self.pending_crops.append(crop)
+        return crop
+
+    def take_crops(self) -> List[Dict[str, Any]]:
+        crops, self.pending_crops = self.pending_crops, []
+        return crops
@@ -0,0 +1,198 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional, Tuple, TypedDict
+import re
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+    import httpx
+
+# Containers that client-side frameworks render into
+SPA_ROOT_PATTERN = re.compile(
+    r'<(div|main|app-root)[^>]*\s(id|class)=["\']?(root|app|__next|__nuxt|svelte|main-app)["\']?[^>]*>\s*</\1>',
+    re.IGNORECASE
+)
+SPA_MARKERS = ['ng-version=', 'data-reactroot', 'data-server-rendered="false"', 'window.__INITIAL_STATE__=null']
+NOSCRIPT_HINTS = [
+    'enable javascript', 'requires javascript', 'javascript is disabled',
+    'turn on javascript', 'javascript is required', 'need javascript'
+]
+
+SCRIPT_STYLE_PATTERN = re.compile(r'<(script|style|noscript|template|svg)[^>]*>.*?</\1>', re.IGNORECASE | re.DOTALL)
+NOSCRIPT_PATTERN = re.compile(r'<noscript[^>]*>(.*?)</noscript>', re.IGNORECASE | re.DOTALL)
+BODY_PATTERN = re.compile(r'<body[^>]*>(.*)</body>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+class FetchResult(TypedDict):
+    url: str
+    status: int
+    html: str
+    needs_js: bool
+    error: Optional[str]
+
+def extract_body(html: str) -> str:
+    """Returns the inner HTML of the body element, or the whole document if there is none."""
+    match = BODY_PATTERN.search(html)
+    return match.group(1) if match else html
+
+def visible_text_length(html: str) -> int:
+    text = TAG_PATTERN.sub(' ', SCRIPT_STYLE_PATTERN.sub(' ', html))
+    return len(' '.join(text.split()))
+
+def needs_javascript(html: str, min_text_chars: int = 200) -> bool:
+    """
+    Guesses whether a page has to be rendered by a browser to show its content.
+
+    Args:
+        html (str): The raw HTML returned by the server
+        min_text_chars (int): Pages with less visible text than this are considered empty shells
+
+    Returns:
+        bool: True if the page should be loaded in the browser instead
+    """
+
+    text_length = visible_text_length(extract_body(html))
+    if text_length < min_text_chars:
+        return True
+
+    if SPA_ROOT_PATTERN.search(html) and text_length < 2000:
+        return True
+
+    if any(marker in html for marker in SPA_MARKERS) and text_length < 2000:
+        return True
+
+    noscript_text = ' '.join(NOSCRIPT_PATTERN.findall(html)).lower()
+    if any(hint in noscript_text for hint in NOSCRIPT_HINTS) and text_length < 2000:
+        return True
+
+    return False
+
+class HttpFetcher:
+    """
+    Fetches pages over plain HTTP with a pooled async client, skipping the browser
+    for static pages. The cookies of the browser context are copied into the client
+    before every fetch (`sync_cookies`), so pages behind a login come back as the
+    browser would see them, not as the anonymous or login page.
+
+    Attributes:
+        user_agent (Optional[str]): The user agent sent with every request
+        timeout (float): The request timeout in seconds
+        max_connections (int): The maximum number of pooled connections
+        max_bytes (int): Responses larger than this are left to the browser
+    """
+
+    def __init__(
+            self,
+            user_agent: Optional[str] = None,
+            timeout: float = 15.0,
+            max_connections: int = 20,
+            max_bytes: int = 5 * 1024 * 1024
+        ) -> None:
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_bytes = max_bytes
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            import httpx
+            headers = {
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+            }
+            if self.user_agent:
+                headers['User-Agent'] = self.user_agent
+            self._client = httpx.AsyncClient(
+                headers = headers,
+                timeout = self.timeout,
+                follow_redirects = True,
+                limits = httpx.Limits(
+                    max_connections = self.max_connections,
+                    max_keepalive_connections = self.max_connections
+                )
+            )
+        return self._client
+
+    async def sync_cookies(self, context: BrowserContext, url: str) -> None:
+        """
+        Copies the cookies the browser context would send to the URL into the client jar.
+        The jar keeps them across redirects, unlike a per-request Cookie header.
+        """
+
+        for cookie in await context.cookies(url):
+            self.client.cookies.set(cookie['name'], cookie['value'], domain = cookie['domain'], path = cookie['path'])
+
+    async def fetch(self, url: str) -> FetchResult:
+        """
+        Fetches a URL and classifies whether its content needs JavaScript.
+        Errors, non-2xx responses and non-text content are flagged as needing the browser.
+        """
+
+        try:
+            response = await self.client.get(url)
+        except Exception as e:
+            return FetchResult(url = url, status = 0, html = '', needs_js = True, error = str(e))
+
+        content_type = response.headers.get('content-type', '').lower()
+        if response.status_code >= 400 or len(response.content) > self.max_bytes or not (
+            'html' in content_type or content_type.startswith('text/') or not content_type
+        ):
+            return FetchResult(
+                url = str(response.url),
+                status = response.status_code,
+                html = '',
+                needs_js = True,
+                error = f"Unsuitable response ({response.status_code}, {content_type or 'no content type'})"
+            )
+
+        html = response.text
+        if 'html' in content_type or not content_type:
+            needs_js = needs_javascript(html)
+        else:
+            needs_js = not html.strip()
+
+        return FetchResult(url = str(response.url), status = response.status_code, html = html, needs_js = needs_js, error = None)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+async def fetch_body_html(
+        url: str,
+        context: BrowserContext,
+        fetcher: Optional[HttpFetcher] = None,
+        timeout: int = 30000
+    ) -> Tuple[str, str]:
+    """
+    Returns the body HTML of a URL, trying the HTTP fast path first and falling back to a
+    new browser tab of the given context when the page needs JavaScript.
+
+    Args:
+        url (str): The URL to load
+        context (BrowserContext): The browser context whose cookies the fetch sends, and used for the fallback
+        fetcher (Optional[HttpFetcher]): The HTTP fetcher, None to always use the browser
+        timeout (int): The browser navigation timeout in milliseconds
+
+    Returns:
+        Tuple[str, str]: The body HTML and the tier that produced it ('http' or 'browser')
+    """
+
+    if fetcher is not None:
+        # The session of the browser goes with the request, or a logged-in page would be fetched anonymously
+        await fetcher.sync_cookies(context, url)
+        result = await fetcher.fetch(url)
+        if not result['needs_js']:
+            return extract_body(result['html']), 'http'
+
+    page = await context.new_page()
+    try:
+        await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+        try:
+            await page.wait_for_load_state('networkidle', timeout=10000)
+        except Exception:
+            pass
+        return await page.locator("body").inner_html(), 'browser'
+    finally:
+        await page.close()
@@ -1,14 +1,14 @@
 from abc import ABC
 
 class BaseMessage(ABC):
-    def to_dict(self) -> dict[str, str]:
+    def to_dict(self) -> dict[str, str | list[dict]]:
         return {
             'role': self.role,
             'content': self.content
         }
 
 class UserMessage(BaseMessage):
-    def __init__(self, content: str) -> None:
+    def __init__(self, content: str | list[dict]) -> None:
         self.role = 'user'
         self.content = content
 
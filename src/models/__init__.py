@@ -1,30 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import List, Any, Union
+from typing import List, Any, Dict, Union
 from ..message import (
     AIMessage, 
     UserMessage, 
     SystemMessage
 )
 
+Message = Union[Dict[str, Any], AIMessage, UserMessage, SystemMessage]
+
+def to_message_dicts(messages: List[Message]) -> List[Dict[str, Any]]:
+    """Converts message objects to the role/content dicts the provider APIs expect."""
+    return [message if isinstance(message, dict) else message.to_dict() for message in messages]
+
 class BaseModel(ABC):
-    @property
-    @abstractmethod
-    def messages(self) -> List[Any]:
-        pass
+    """
+    Base class of the model providers.
 
-    @messages.setter
-    @abstractmethod
-    def messages(self, message: List[Union[AIMessage, UserMessage, SystemMessage]]):
-        pass
+    Providers keep no conversation state: every call receives its own messages, so a single
+    instance can serve concurrent agents, tools and chunked extractions.
+    """
 
     @abstractmethod
-    def add_message(self, message: Union[AIMessage, UserMessage, SystemMessage]):
-        pass
-    
-    @abstractmethod
-    async def generate(self, query: str):
+    async def generate(self, messages: List[Message], **kwargs) -> Any:
+        """
+        Generates a completion for the messages.
+
+        Args:
+            messages (List[Message]): The conversation to complete
+            **kwargs: Per-call overrides of the provider parameters (e.g. `temperature`), and the routing
+                hints `call_site` ('planner', 'scraper' or 'output') and `escalate` that single providers ignore
+        """
         pass
 
     @abstractmethod
     def configure(self, **kwargs):
-        pass
\ No newline at end of file
+        pass
+
+
+# Providers are imported on first access (`from src.models import GeminiProvider`),
+# so importing the package doesn't load every provider SDK
+_LAZY_PROVIDERS = {
+    'GeminiProvider': '.gemini',
+    'GroqProvider': '.groq',
+    'CachedModel': '.cache',
+    'RoutedModel': '.router'
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_PROVIDERS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_PROVIDERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
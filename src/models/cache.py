@@ -0,0 +1,143 @@
+from .__init__ import BaseModel, Message
+from ..cache import DiskCache
+from ..tracing import start_span
+from typing import List, Any, Dict, Optional
+import os
+
+CACHE_MODES = ('record', 'replay', 'passthrough')
+
+# Parameters of the providers that change the completion, and therefore the cache key
+KEY_PARAMETERS = ('max_tokens', 'temperature', 'top_p', 'reasoning_effort')
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '../../.cache/llm')
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a call was never recorded."""
+
+class CachedResponse(dict):
+    """
+    A replayed completion supporting both `response.choices[0].message.content`
+    and `response['choices'][0]['message']['content']`, like the provider responses.
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        super().__init__({key: self._wrap(value) for key, value in data.items()})
+
+    @classmethod
+    def _wrap(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            return cls(value)
+        if isinstance(value, list):
+            return [cls._wrap(item) for item in value]
+        return value
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self[key]
+        except KeyError as e:
+            raise AttributeError(key) from e
+
+def normalize_messages(messages: List[Any]) -> List[Dict[str, str]]:
+    """
+    Reduces messages to their role and content, with line endings and trailing
+    whitespace normalized, so equal prompts hash to the same key.
+    """
+
+    normalized = []
+    for message in messages:
+        if not isinstance(message, dict):
+            message = message.to_dict()
+        content = message.get('content', '')
+        if isinstance(content, str):
+            content = '\n'.join(line.rstrip() for line in content.replace('\r\n', '\n').split('\n')).strip()
+        normalized.append({'role': message.get('role', ''), 'content': content})
+    return normalized
+
+def serialize_response(response: Any) -> Dict[str, Any]:
+    """
+    Converts a litellm/Groq completion into a plain JSON-serializable dict.
+    """
+
+    if hasattr(response, 'model_dump'):
+        return response.model_dump(mode='json')
+    if hasattr(response, 'to_dict'):
+        return response.to_dict()
+    return dict(response)
+
+class CachedModel(BaseModel):
+    """
+    Content-addressed response cache in front of another model.
+
+    Calls are keyed on the model name, the completion parameters and the normalized messages,
+    so repeated extractions over unchanged markdown and planning over an unchanged page are
+    answered from disk instantly.
+
+    Args:
+        model (BaseModel): The model to cache the completions of
+        mode (str): 'record' answers from the cache and records misses,
+            'replay' only answers from the cache and raises `CacheMissError` on a miss (offline re-runs),
+            'passthrough' always calls the model and leaves the cache untouched
+        cache (Optional[DiskCache]): The store to use, defaults to `.cache/llm` in the project root
+        ttl (Optional[float]): The lifetime of a recorded response in seconds, used for the default store
+        max_size_mb (Optional[float]): The size of the default store above which old responses are evicted
+    """
+
+    def __init__(
+            self,
+            model: BaseModel,
+            mode: str = 'record',
+            cache: Optional[DiskCache] = None,
+            ttl: Optional[float] = None,
+            max_size_mb: Optional[float] = 512
+        ) -> None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Invalid cache mode '{mode}', expected one of {', '.join(CACHE_MODES)}")
+        self.wrapped = model
+        self.mode = mode
+        self.cache = cache or DiskCache(DEFAULT_CACHE_DIR, ttl = ttl, max_size_mb = max_size_mb)
+
+    @property
+    def model(self) -> str:
+        return getattr(self.wrapped, 'model', type(self.wrapped).__name__)
+
+    def cache_key(self, messages: List[Message], **kwargs) -> str:
+        provider = getattr(self.wrapped, 'provider', type(self.wrapped).__name__)
+        parameters = {name: kwargs.get(name, getattr(self.wrapped, name, None)) for name in KEY_PARAMETERS}
+        return self.cache.make_key(provider, self.model, parameters, normalize_messages(messages))
+
+    async def generate(self, messages: List[Message], **kwargs) -> Any:
+        """
+        Returns the recorded completion for the messages, calling the wrapped
+        model on a miss in record mode.
+
+        Raises:
+            CacheMissError: In replay mode, when the messages were never recorded
+        """
+
+        if self.mode == 'passthrough':
+            return await self.wrapped.generate(messages, **kwargs)
+
+        key = self.cache_key(messages, **kwargs)
+        with start_span('llm.cache', mode = self.mode) as span:
+            cached = self.cache.get(key)
+            span.set_attribute('hit', cached is not None)
+        if cached is not None:
+            return CachedResponse(cached)
+
+        if self.mode == 'replay':
+            raise CacheMissError(f"No recorded response for this prompt (key {key[:12]}) in {self.cache.directory}")
+
+        response = await self.wrapped.generate(messages, **kwargs)
+        if response is not None:
+            try:
+                self.cache.set(key, serialize_response(response))
+            except (TypeError, ValueError) as e:
+                print(f"Could not record the model response: {e}")
+        return response
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the hit counters and size of the underlying cache."""
+        return self.cache.stats()
+
+    def configure(self, **kwargs) -> None:
+        self.wrapped.configure(**kwargs)
@@ -1,11 +1,7 @@
-from .__init__ import BaseModel
-from litellm import acompletion
-from ..message import (
-    UserMessage, 
-    SystemMessage, 
-    AIMessage
-)
-from typing import List, Union, Any
+from .__init__ import BaseModel, Message, to_message_dicts
+from .rate_limit import get_rate_limiter, estimate_tokens
+from ..tracing import start_span, record_llm_usage
+from typing import List, Any, Optional
 
 class GeminiProvider(BaseModel):
     """
@@ -18,6 +14,10 @@ class GeminiProvider(BaseModel):
         reasoning_effort (str): The reasoning effort to use for text completion
         temperature (float): The temperature to use for text completion
         top_p (float): The top_p to use for text completion
+        rpm (Optional[int]): Requests per minute allowed for the model, None for no cap (429 responses are still backed off)
+        tpm (Optional[int]): Tokens per minute allowed for the model, None for no cap
+        max_concurrency (Optional[int]): The maximum number of requests in flight across all callers of the model
+        rate_limit (bool): Whether calls are throttled and retried client side, see `rate_limit.RateLimiter`
     """
     
     def __init__(
@@ -27,7 +27,11 @@ class GeminiProvider(BaseModel):
             max_tokens: int = 19334,
             reasoning_effort: str = 'disable',  
             temperature: float = 0.4,
-            top_p: float = 1.0
+            top_p: float = 1.0,
+            rpm: Optional[int] = None,
+            tpm: Optional[int] = None,
+            max_concurrency: Optional[int] = None,
+            rate_limit: bool = True
         ) -> None:
         self.api_key = api_key
         self.model = model
@@ -35,44 +39,54 @@ class GeminiProvider(BaseModel):
         self.reasoning_effort = reasoning_effort
         self.temperature = temperature
         self.top_p = top_p
-        self._messages = []
         self.provider = 'gemini/'
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
 
-    @property
-    def messages(self) -> List[Any]:
-        return self._messages
-
-    @messages.setter
-    def messages(self, messages: List[Union[AIMessage, UserMessage, SystemMessage]]):
-        self._messages = messages
-
-    def add_message(self, message: Union[AIMessage, UserMessage, SystemMessage]):
-        self._messages.append(message)
-
-    async def generate(self) -> str:
+    async def generate(self, messages: List[Message], **kwargs) -> Any:
         """
-        Generates text completion from Gemini model
+        Generates text completion from Gemini model.
+        The call keeps no state on the instance, so it is safe to run concurrently.
 
         Args:
-            query (str): The input query to generate completion for
+            messages (List[Message]): The conversation to complete
+            **kwargs: Per-call overrides of `max_tokens`, `reasoning_effort`, `temperature` and `top_p`
 
         Returns:
-            str: The generated text completion
+            ModelResponse: The litellm completion response
         """
-               
-        response = await acompletion(
+
+        messages = to_message_dicts(messages)
+        params = {
+            'max_tokens': kwargs.get('max_tokens', self.max_tokens),
+            'reasoning_effort': kwargs.get('reasoning_effort', self.reasoning_effort),
+            'temperature': kwargs.get('temperature', self.temperature),
+            'top_p': kwargs.get('top_p', self.top_p),
+        }
+
+        with start_span('llm.generate', **{'llm.model': self.provider + self.model}) as span:
+            if self.rate_limit:
+                limiter = get_rate_limiter(self.provider + self.model, self.rpm, self.tpm, self.max_concurrency)
+                response = await limiter.run(lambda: self._complete(messages, params), estimate_tokens(messages))
+            else:
+                response = await self._complete(messages, params)
+            record_llm_usage(span, messages, response)
+        return response
+
+    async def _complete(self, messages: List[dict], params: dict) -> Any:
+        # litellm takes seconds to import, so it is loaded on the first call
+        from litellm import acompletion
+        return await acompletion(
             model = self.provider + self.model,
-            messages = self.messages,
-            max_tokens = self.max_tokens,
+            messages = messages,
             api_key = self.api_key,
-            reasoning_effort = self.reasoning_effort,
             response_format = { "type": "json_object" },
             stream = False,
-            temperature = self.temperature,
-            top_p = self.top_p,
             timeout = 10000,
+            **params
         )
-        return response
     
     def configure(
         self, 
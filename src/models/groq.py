@@ -1,11 +1,10 @@
-from .__init__ import BaseModel
-from groq import Groq
-from ..message import (
-    UserMessage, 
-    SystemMessage, 
-    AIMessage
-)
-from typing import List, Union, Any
+from .__init__ import BaseModel, Message, to_message_dicts
+from .rate_limit import get_rate_limiter, estimate_tokens
+from ..tracing import start_span, record_llm_usage
+from typing import TYPE_CHECKING, List, Any, Optional
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
 
 # Models provided by Groq performs bad, really bad compared to gemini
 
@@ -20,6 +19,10 @@ class GroqProvider(BaseModel):
         reasoning_effort (str): The reasoning effort to use for text completion
         temperature (float): The temperature to use for text completion
         top_p (float): The top_p to use for text completion
+        rpm (Optional[int]): Requests per minute allowed for the model, None for no cap (429 responses are still backed off)
+        tpm (Optional[int]): Tokens per minute allowed for the model, None for no cap
+        max_concurrency (Optional[int]): The maximum number of requests in flight across all callers of the model
+        rate_limit (bool): Whether calls are throttled and retried client side, see `rate_limit.RateLimiter`
     """
     
     def __init__(
@@ -28,55 +31,72 @@ class GroqProvider(BaseModel):
             model: str = 'llama-3.3-70b-versatile', 
             max_tokens: int = 19334,
             temperature: float = 0.4,
-            top_p: float = 1.0
+            top_p: float = 1.0,
+            rpm: Optional[int] = None,
+            tpm: Optional[int] = None,
+            max_concurrency: Optional[int] = None,
+            rate_limit: bool = True
         ) -> None:
         self.api_key = api_key
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.top_p = top_p
-        self._messages = []
         self.reasoning_effort = 'none'
+        self._client: Optional['AsyncGroq'] = None
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
 
     @property
-    def messages(self) -> List[Any]:
-        return self._messages
-
-    @messages.setter
-    def messages(self, messages: List[Union[AIMessage, UserMessage, SystemMessage]]):
-        self._messages = messages
+    def client(self) -> 'AsyncGroq':
+        """The async client, created once and shared so its connection pool is reused across calls."""
+        if self._client is None:
+            from groq import AsyncGroq
+            # Throttled calls are retried by the rate limiter, which also adapts the concurrency
+            self._client = AsyncGroq(api_key = self.api_key, max_retries = 0 if self.rate_limit else 3)
+        return self._client
 
-    def add_message(self, message: Union[AIMessage, UserMessage, SystemMessage]):
-        self._messages.append(message)
-
-    async def generate(self) -> str:
+    async def generate(self, messages: List[Message], **kwargs) -> Any:
         """
-        Generates text completion from Gemini model
+        Generates text completion from Groq model.
+        The call keeps no state on the instance, so it is safe to run concurrently.
 
         Args:
-            query (str): The input query to generate completion for
+            messages (List[Message]): The conversation to complete
+            **kwargs: Per-call overrides of `max_tokens`, `temperature` and `top_p`
 
         Returns:
-            str: The generated text completion
+            ChatCompletion: The Groq completion response, None if the request failed
         """
+        messages = to_message_dicts(messages)
         try:
-            client = Groq(api_key = self.api_key, max_retries = 3)
-            response = client.chat.completions.create(
-                model = self.model,
-                messages = self.messages,
-                max_tokens = self.max_tokens,
-                response_format = { "type": "json_object" },
-                stream = False,
-                temperature = self.temperature,
-                top_p = self.top_p,
-                timeout = 10000,
-            )
+            with start_span('llm.generate', **{'llm.model': 'groq/' + self.model}) as span:
+                if self.rate_limit:
+                    limiter = get_rate_limiter('groq/' + self.model, self.rpm, self.tpm, self.max_concurrency)
+                    response = await limiter.run(lambda: self._complete(messages, kwargs), estimate_tokens(messages))
+                else:
+                    response = await self._complete(messages, kwargs)
+                record_llm_usage(span, messages, response)
             print('RAW GROQ RESPONSE', response, '\n')
             print('GROQ RESPONSE', response.choices[0].message.content)
             return response
         except Exception as e:
             print('GROQ ERROR', e)
             return None
+
+    async def _complete(self, messages: List[dict], kwargs: dict) -> Any:
+        return await self.client.chat.completions.create(
+            model = self.model,
+            messages = messages,
+            max_tokens = kwargs.get('max_tokens', self.max_tokens),
+            response_format = { "type": "json_object" },
+            stream = False,
+            temperature = kwargs.get('temperature', self.temperature),
+            top_p = kwargs.get('top_p', self.top_p),
+            timeout = 10000,
+        )
     
     def configure(
         self, 
@@ -89,6 +109,7 @@ class GroqProvider(BaseModel):
     ) -> None:
         if api_key:
             self.api_key = api_key
+            self._client = None
         if model:
             self.model = model
         if max_tokens:
@@ -0,0 +1,326 @@
+from ..tracing import start_span
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from weakref import WeakKeyDictionary
+import asyncio
+import random
+import re
+import time
+
+# Free tier quotas, for reference only: no RPM/TPM cap applies unless one is set, as paid tiers allow far
+# more. On a free tier key, pass them along, e.g.
+# `configure_rate_limit('gemini/gemini-2.5-flash', **FREE_TIER_LIMITS['gemini/gemini-2.5-flash'])`
+FREE_TIER_LIMITS: Dict[str, Dict[str, int]] = {
+    'gemini/gemini-2.5-flash': {'rpm': 10, 'tpm': 250000},
+    'gemini/gemini-2.5-flash-lite': {'rpm': 15, 'tpm': 250000},
+    'gemini/gemini-2.5-pro': {'rpm': 5, 'tpm': 250000},
+    'groq/llama-3.3-70b-versatile': {'rpm': 30, 'tpm': 12000},
+    'groq/llama-3.1-8b-instant': {'rpm': 30, 'tpm': 6000},
+}
+
+RETRY_AFTER_PATTERN = re.compile(r'retry(?:[ _-]?after|[ _-]?delay|\s+in)["\':\s]*(\d+(?:\.\d+)?)\s*(ms|s)?', re.IGNORECASE)
+
+# Prompt cost assumed for an image part, a screenshot of about 1024x768 pixels
+IMAGE_PART_TOKENS = 1032
+
+def _content_tokens(content: Any) -> int:
+    if isinstance(content, list):
+        # Multimodal content parts, the base64 of an image says nothing about its token cost
+        return sum(
+            IMAGE_PART_TOKENS if isinstance(part, dict) and part.get('type') == 'image_url' else len(str(part.get('text', '') if isinstance(part, dict) else part)) // 4
+            for part in content
+        )
+    return len(str(content)) // 4
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    Estimates the prompt tokens of the messages (about 4 characters per token, a fixed cost
+    per image, plus a small per-message overhead), so large prompts reserve more of the TPM budget.
+    """
+
+    return sum(_content_tokens(message.get('content', '')) + 4 for message in messages)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    text = f'{type(error).__name__} {error}'.lower()
+    return 'ratelimit' in text or 'rate limit' in text or 'resource_exhausted' in text or ' 429' in text
+
+def is_transient_error(error: Exception) -> bool:
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    name = type(error).__name__.lower()
+    return 'timeout' in name or 'connection' in name or 'overloaded' in str(error).lower()
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Reads the delay the provider asked for, from a `Retry-After` header or the error message.
+    """
+
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        value = headers.get('retry-after')
+        if value is not None:
+            return float(value)
+    except (TypeError, ValueError, AttributeError):
+        pass
+
+    match = RETRY_AFTER_PATTERN.search(str(error))
+    if match:
+        delay = float(match.group(1))
+        return delay / 1000 if match.group(2) == 'ms' else delay
+    return None
+
+class TokenBucket:
+    """
+    A token bucket refilling `capacity` tokens per minute.
+
+    Waiters are served in arrival order. A request larger than the whole bucket is let through
+    once the bucket is full, so oversized prompts are slowed down instead of blocked forever.
+    """
+
+    def __init__(self, capacity: float) -> None:
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """
+        Takes `amount` tokens, waiting for the bucket to refill if needed.
+
+        Returns:
+            float: The time spent waiting in seconds
+        """
+
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= amount
+        return waited
+
+    def adjust(self, amount: float) -> None:
+        """Gives back (positive) or takes away (negative) tokens once the real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self) -> None:
+        """Empties the bucket after the provider reported that the quota is used up."""
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: grows by one slot per window of successful calls and halves on throttling.
+    """
+
+    def __init__(self, max_limit: int = 8, min_limit: int = 1) -> None:
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, succeeded: bool = True, throttled: bool = False) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif succeeded:
+                self.limit = min(self.max_limit, self.limit + 1 / max(self.limit, 1))
+            self._condition.notify_all()
+
+class RateLimiter:
+    """
+    Client-side rate limiting for one provider model.
+
+    Every call reserves one request from the RPM bucket and its estimated prompt tokens from the
+    TPM bucket, then runs inside an AIMD concurrency limit. A 429 halves the concurrency, empties
+    the buckets and retries after the delay the provider asked for (or an exponential backoff with
+    full jitter), so rate limits never surface to the planner unless `max_retries` is exhausted.
+
+    Attributes:
+        rpm (Optional[int]): Requests per minute, None for no limit
+        tpm (Optional[int]): Tokens per minute, None for no limit
+        max_retries (int): How many times a throttled or transiently failing call is retried
+        base_delay (float): The first backoff delay in seconds
+        max_delay (float): The upper bound of a backoff delay in seconds
+        throttled (int): The number of 429 responses received
+    """
+
+    def __init__(
+            self,
+            rpm: Optional[int] = None,
+            tpm: Optional[int] = None,
+            max_concurrency: int = 8,
+            min_concurrency: int = 1,
+            max_retries: int = 6,
+            base_delay: float = 1.0,
+            max_delay: float = 60.0
+        ) -> None:
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttled = 0
+
+    @property
+    def rpm(self) -> Optional[int]:
+        return self.requests.capacity if self.requests else None
+
+    @property
+    def tpm(self) -> Optional[int]:
+        return self.tokens.capacity if self.tokens else None
+
+    def configure(self, rpm: Optional[int] = None, tpm: Optional[int] = None, max_concurrency: Optional[int] = None) -> None:
+        if rpm and rpm != self.rpm:
+            self.requests = TokenBucket(rpm)
+        if tpm and tpm != self.tpm:
+            self.tokens = TokenBucket(tpm)
+        if max_concurrency and max_concurrency != self.concurrency.max_limit:
+            self.concurrency.max_limit = max_concurrency
+            self.concurrency.limit = min(self.concurrency.limit, max_concurrency)
+
+    def backoff(self, attempt: int, error: Optional[Exception] = None) -> float:
+        suggested = retry_after(error) if error else None
+        if suggested is not None:
+            return min(self.max_delay, suggested) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(self, call: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """
+        Runs a provider call within the limits, retrying on throttling and transient errors.
+
+        Args:
+            call (Callable[[], Awaitable[Any]]): Performs the request
+            estimated_tokens (int): The tokens to reserve from the TPM bucket
+
+        Returns:
+            Any: The response of the call
+        """
+
+        for attempt in range(self.max_retries + 1):
+            with start_span('llm.queue') as span:
+                waited = 0.0
+                if self.requests:
+                    waited += await self.requests.acquire(1)
+                if self.tokens:
+                    waited += await self.tokens.acquire(estimated_tokens)
+                await self.concurrency.acquire()
+                span.set_attributes(throttle_wait_s = round(waited, 3), attempt = attempt)
+
+            succeeded = throttled = False
+            try:
+                response = await call()
+                succeeded = True
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                if attempt == self.max_retries or not (throttled or is_transient_error(e)):
+                    raise
+                if throttled:
+                    self.throttled += 1
+                    for bucket in (self.requests, self.tokens):
+                        if bucket:
+                            bucket.drain()
+                delay = self.backoff(attempt, e)
+                print(f"Model call {'rate limited' if throttled else 'failed'} ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                await self.concurrency.release(succeeded, throttled)
+
+            self._reconcile(response, estimated_tokens)
+            return response
+
+    def _reconcile(self, response: Any, estimated_tokens: int) -> None:
+        if not self.tokens:
+            return
+        usage = getattr(response, 'usage', None)
+        total = getattr(usage, 'total_tokens', None) if usage is not None else None
+        if isinstance(total, (int, float)):
+            self.tokens.adjust(estimated_tokens - total)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rpm': self.rpm,
+            'tpm': self.tpm,
+            'concurrency_limit': round(self.concurrency.limit, 2),
+            'in_flight': self.concurrency.in_flight,
+            'throttled': self.throttled
+        }
+
+# Limiters hold asyncio primitives, so they are kept per event loop
+_LIMITERS: 'WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, RateLimiter]]' = WeakKeyDictionary()
+_OVERRIDES: Dict[str, Dict[str, int]] = {}
+
+def get_rate_limiter(
+        key: str,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> RateLimiter:
+    """
+    Returns the limiter shared by every provider instance of the model, creating it on first use.
+    Without limits from the arguments or `configure_rate_limit` the limiter only caps concurrency
+    and backs off on 429 responses. Must be called from within the running event loop.
+
+    Args:
+        key (str): The provider and model, e.g. `gemini/gemini-2.5-flash`
+        rpm (Optional[int]): Overrides the requests per minute
+        tpm (Optional[int]): Overrides the tokens per minute
+        max_concurrency (Optional[int]): Overrides the maximum number of requests in flight
+    """
+
+    limiters = _LIMITERS.setdefault(asyncio.get_running_loop(), {})
+    limiter = limiters.get(key)
+    if limiter is None:
+        limits = _OVERRIDES.get(key, {})
+        limiter = RateLimiter(
+            rpm = rpm or limits.get('rpm'),
+            tpm = tpm or limits.get('tpm'),
+            max_concurrency = max_concurrency or limits.get('max_concurrency') or 8
+        )
+        limiters[key] = limiter
+    else:
+        limiter.configure(rpm = rpm, tpm = tpm, max_concurrency = max_concurrency)
+    return limiter
+
+def configure_rate_limit(key: str, rpm: Optional[int] = None, tpm: Optional[int] = None, max_concurrency: Optional[int] = None) -> None:
+    """
+    Sets the quota of a model for every provider instance, e.g. `FREE_TIER_LIMITS` on a free tier key.
+
+    Args:
+        key (str): The provider and model, e.g. `gemini/gemini-2.5-flash`
+    """
+
+    overrides = _OVERRIDES.setdefault(key, {})
+    for name, value in (('rpm', rpm), ('tpm', tpm), ('max_concurrency', max_concurrency)):
+        if value:
+            overrides[name] = value
+
+    for limiters in _LIMITERS.values():
+        if key in limiters:
+            limiters[key].configure(rpm = rpm, tpm = tpm, max_concurrency = max_concurrency)
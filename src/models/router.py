@@ -0,0 +1,108 @@
+from .__init__ import BaseModel, Message, to_message_dicts
+from .rate_limit import estimate_tokens
+from ..tracing import start_span
+from typing import Any, Dict, List, Optional, Set
+import json
+import re
+
+# Where the calls of the agent come from, passed as `call_site` to `generate`
+PLANNER = 'planner'
+SCRAPER = 'scraper'
+OUTPUT = 'output'
+
+def is_json_response(response: Any) -> bool:
+    """Checks that a completion holds a JSON object, the way the agent parses it."""
+    try:
+        content = response.choices[0].message.content
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return False
+    if not content:
+        return False
+
+    match = re.search(r"```json\n(.*?)\n```", content, re.DOTALL)
+    try:
+        return isinstance(json.loads(match.group(1) if match else content), dict)
+    except json.JSONDecodeError:
+        return False
+
+class RoutedModel(BaseModel):
+    """
+    Sends each call to a fast or a strong model.
+
+    Routine planning steps and the final report go to the fast model. Extraction, oversized
+    prompts and planning steps the caller flags with `escalate=True` (e.g. after a tool error)
+    go to the strong model, and so does any call whose fast answer is not a JSON object.
+
+    Args:
+        fast (BaseModel): The cheap, low latency model
+        strong (BaseModel): The capable model for the hard calls
+        strong_call_sites (Set[str]): The call sites always served by the strong model
+        max_fast_prompt_tokens (int): The estimated prompt size above which the strong model is used
+        escalate_invalid_json (bool): Whether a fast answer that is not valid JSON is retried on the strong model
+    """
+
+    def __init__(
+            self,
+            fast: BaseModel,
+            strong: BaseModel,
+            strong_call_sites: Optional[Set[str]] = None,
+            max_fast_prompt_tokens: int = 24000,
+            escalate_invalid_json: bool = True
+        ) -> None:
+        self.fast = fast
+        self.strong = strong
+        self.strong_call_sites = strong_call_sites if strong_call_sites is not None else {SCRAPER}
+        self.max_fast_prompt_tokens = max_fast_prompt_tokens
+        self.escalate_invalid_json = escalate_invalid_json
+        self.routes: Dict[str, int] = {'fast': 0, 'strong': 0, 'escalated': 0}
+
+    @property
+    def model(self) -> str:
+        return f"{getattr(self.fast, 'model', 'fast')}|{getattr(self.strong, 'model', 'strong')}"
+
+    def route(self, messages: List[Dict[str, Any]], call_site: Optional[str] = None, escalate: bool = False) -> str:
+        """
+        Returns 'fast' or 'strong' for a call. Calls without a known call site go to the strong model.
+        """
+
+        if escalate or call_site is None or call_site in self.strong_call_sites:
+            return 'strong'
+        if call_site not in (PLANNER, OUTPUT):
+            return 'strong'
+        if estimate_tokens(messages) > self.max_fast_prompt_tokens:
+            return 'strong'
+        return 'fast'
+
+    async def generate(self, messages: List[Message], call_site: Optional[str] = None, escalate: bool = False, **kwargs) -> Any:
+        """
+        Generates a completion on the model chosen by `route`.
+
+        Args:
+            messages (List[Message]): The conversation to complete
+            call_site (Optional[str]): Where the call comes from: 'planner', 'scraper' or 'output'
+            escalate (bool): Whether the caller saw a failure and wants the strong model
+            **kwargs: Per-call parameters passed on to the chosen model
+        """
+
+        messages = to_message_dicts(messages)
+        target = self.route(messages, call_site, escalate)
+
+        with start_span('llm.route', call_site = call_site or '', target = target) as span:
+            if target == 'fast':
+                response = await self.fast.generate(messages, **kwargs)
+                if not self.escalate_invalid_json or is_json_response(response):
+                    self.routes['fast'] += 1
+                    return response
+                span.set_attribute('escalated', True)
+                self.routes['escalated'] += 1
+
+            self.routes['strong'] += 1
+            return await self.strong.generate(messages, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns how many calls each model answered, and how many fast answers were escalated."""
+        return dict(self.routes)
+
+    def configure(self, **kwargs) -> None:
+        self.fast.configure(**kwargs)
+        self.strong.configure(**kwargs)
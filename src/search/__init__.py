@@ -0,0 +1,215 @@
+from ..cache import DiskCache
+from ..tracing import start_span
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, TypedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import asyncio
+import os
+import re
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '../../.cache/search')
+
+class SearchResult(TypedDict):
+    title: str
+    url: str
+    snippet: str
+
+class FusedResult(TypedDict):
+    title: str
+    url: str
+    snippet: str
+    score: float
+    queries: int
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMETERS = ('utm_', 'gclid', 'fbclid', 'msclkid', 'ref', 'ref_src')
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'find', 'for', 'from', 'get', 'give',
+    'how', 'i', 'in', 'is', 'it', 'me', 'my', 'of', 'on', 'or', 'please', 'search', 'show', 'tell', 'that',
+    'the', 'their', 'this', 'to', 'us', 'was', 'what', 'when', 'where', 'which', 'who', 'why', 'with', 'you'
+}
+
+def normalize_url(url: str) -> str:
+    """
+    Reduces a URL to the form used to detect duplicate results: https, lowercase host without `www.`,
+    no fragment, no tracking parameters and no trailing slash.
+    """
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix('www.')
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMETERS)
+    ))
+    scheme = parts.scheme.lower()
+    return urlunsplit(('https' if scheme in ('http', 'https', '') else scheme, host, parts.path.rstrip('/') or '/', query, ''))
+
+def expand_query(query: str, variants: Optional[Sequence[str]] = None, max_queries: int = 3) -> List[str]:
+    """
+    Builds the queries searched for one research question: the question itself, the given
+    variants and, if there is room left, the question reduced to its keywords.
+    """
+
+    queries = [query.strip()] + [variant.strip() for variant in variants or []]
+    keywords = ' '.join(word for word in re.findall(r'[\w\-\.\']+', query) if word.lower() not in STOP_WORDS)
+    if keywords:
+        queries.append(keywords)
+
+    unique = {}
+    for candidate in queries:
+        if candidate and candidate.lower() not in unique:
+            unique[candidate.lower()] = candidate
+    return list(unique.values())[:max(1, max_queries)]
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[SearchResult]], k: int = 60) -> List[FusedResult]:
+    """
+    Merges the rankings of several searches. Every result scores `1 / (k + rank)` per list it
+    appears in, so pages found by several queries rise to the top. Results pointing at the same
+    page are merged, keeping the title and snippet of their best ranked occurrence.
+
+    Args:
+        result_lists (Sequence[List[SearchResult]]): The results of every search, best first
+        k (int): Damps the weight of the top ranks, 60 is the usual choice
+
+    Returns:
+        List[FusedResult]: The merged results, best first
+    """
+
+    fused: Dict[str, FusedResult] = {}
+    best_rank: Dict[str, int] = {}
+    for results in result_lists:
+        seen = set()
+        for rank, result in enumerate(results, start=1):
+            if not result.get('url'):
+                continue
+            key = normalize_url(result['url'])
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if key not in fused:
+                fused[key] = FusedResult(title = result.get('title', ''), url = result['url'], snippet = result.get('snippet', ''), score = 0.0, queries = 0)
+                best_rank[key] = rank
+            elif rank < best_rank[key]:
+                fused[key].update(title = result.get('title', ''), url = result['url'], snippet = result.get('snippet', ''))
+                best_rank[key] = rank
+            fused[key]['score'] += 1 / (k + rank)
+            fused[key]['queries'] += 1
+
+    return sorted(fused.values(), key = lambda result: result['score'], reverse = True)
+
+class SearchBackend(ABC):
+    """
+    Base class of the web search backends.
+    """
+
+    name: str = 'backend'
+
+    @abstractmethod
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        """
+        Searches the web without blocking the event loop.
+
+        Args:
+            query (str): The query to search for
+            max_results (int): The maximum number of results to return
+
+        Returns:
+            List[SearchResult]: The results, best first
+        """
+        pass
+
+class DDGSBackend(SearchBackend):
+    """
+    Searches with the `ddgs` metasearch client. The client is synchronous, so every
+    search runs in a worker thread.
+
+    Args:
+        safesearch (str): The safe search level ('on', 'moderate' or 'off')
+        region (str): The region of the results
+    """
+
+    name = 'ddgs'
+
+    def __init__(self, safesearch: str = 'off', region: str = 'us-en') -> None:
+        self.safesearch = safesearch
+        self.region = region
+
+    def _search(self, query: str, max_results: int) -> List[SearchResult]:
+        from ddgs import DDGS
+        results = DDGS().text(
+            query = query,
+            max_results = max_results,
+            safesearch = self.safesearch,
+            region = self.region
+        )
+        return [
+            SearchResult(title = result.get('title', ''), url = result.get('href', ''), snippet = result.get('body', ''))
+            for result in results or []
+        ]
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        return await asyncio.to_thread(self._search, query, max_results)
+
+class WebSearch:
+    """
+    Runs web searches through a backend, with an on-disk cache of query results and
+    concurrent batches of queries.
+
+    Attributes:
+        backend (SearchBackend): The search backend, `DDGSBackend` by default
+        cache (Optional[DiskCache]): The query → results cache, None when caching is disabled
+        max_concurrency (int): The maximum number of searches of a batch running at once
+    """
+
+    def __init__(
+            self,
+            backend: Optional[SearchBackend] = None,
+            cache: DiskCache | bool | None = True,
+            ttl: Optional[float] = 24 * 3600,
+            max_concurrency: int = 4
+        ) -> None:
+        self.backend = backend or DDGSBackend()
+        if cache is True:
+            cache = DiskCache(DEFAULT_CACHE_DIR, ttl = ttl, max_size_mb = 64)
+        self.cache = cache or None
+        self.max_concurrency = max_concurrency
+
+    async def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
+        """
+        Returns the results of the query, from the cache when the same query was searched recently.
+        Failed searches are not cached.
+        """
+
+        key = DiskCache.make_key('search', self.backend.name, query.strip().lower(), max_results)
+        with start_span('search.query', **{'search.backend': self.backend.name}) as span:
+            results = self.cache.get(key) if self.cache else None
+            span.set_attribute('cache.hit', results is not None)
+            if results is None:
+                results = await self.backend.search(query, max_results)
+                if self.cache and results:
+                    self.cache.set(key, results)
+            span.set_attribute('search.results', len(results))
+        return results
+
+    async def search_many(self, queries: List[str], max_results: int = 10) -> Dict[str, List[SearchResult] | str]:
+        """
+        Runs several queries concurrently.
+
+        Returns:
+            Dict[str, List[SearchResult] | str]: The results by query, or the error of a failed query
+        """
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(query: str) -> List[SearchResult] | str:
+            async with semaphore:
+                try:
+                    return await self.search(query, max_results)
+                except Exception as e:
+                    return f'Error: {e}'
+
+        unique_queries = list(dict.fromkeys(queries))
+        results = await asyncio.gather(*(run(query) for query in unique_queries))
+        return dict(zip(unique_queries, results))
@@ -1,9 +1,12 @@
+from __future__ import annotations
 from abc import ABC, abstractmethod
 from ..dom import DOM
 from ..dom.state import DOMState
 from ..models import BaseModel
-from typing import Dict, Any, Optional    
-from playwright.async_api import Page
+from typing import TYPE_CHECKING, Dict, Any, Optional    
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 class BaseTool(ABC):
     """
@@ -62,6 +65,12 @@ class BaseTool(ABC):
         """
         pass
 
+    def reset(self) -> None:
+        """
+        Clears the state kept between the calls of one run, as the tool instance is reused by the next run
+        """
+        pass
+
     def to_json_schema(self) -> Dict[str, Any]:
         """
         Returns the JSON schema of the tool
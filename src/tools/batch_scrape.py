@@ -0,0 +1,83 @@
+from __future__ import annotations
+from .base_tool import BaseTool
+from ..models import BaseModel
+from ..agent.utils import scrape_url
+from ..fetch import HttpFetcher
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Dict, List, Union, Any, Optional
+import asyncio
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+class BatchScrapeArgs(BaseModel):
+    """Arguments for the BatchScrapeTool."""
+    urls: List[str] = Field(..., description="The list of URLs to open and scrape.")
+    user_input: str = Field(..., description="User Query describing what to scrape from every page.")
+    max_tabs: int = Field(5, description="The maximum number of tabs to open at the same time. Defaults to 5.")
+    timeout: int = Field(30000, description="Navigation timeout per page in milliseconds. Defaults to 30000 (30 seconds).")
+
+class BatchScrapeTool(BaseTool):
+    name: str = "batch_scrape"
+    description: str = "Opens a list of URLs in parallel (plain HTTP for static pages, browser tabs for JavaScript pages) and scrapes every page based on the user query in a single step. Use it instead of repeated navigate and scraper calls whenever the user gives several URLs to scrape the same way. The current page is left untouched."
+    args_schema: BaseModel = BatchScrapeArgs
+
+    def __init__(
+            self,
+            page: Page,
+            model: BaseModel,
+            scraper_response_json_format: Optional[Dict[str, Any]] = None,
+            fetcher: Optional[HttpFetcher] = None
+        ):
+        super().__init__(
+            page = page,
+            model = model,
+            scraper_response_json_format = scraper_response_json_format
+        )
+        self.fetcher = fetcher
+
+    async def run(self, args: BatchScrapeArgs) -> Union[str, List]:
+        """
+        Fans the URLs out to at most `max_tabs` concurrent loads (HTTP fast path first, then
+        pages of the current browser context) and merges the extracted data into a single list.
+        """
+
+        if not args.urls:
+            return "Error: No URLs were given to scrape."
+
+        semaphore = asyncio.Semaphore(max(1, args.max_tabs))
+        results = await asyncio.gather(*[
+            scrape_url(
+                url = url,
+                user_query = args.user_input,
+                context = self.page.context,
+                model = self.model,
+                fetcher = self.fetcher,
+                scraper_output_json_schema = self.scraper_response_json_format,
+                timeout = args.timeout,
+                semaphore = semaphore
+            )
+            for url in args.urls
+        ])
+
+        merged = []
+        errors = []
+        for result in results:
+            if 'error' in result:
+                errors.append(result['error'])
+                print(f"❗ {result['error']}")
+                continue
+
+            response = result['response']
+            if isinstance(response, list):
+                merged.extend(response)
+            elif isinstance(response, dict):
+                merged.append(response)
+            elif response:
+                merged.append({"url": result['url'], "response": response})
+
+        if not merged and errors:
+            return "Error: " + "; ".join(errors)
+
+        print(f"Scraped {len(args.urls) - len(errors)}/{len(args.urls)} pages in parallel.")
+        return merged
@@ -1,9 +1,13 @@
+from __future__ import annotations
 from .base_tool import BaseTool
-from playwright.async_api import Page
-from typing import Union, Dict
+from ..dom.frames import locate_xpath
+from typing import TYPE_CHECKING, Union, Dict
 from pydantic import BaseModel, Field
 import random
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class ClickElementArgs(BaseModel):
     """Arguments for the ClickElement tool."""
     xpath: str = Field(..., description="XPath of the element to click.")
@@ -25,7 +29,7 @@ class ClickElementTool(BaseTool):
         try:
             if args.xpath:
                 # await self.page.locator(f'xpath={args.xpath}').scroll_into_view_if_needed()
-                await self.page.locator(f'xpath={args.xpath}').click()
+                await locate_xpath(self.page, args.xpath).click()
                 return f"Successfully clicked at element with xpath: {args.xpath}"
             if args.x is not None and args.y is not None:
                 jitter_x = random.uniform(-2, 2)
@@ -1,10 +1,14 @@
+from __future__ import annotations
 from .base_tool import BaseTool
-from typing import Dict, Union
+from ..dom.frames import locate_xpath
+from typing import TYPE_CHECKING, Dict, Union
 from pydantic import BaseModel, Field
-from playwright.async_api import Page
 import random
 import asyncio
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class ClickAndTypeArgs(BaseModel):
     """Arguments for the ClickAndTypeTool."""
     xpath: str = Field(..., description="XPath of the element to click.")
@@ -23,11 +27,11 @@ class ClickAndTypeTool(BaseTool):
     async def run(self, args: ClickAndTypeArgs) -> Union[str, Dict]:
         try:
             if args.xpath:
-                await self.page.locator(f'xpath={args.xpath}').clear()
-                await self.page.locator(f'xpath={args.xpath}').press_sequentially(args.text, delay=random.uniform(50, 150))
+                await locate_xpath(self.page, args.xpath).clear()
+                await locate_xpath(self.page, args.xpath).press_sequentially(args.text, delay=random.uniform(50, 150))
                 return f"Successfully clicked and typed text into element with xpath using emunium: {args.xpath}"
             else:
-                await self.page.locator(f'xpath={args.xpath}').clear()
+                await locate_xpath(self.page, args.xpath).clear()
                 await self.page.mouse.click(args.x, args.y)
                 await asyncio.sleep(0.5)
                 await self.page.keyboard.type(args.text, delay=random.uniform(50, 150))
@@ -1,9 +1,12 @@
+from __future__ import annotations
 from .base_tool import BaseTool
-from playwright.async_api import Page
-from typing import Dict, Union
+from typing import TYPE_CHECKING, Dict, Union
 from pydantic import BaseModel
 from bs4 import BeautifulSoup, Comment
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class GetHtmlTool(BaseTool):
     name: str = "get_html"
     description: str = "Returns a cleaned and simplified version of the page's HTML content, optimized for an LLM."
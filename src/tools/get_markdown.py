@@ -1,9 +1,12 @@
+from __future__ import annotations
 from .base_tool import BaseTool
-from playwright.async_api import Page
-from typing import Dict, Union
+from typing import TYPE_CHECKING, Dict, Union
 from pydantic import BaseModel
 from markdownify import markdownify as md
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class GetMarkdownTool(BaseTool):
     name: str = "get_markdown"
     description: str = "Returns the Markdown content of the page."
@@ -1,9 +1,13 @@
+from __future__ import annotations
 from .base_tool import BaseTool
 from ..dom import DOM
-from playwright.async_api import Page
-from typing import Dict, Union
+from ..tracing import start_span
+from typing import TYPE_CHECKING, Dict, Union
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class InjectCodeArgs(BaseModel):
     """Arguments for the InjectCode tool."""
     code: str = Field(..., description="The code to inject into the page.")
@@ -18,7 +22,8 @@ class InjectCodeTool(BaseTool):
 
     async def run(self, args: InjectCodeArgs) -> Union[str, Dict]:
         try:
-            js_response = await self.page.evaluate(args.code)
+            with start_span('page.evaluate', caller=self.name):
+                js_response = await self.page.evaluate(args.code)
             return f"Code injected and gave this response\n: {js_response}"
         except Exception as e:
             return {"error": str(e)}
\ No newline at end of file
@@ -1,8 +1,11 @@
+from __future__ import annotations
 from .base_tool import BaseTool
-from playwright.async_api import Page
-from typing import Union, Dict
+from typing import TYPE_CHECKING, Union, Dict
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class PressKeyArgs(BaseModel):
     """Arguments for the PressKeyTool."""
     key: str = Field(..., 
@@ -1,8 +1,13 @@
+from __future__ import annotations
 from .base_tool import BaseTool
 from ..dom import DOM
-from typing import Dict, Union
+from ..browser.prefetch import Prefetcher
+from ..tracing import start_span
+from typing import TYPE_CHECKING, Dict, Union, Optional
 from pydantic import BaseModel, Field
-from playwright.async_api import Page
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 class NavigateArgs(BaseModel):
     """Arguments for the NavigateTool."""
@@ -14,13 +19,22 @@ class NavigateTool(BaseTool):
     description: str = "Navigates to a specific URL and waits for the page to load."
     args_schema: BaseModel = NavigateArgs
 
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, prefetcher: Optional[Prefetcher] = None):
         super().__init__(page = page)
+        self.prefetcher = prefetcher
 
     async def run(self, args: NavigateArgs) -> Union[str, Dict]:
         try:
-            await self.page.goto(args.url, timeout=args.timeout)
-            await self.page.wait_for_load_state("networkidle")
+            if self.prefetcher and await self.prefetcher.swap_in(args.url):
+                # self.page now points to the prefetched page
+                with start_span('wait.networkidle', caller=self.name, prefetched=True):
+                    await self.page.wait_for_load_state("networkidle")
+                return f"Successfully navigated to {args.url}."
+
+            with start_span('page.goto', url=args.url):
+                await self.page.goto(args.url, timeout=args.timeout)
+            with start_span('wait.networkidle', caller=self.name):
+                await self.page.wait_for_load_state("networkidle")
             return f"Successfully navigated to {args.url}."
         except Exception as e:
             return {"error": f"Failed to navigate to {args.url}: {e}"}
\ No newline at end of file
@@ -1,45 +1,117 @@
 from .base_tool import BaseTool
-from typing import List, Type
+from typing import Any, Dict, FrozenSet, Literal, Sequence, Tuple, Type, Union, get_args, get_origin
+from types import NoneType, UnionType
+from functools import lru_cache
 import os
+import inspect
 import importlib
 
-def get_tool_classes() -> List[Type[BaseTool]]:
+@lru_cache(maxsize = None)
+def get_tool_modules() -> Tuple[str, ...]:
+    """
+    Lists the tool modules of the tools directory, without importing them.
+    The name of a module is the file name of the tool.
+
+    Returns:
+        Tuple[str, ...]: The module names, sorted.
+    """
+
+    return tuple(sorted(
+        filename[:-3] for filename in os.listdir(os.path.dirname(__file__))
+        if filename.endswith(".py") and not filename.startswith("__") and filename != "base_tool.py" and filename != "register.py"
+    ))
+
+@lru_cache(maxsize = None)
+def _load_tool_module(module_name: str) -> Tuple[Type[BaseTool], ...]:
+    try:
+        module = importlib.import_module(f".{module_name}", package="src.tools")
+    except ImportError as e:
+        print(f"Error importing tool module {module_name}: {e}")
+        return ()
+
+    return tuple(
+        obj for obj in module.__dict__.values()
+        if isinstance(obj, type) and issubclass(obj, BaseTool) and obj is not BaseTool
+    )
+
+def get_tool_classes(ignore: Sequence[str] = ()) -> Tuple[Type[BaseTool], ...]:
     """
     Dynamically discovers and returns all tool classes.
+    Modules are imported once per process, and the modules of ignored tools are not imported at all,
+    so the dependencies of disabled tools are never loaded.
+
+    Args:
+        ignore (Sequence[str]): File names of the tools to leave out.
     
     Returns:
-        List[Type[BaseTool]]: List of tool classes.
+        Tuple[Type[BaseTool], ...]: The tool classes.
     """
 
     tool_classes = []
-    tools_dir = os.path.dirname(__file__)
+    for module_name in get_tool_modules():
+        if module_name not in ignore:
+            tool_classes.extend(_load_tool_module(module_name))
+    return tuple(tool_classes)
 
-    for filename in os.listdir(tools_dir):
-        if filename.endswith(".py") and not filename.startswith("__") and filename != "base_tool.py" and filename != "register.py":
-            module_name = filename[:-3]
-            try:
-                module = importlib.import_module(f".{module_name}", package="src.tools")
-                
-                for name, obj in module.__dict__.items():
-                    if isinstance(obj, type) and issubclass(obj, BaseTool) and obj is not BaseTool:
-                        tool_classes.append(obj)
+def get_tool_registry(ignore: Sequence[str] = ()) -> Dict[str, Type[BaseTool]]:
+    """
+    Returns the discovered tool classes by name, without the ignored ones.
+    
+    Args:
+        ignore (Sequence[str]): Names of the tools to leave out.
+    
+    Returns:
+        Dict[str, Type[BaseTool]]: The tool classes keyed by tool name.
+    """
 
-            except ImportError as e:
-                print(f"Error importing tool module {module_name}: {e}")
+    return {tool_class.name: tool_class for tool_class in get_tool_classes(ignore) if tool_class.name not in ignore}
+
+@lru_cache(maxsize = None)
+def get_constructor_params(tool_class: Type[BaseTool]) -> FrozenSet[str]:
+    """
+    Returns the names of the constructor parameters of a tool, used to inject its dependencies.
+    """
 
-    return tool_classes
+    return frozenset(inspect.signature(tool_class.__init__).parameters)
 
-def generate_tools_markdown(tool_classes: List[Type[BaseTool]]) -> str:
+def format_annotation(annotation: Any) -> str:
+    """
+    Renders the type of a tool argument for the prompt, inner types included, e.g. `Optional[List[str]]`
+    where the `__name__` of the annotation would only say `Optional`.
+    """
+
+    args = get_args(annotation)
+    if annotation is Ellipsis:
+        return '...'
+    if not args:
+        return getattr(annotation, '__name__', str(annotation).replace('typing.', ''))
+
+    origin = get_origin(annotation)
+    if origin in (Union, UnionType) and NoneType in args:
+        others = [arg for arg in args if arg is not NoneType]
+        inner = format_annotation(others[0]) if len(others) == 1 else f"Union[{', '.join(map(format_annotation, others))}]"
+        return f"Optional[{inner}]"
+    if origin is Literal:
+        return f"Literal[{', '.join(map(repr, args))}]"
+    name = getattr(annotation, '_name', None) or getattr(origin, '__name__', str(origin))
+    return f"{name}[{', '.join(map(format_annotation, args))}]"
+
+def generate_tools_markdown(tool_classes: Sequence[Type[BaseTool]]) -> str:
     """
     Generates a markdown string containing information about all tools.
+    The markdown is cached per tool set.
     
     Args:
-        tool_classes (List[Type[BaseTool]]): List of tool classes to generate markdown for.
+        tool_classes (Sequence[Type[BaseTool]]): Tool classes to generate markdown for.
     
     Returns:
         str: Markdown string containing information about all tools.
     """
 
+    return _generate_tools_markdown(tuple(tool_classes))
+
+@lru_cache(maxsize = 32)
+def _generate_tools_markdown(tool_classes: Tuple[Type[BaseTool], ...]) -> str:
     markdown_lines = []
 
     for tool_class in tool_classes:
@@ -52,9 +124,9 @@ def generate_tools_markdown(tool_classes: List[Type[BaseTool]]) -> str:
                 else:   
                     req_or_default = f"default = {field_info.default}"
                 
-                arg_type = field_info.annotation.__name__
+                arg_type = format_annotation(field_info.annotation)
                 arg_desc = field_info.description or ""
                 
                 markdown_lines.append(f"    - Args: `{field_name}` ({arg_type}, {req_or_default}) - {arg_desc}")
 
-    return "\n".join(markdown_lines)
\ No newline at end of file
+    return "\n".join(markdown_lines)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+from .base_tool import BaseTool
+from ..models import BaseModel
+from ..agent.utils import scrape_url
+from ..fetch import HttpFetcher
+from ..search import WebSearch, expand_query, reciprocal_rank_fusion
+from ..tracing import start_span
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Dict, List, Union, Any, Optional
+import asyncio
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+class ResearchArgs(BaseModel):
+    """Arguments for the ResearchTool."""
+    query: str = Field(..., description="The research question to search the web for.")
+    user_input: str = Field(..., description="User Query describing what to extract from every page found.")
+    variants: Optional[List[str]] = Field(None, description="Other phrasings of the question to search for as well.")
+    max_queries: int = Field(3, description="The maximum number of searches, the question and its variants included. Defaults to 3.")
+    top_k: int = Field(5, description="The number of best ranked pages to open and scrape. Defaults to 5.")
+    max_tabs: int = Field(5, description="The maximum number of pages loading at the same time. Defaults to 5.")
+    timeout: int = Field(30000, description="Navigation timeout per page in milliseconds. Defaults to 30000 (30 seconds).")
+
+class ResearchTool(BaseTool):
+    name: str = "research"
+    description: str = "Answers an open-ended question from the web in a single step: searches the question and its variants in parallel, ranks the combined results, then opens and scrapes the best pages in parallel. Use it when the user asks to find information without naming the websites to use, instead of web_search followed by navigate and scraper calls for every link."
+    args_schema: BaseModel = ResearchArgs
+
+    def __init__(
+            self,
+            page: Page,
+            model: BaseModel,
+            scraper_response_json_format: Optional[Dict[str, Any]] = None,
+            fetcher: Optional[HttpFetcher] = None,
+            search: Optional[WebSearch] = None
+        ):
+        super().__init__(
+            page = page,
+            model = model,
+            scraper_response_json_format = scraper_response_json_format
+        )
+        self.fetcher = fetcher
+        self.search = search or WebSearch()
+
+    async def run(self, args: ResearchArgs) -> Union[str, List]:
+        """
+        Runs the research pipeline: query expansion, concurrent searches, reciprocal-rank fusion
+        with URL deduplication, then parallel fetching and extraction of the `top_k` pages.
+        Every extracted item keeps the page it came from as `source`, unless a response schema is set.
+        """
+
+        queries = expand_query(args.query, args.variants, args.max_queries)
+        with start_span('research.search', queries = len(queries)):
+            search_results = await self.search.search_many(queries)
+
+        ranked = reciprocal_rank_fusion([results for results in search_results.values() if isinstance(results, list)])
+        if not ranked:
+            errors = [results for results in search_results.values() if isinstance(results, str)]
+            return "Error: The web search returned no results" + (f": {'; '.join(errors)}" if errors else ".")
+
+        top = ranked[:max(1, args.top_k)]
+        print(f"Searched {len(queries)} queries, {len(ranked)} unique pages found, scraping the top {len(top)}.")
+
+        semaphore = asyncio.Semaphore(max(1, args.max_tabs))
+        with start_span('research.scrape', pages = len(top)):
+            results = await asyncio.gather(*[
+                scrape_url(
+                    url = result['url'],
+                    user_query = args.user_input,
+                    context = self.page.context,
+                    model = self.model,
+                    fetcher = self.fetcher,
+                    scraper_output_json_schema = self.scraper_response_json_format,
+                    timeout = args.timeout,
+                    semaphore = semaphore
+                )
+                for result in top
+            ])
+
+        merged = []
+        errors = []
+        for result in results:
+            if 'error' in result:
+                errors.append(result['error'])
+                print(f"❗ {result['error']}")
+                continue
+
+            response = result['response']
+            items = response if isinstance(response, list) else [response]
+            for item in items:
+                if isinstance(item, dict):
+                    merged.append(item if self.scraper_response_json_format else {'source': result['url'], **item})
+                elif item:
+                    merged.append({"source": result['url'], "response": item})
+
+        if not merged and errors:
+            return "Error: " + "; ".join(errors)
+
+        print(f"Researched {len(top) - len(errors)}/{len(top)} pages in parallel.")
+        return merged
@@ -1,13 +1,13 @@
+from __future__ import annotations
 from .base_tool import BaseTool
 from ..dom import DOM
 from ..models import BaseModel
-from ..message import SystemMessage, UserMessage
-from ..agent.utils import build_scraper_prompt
-from ..agent.utils import extract_json
-from playwright.async_api import Page
-from markdownify import markdownify as md
+from ..agent.utils import html_to_markdown, extract_from_markdown
 from pydantic import BaseModel, Field
-from typing import Dict, Union, Any
+from typing import TYPE_CHECKING, Dict, List, Union, Any
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 class ScraperArgs(BaseModel):
     user_input: str = Field(..., description="""User Query""")
@@ -32,10 +32,13 @@ class ScraperTool(BaseTool):
         )
         self.last_seen_markdown = ""
 
-    async def run(self, args: ScraperArgs) -> Union[str, Dict]:
+    def reset(self) -> None:
+        self.last_seen_markdown = ""
+
+    async def run(self, args: ScraperArgs) -> Union[str, Dict, List]:
         try:
             html = await self.page.locator("body").inner_html()
-            current_markdown = md(html, strip = ["script", "style", "noscript", "iframe", "object", "embed", "link", "meta", "svg", "canvas"])
+            current_markdown = html_to_markdown(html)
             
             markdown_to_process = ""
             
@@ -45,43 +48,33 @@ class ScraperTool(BaseTool):
                 markdown_to_process = current_markdown[len(self.last_seen_markdown):]
                 print("New content detected. Processing only the delta to save context.")
             elif self.last_seen_markdown == current_markdown:
-                # The content is an exact duplicate
-                return "No new content found; page is identical to the last scrape."
+                # The content is an exact duplicate, nothing new is scraped
+                print("No new content found; page is identical to the last scrape.")
+                return []
             else:
                 # This is the first scrape or a completely different page
                 markdown_to_process = current_markdown
 
             # Avoid sending empty or whitespace-only content to the LLM
             if not markdown_to_process.strip():
-                return "No new textual content found to scrape."
+                print("No new textual content found to scrape.")
+                return []
             
             # Update the state for the *next* time the tool is called
             self.last_seen_markdown = current_markdown
 
-            system_prompt_template = build_scraper_prompt(
+            final_response = await extract_from_markdown(
+                model = self.model,
+                user_query = args.user_input,
+                markdown = markdown_to_process,
                 scraper_output_json_schema = self.scraper_response_json_format
             )
 
-            messages = [
-                SystemMessage(content = system_prompt_template).to_dict(),
-                UserMessage(content = f'User Query: {args.user_input}').to_dict(),
-                UserMessage(content = f'HTML Content in Markdown Format\n: {markdown_to_process}').to_dict(),
-            ]
-
-            self.model.messages = messages
-            response = await self.model.generate()
-            response = response.choices[0].message.content
-            # response = response['choices'][0]['message']['content']
-            final_response = extract_json(response)
-            if not final_response or 'response' not in final_response:
-                raise ValueError("LLM failed to return a valid JSON object with a 'response' key.")
-
             # --- CRITICAL CHANGE ---
             # Only update the 'last_seen_markdown' state AFTER the LLM call and parsing are successful.
             self.last_seen_markdown = current_markdown
             print("Successfully processed new content and updated tool memory.")
             
-            return final_response.get('response')
-            # return final_response['response']   
+            return final_response
         except Exception as e:
-            return str(e)
\ No newline at end of file
+            return {"error": f"Failed to scrape the page: {e}"}
\ No newline at end of file
@@ -1,16 +1,21 @@
+from __future__ import annotations
 from .base_tool import BaseTool
 from ..dom import DOM
+from ..dom.compact import CompactElements
+from ..dom.frames import locate_xpath
 from ..agent.state import AgentState
 from ..models import BaseModel
 from ..agent.utils import build_scraper_prompt, read_markdown_file, extract_json
 from ..message import SystemMessage, UserMessage
-from playwright.async_api import Page
 from markdownify import markdownify as md
 from pydantic import BaseModel, Field
-from typing import Dict, Union, Optional, Any
+from typing import TYPE_CHECKING, Dict, Union, Optional, Any
 import os
 import re
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class ScrollAndScrapeArgs(BaseModel):
     """Arguments for the ScrollAndScrapeTool."""
     user_query: str = Field(..., description="The user's original query defining the content to be scraped after scrolling is complete.")
@@ -86,8 +91,11 @@ class ScrollAndScrapeTool(BaseTool):
             # First, check if the PREVIOUS action loaded new content
             last_known_item_count = len(processed_xpaths)
             current_elements = await self.dom.get_informative_elements()
-            for el in current_elements:
-                processed_xpaths.add(el.get('xpath'))
+            if isinstance(current_elements, CompactElements):
+                processed_xpaths.update(current_elements.column('xpath'))
+            else:
+                for el in current_elements:
+                    processed_xpaths.add(el.get('xpath'))
 
             if i > 0 and len(processed_xpaths) == last_known_item_count:
                 consecutive_failures += 1
@@ -111,7 +119,7 @@ class ScrollAndScrapeTool(BaseTool):
                 xpath = button_to_click.get('xpath')
                 try:
                     # Use the modern page.locator() method for more robust interaction
-                    button_locator = self.page.locator(f"xpath={xpath}")
+                    button_locator = locate_xpath(self.page, xpath)
                     await button_locator.click(timeout=2000)
                     await self.page.wait_for_load_state('networkidle', timeout=5000)
                     print(f"Successfully clicked button: '{button_to_click.get('name')}'")
@@ -144,11 +152,10 @@ class ScrollAndScrapeTool(BaseTool):
             UserMessage(content=f'User Query: {args.user_query}').to_dict(),
             UserMessage(content=f'HTML Content in Markdown Format:\n: {markdown}').to_dict(),
         ]
-        self.model.messages = messages
-        response = await self.model.generate()
+        response = await self.model.generate(messages = messages, call_site = 'scraper')
         response_content = response['choices'][0]['message']['content']
         final_response = extract_json(response_content)
-        return final_response.get('response') if final_response else "Failed to extract JSON from the final response."
+        return final_response.get('response') if final_response else {"error": "Failed to extract JSON from the final response."}
 
 
 
@@ -238,8 +245,7 @@ class ScrollAndScrapeTool(BaseTool):
     #             UserMessage(content=f'HTML Content in Markdown Format:\n: {markdown}').to_dict(),
     #         ]
 
-    #         self.model.messages = messages
-    #         response = await self.model.generate()
+    #         response = await self.model.generate(messages = messages)
     #         response = response['choices'][0]['message']['content']
     #         final_response = extract_json(response)
     #         return final_response['response']   
@@ -1,9 +1,13 @@
+from __future__ import annotations
 from .base_tool import BaseTool
-from typing import Dict, Union, Optional
+from ..tracing import start_span
+from typing import TYPE_CHECKING, Dict, Union, Optional
 from pydantic import BaseModel, Field
-from playwright.async_api import Page
 import asyncio
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class ScrollSiteArgs(BaseModel):
     """Arguments for the ScrollSiteTool."""
     distance: float = Field(400, description = "Distance to scroll in pixels. Defaults to 400.")
@@ -21,15 +25,18 @@ class ScrollSiteTool(BaseTool):
     async def run(self, args: ScrollSiteArgs) -> Union[str, Dict]:
         try:
             if args.direction.lower().strip() == 'down':
-                await self.page.evaluate(f"window.scrollBy(0, {args.distance})")
+                with start_span('page.evaluate', caller=self.name):
+                    await self.page.evaluate(f"window.scrollBy(0, {args.distance})")
                 result_message = f"Page scrolled down by {args.distance} pixels."
             elif args.direction.lower().strip() == 'up':
-                await self.page.evaluate(f"window.scrollBy(0, -{args.distance})")
+                with start_span('page.evaluate', caller=self.name):
+                    await self.page.evaluate(f"window.scrollBy(0, -{args.distance})")
                 result_message = f"Page scrolled up by {args.distance} pixels."
             else:
                 return {"error": "Invalid scroll direction. Use 'up' or 'down'."}
 
-            await self.page.wait_for_load_state("networkidle")
+            with start_span('wait.networkidle', caller=self.name):
+                await self.page.wait_for_load_state("networkidle")
             if args.timeout:
                 await asyncio.sleep(args.timeout / 1000)
             return result_message
@@ -0,0 +1,38 @@
+from __future__ import annotations
+from .base_tool import BaseTool
+from ..dom.vision import PageVision
+from typing import Dict, Union, Optional
+from pydantic import BaseModel, Field
+
+class ViewRegionArgs(BaseModel):
+    """Arguments for the ViewRegionTool."""
+    element_id: Optional[int] = Field(None, description = "The number of an element on the last screenshot to zoom in on.")
+    x: Optional[float] = Field(None, description = "Left edge of the region in page pixels (the units of the element centers), used when no element_id is given.")
+    y: Optional[float] = Field(None, description = "Top edge of the region in page pixels (the units of the element centers), used when no element_id is given.")
+    width: Optional[float] = Field(None, description = "Width of the region in page pixels.")
+    height: Optional[float] = Field(None, description = "Height of the region in page pixels.")
+    padding: int = Field(40, description = "Margin in pixels kept around the element. Defaults to 40.")
+
+class ViewRegionTool(BaseTool):
+    name: str = "view_region"
+    description: str = "Zooms in on a part of the current screenshot: captures the region around a numbered element, or the given rectangle, at full resolution and attaches it to the next page state. Use it when small text, icons or dense tables on the screenshot are hard to read."
+    args_schema: BaseModel = ViewRegionArgs
+
+    def __init__(self, vision: PageVision):
+        super().__init__(page = vision.page)
+        self.vision = vision
+
+    async def run(self, args: ViewRegionArgs) -> Union[str, Dict]:
+        region = None
+        if args.element_id is None:
+            if None in (args.x, args.y, args.width, args.height):
+                return {"error": "Give an element_id, or x, y, width and height of the region to view."}
+            region = {'x': args.x, 'y': args.y, 'width': args.width, 'height': args.height}
+
+        try:
+            crop = await self.vision.crop(element_id = args.element_id, region = region, padding = args.padding)
+        except Exception as e:
+            return {"error": str(e)}
+
+        clip = crop['region']
+        return f"Captured the region at ({clip['x']:.0f}, {clip['y']:.0f}), {clip['width']:.0f}x{clip['height']:.0f} px, it is attached to the next page state."
@@ -1,8 +1,12 @@
+from __future__ import annotations
 from .base_tool import BaseTool
 from pydantic import BaseModel, Field
-from playwright.async_api import Page
+from typing import TYPE_CHECKING
 import asyncio
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class WaitArgs(BaseModel):
     timeout: int = Field(5, description="Timeout in seconds (default: 5)")
     # wait_for_networkidle: bool = Field(False, description="Wait for network idle")
@@ -1,25 +1,36 @@
 from .base_tool import BaseTool
+from ..search import WebSearch
 from pydantic import BaseModel, Field
-from ddgs import DDGS
+from typing import List, Optional
+import json
 
 class WebSearchArgs(BaseModel):
-    query: str = Field(..., description = "The query to search for on the internet")
-    max_results: int = Field(10, description = "The maximum number of results to return")
+    query: Optional[str] = Field(None, description = "The query to search for on the internet")
+    queries: Optional[List[str]] = Field(None, description = "Several queries to search for at once, instead of `query`")
+    max_results: int = Field(10, description = "The maximum number of results to return per query")
 
 class WebSearchTool(BaseTool):
     name: str = "web_search"
     description: str = """Searches the internet for information related to the user's query such as finding out any links which are relevant to the user's query. 
     Note that this is only to find out the links and not to scrape the content of the links. 
-    Can be useful when the user doesn't specify a website to scrape."""
+    Can be useful when the user doesn't specify a website to scrape.
+    Pass `queries` to run several searches at once."""
     args_schema: BaseModel = WebSearchArgs
 
-    def __init__(self):
+    def __init__(self, search: Optional[WebSearch] = None):
         super().__init__()
+        self.search = search or WebSearch()
 
     async def run(self, args: WebSearchArgs) -> str:
-        results = DDGS().text(
-            query = args.query, 
-            max_results = args.max_results,
-            safesearch = 'off'
-        )
-        return str(results)
+        queries = args.queries or ([args.query] if args.query else [])
+        if not queries:
+            return "Error: Provide a `query` or a list of `queries`."
+
+        try:
+            if len(queries) == 1:
+                results = await self.search.search(queries[0], args.max_results)
+            else:
+                results = await self.search.search_many(queries, args.max_results)
+        except Exception as e:
+            return f"Error: Web search failed: {e}"
+        return json.dumps(results, ensure_ascii = False)
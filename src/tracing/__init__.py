@@ -0,0 +1,237 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from colorama import Fore, Style
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import functools
+import json
+import os
+import time
+
+_current_tracer: ContextVar[Optional['Tracer']] = ContextVar('dwa_current_tracer', default=None)
+_current_span: ContextVar[Optional['Span']] = ContextVar('dwa_current_span', default=None)
+
+class Span:
+    """
+    A timed operation of a run.
+
+    Attributes:
+        name (str): The name of the operation, e.g. `model_node` or `tool.navigate`
+        trace_id (str): The 32 hex character id shared by every span of a run
+        span_id (str): The 16 hex character id of this span
+        parent_id (Optional[str]): The id of the enclosing span
+        attributes (Dict[str, Any]): Token counts, payload sizes and other details
+        status (str): 'ok' or 'error'
+    """
+
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or time.time_ns()),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': 2 if self.status == 'error' else 1},
+        }
+
+class _NoopSpan:
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+class Tracer:
+    """
+    Collects the spans of a run and exports them as OpenTelemetry (OTLP/JSON) compatible traces.
+
+    Spans nest through context variables, so spans opened inside graph nodes, tools and model
+    calls attach to whichever span is active in the calling task.
+
+    Attributes:
+        service_name (str): The `service.name` resource attribute of the export
+        export_path (Optional[str]): The file the trace is written to when the run ends
+        spans (List[Span]): The finished and in-flight spans, in start order
+    """
+
+    def __init__(self, service_name: str = 'dumb-web-agent', export_path: Optional[str] = None) -> None:
+        self.service_name = service_name
+        self.export_path = export_path
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(name, self.trace_id, parent.span_id if parent else None, attributes)
+        self.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = 'error'
+            span.set_attribute('error', str(e))
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+                'scopeSpans': [{
+                    'scope': {'name': 'dumb-web-agent'},
+                    'spans': [span.to_otlp() for span in self.spans]
+                }]
+            }]
+        }
+
+    def export(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Writes the trace as OTLP/JSON.
+
+        Returns:
+            Optional[str]: The path written to, None if no path was configured
+        """
+
+        path = path or self.export_path
+        if not path:
+            return None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_otlp(), f, indent=2)
+        return path
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregates the spans by name, slowest total first.
+        """
+
+        root_ms = max((span.duration_ms for span in self.spans if span.parent_id is None), default=0.0)
+        rows: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            row = rows.setdefault(span.name, {
+                'name': span.name, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'prompt_tokens': 0, 'completion_tokens': 0, 'payload_bytes': 0, 'errors': 0
+            })
+            row['count'] += 1
+            row['total_ms'] += span.duration_ms
+            row['max_ms'] = max(row['max_ms'], span.duration_ms)
+            row['prompt_tokens'] += int(span.attributes.get('llm.prompt_tokens', 0) or 0)
+            row['completion_tokens'] += int(span.attributes.get('llm.completion_tokens', 0) or 0)
+            row['payload_bytes'] += int(span.attributes.get('payload.bytes', 0) or 0)
+            row['errors'] += span.status == 'error'
+
+        for row in rows.values():
+            row['mean_ms'] = row['total_ms'] / row['count']
+            row['share'] = row['total_ms'] / root_ms if root_ms else 0.0
+        return sorted(rows.values(), key=lambda row: row['total_ms'], reverse=True)
+
+    def print_summary(self) -> None:
+        print(Fore.LIGHTWHITE_EX + Style.BRIGHT + '\nLatency breakdown:' + Style.RESET_ALL)
+        print(f"{'span':<28}{'count':>7}{'total ms':>12}{'mean ms':>10}{'max ms':>10}{'share':>8}{'tokens in/out':>16}{'bytes':>11}")
+        for row in self.summary():
+            tokens = f"{row['prompt_tokens']}/{row['completion_tokens']}" if row['prompt_tokens'] or row['completion_tokens'] else '-'
+            print(
+                f"{row['name'][:27]:<28}{row['count']:>7}{row['total_ms']:>12.1f}{row['mean_ms']:>10.1f}"
+                f"{row['max_ms']:>10.1f}{row['share']:>8.0%}{tokens:>16}{row['payload_bytes'] or '-':>11}"
+            )
+        print()
+
+def get_tracer() -> Optional[Tracer]:
+    """Returns the tracer of the current run, None when tracing is off."""
+    return _current_tracer.get()
+
+def activate(tracer: Tracer) -> Token:
+    """Makes the tracer current for this task and the tasks it spawns."""
+    return _current_tracer.set(tracer)
+
+def deactivate(token: Token) -> None:
+    _current_tracer.reset(token)
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Union[Span, _NoopSpan]]:
+    """
+    Opens a span on the current tracer, or does nothing when tracing is off.
+    """
+
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+
+    with tracer.span(name, **attributes) as span:
+        yield span
+
+def traced(name: str) -> Callable:
+    """
+    Decorator wrapping an async function in a span.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with start_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_llm_usage(span: Union[Span, _NoopSpan], messages: List[Dict[str, Any]], response: Any) -> None:
+    """
+    Attaches prompt size and token usage of a completion to a span.
+    """
+
+    if not span.recording:
+        return
+
+    span.set_attribute('payload.bytes', sum(len(str(message.get('content', '')).encode('utf-8')) for message in messages))
+    span.set_attribute('llm.messages', len(messages))
+    usage = getattr(response, 'usage', None) or (response.get('usage') if isinstance(response, dict) else None)
+    if usage:
+        get = usage.get if isinstance(usage, dict) else lambda key: getattr(usage, key, None)
+        span.set_attribute('llm.prompt_tokens', get('prompt_tokens') or 0)
+        span.set_attribute('llm.completion_tokens', get('completion_tokens') or 0)
@@ -0,0 +1,59 @@
+from src.cache import DiskCache
+import json
+import os
+import time
+
+def age(cache: DiskCache, key: str, seconds: float) -> None:
+    """Makes the entry look written `seconds` ago."""
+    path = cache._path(key)
+    with open(path, 'r', encoding='utf-8') as f:
+        entry = json.load(f)
+    entry['created_at'] = time.time() - seconds
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.utime(path, (entry['created_at'], entry['created_at']))
+
+def test_get_and_set(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = DiskCache.make_key('search', 'python', 10)
+
+    assert cache.get(key) is None
+    cache.set(key, [{'url': 'https://python.org'}])
+
+    assert cache.get(key) == [{'url': 'https://python.org'}]
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_hits_do_not_extend_the_lifetime_of_an_entry(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl = 60)
+    cache.set('a' * 64, 'value')
+    age(cache, 'a' * 64, 30)
+    mtime = os.stat(cache._path('a' * 64)).st_mtime
+
+    assert cache.get('a' * 64) == 'value'
+    assert os.stat(cache._path('a' * 64)).st_mtime == mtime
+
+def test_lookups_and_eviction_expire_the_same_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl = 60)
+    for key in ('a' * 64, 'b' * 64):
+        cache.set(key, key)
+    age(cache, 'a' * 64, 120)
+
+    assert cache.evict() == 1
+    assert cache.get('a' * 64) is None
+    assert cache.get('b' * 64) == 'b' * 64
+
+    age(cache, 'b' * 64, 120)
+    assert cache.get('b' * 64) is None
+    assert cache.stats()['entries'] == 0
+
+def test_eviction_removes_the_oldest_entries_first(tmp_path):
+    cache = DiskCache(str(tmp_path), max_size_mb = 0.0001)
+    for index, key in enumerate(('a' * 64, 'b' * 64, 'c' * 64)):
+        cache.set(key, 'x' * 40)
+        age(cache, key, 30 - index)
+
+    cache.evict()
+
+    assert cache.get('a' * 64) is None
+    assert cache.get('c' * 64) == 'x' * 40
@@ -0,0 +1,151 @@
+from src.agent.checkpoint import SQLiteCheckpointSaver
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import StateGraph, END
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
+import operator
+import pytest
+
+THREAD = {'configurable': {'thread_id': 'run-1', 'checkpoint_ns': ''}}
+
+@pytest.fixture
+def saver(tmp_path) -> SQLiteCheckpointSaver:
+    saver = SQLiteCheckpointSaver(str(tmp_path / 'checkpoints.sqlite'), max_delta_chain = 3)
+    yield saver
+    saver.close()
+
+def put(saver: SQLiteCheckpointSaver, step: int, values: Dict[str, Any], parent: Optional[Dict[str, Any]] = None, thread: Dict[str, Any] = THREAD) -> Dict[str, Any]:
+    """Stores a checkpoint whose channels all changed at this step."""
+    checkpoint = empty_checkpoint()
+    checkpoint['id'] = f'{step:04d}'
+    checkpoint['channel_values'] = values
+    checkpoint['channel_versions'] = {channel: step for channel in values}
+    config = parent or thread
+    return saver.put(config, checkpoint, {'source': 'loop', 'step': step}, checkpoint['channel_versions'])
+
+def blob_types(saver: SQLiteCheckpointSaver, channel: str) -> List[str]:
+    rows = saver.conn.execute("SELECT type FROM blobs WHERE channel = ? ORDER BY CAST(version AS INTEGER)", (channel,)).fetchall()
+    return [type_.split(':')[0] for type_, in rows]
+
+def test_put_and_get_round_trip(saver):
+    config = put(saver, 1, {'input': 'scrape', 'previous_actions': [{'tool_name': 'navigate'}], 'output': ''})
+
+    checkpoint_tuple = saver.get_tuple(THREAD)
+
+    assert config['configurable']['checkpoint_id'] == '0001'
+    assert checkpoint_tuple.checkpoint['id'] == '0001'
+    assert checkpoint_tuple.checkpoint['channel_values'] == {'input': 'scrape', 'previous_actions': [{'tool_name': 'navigate'}], 'output': ''}
+    assert checkpoint_tuple.metadata['step'] == 1
+    assert checkpoint_tuple.parent_config is None
+    assert saver.get_tuple({'configurable': {'thread_id': 'other'}}) is None
+
+def test_growing_lists_are_stored_as_deltas_up_to_the_chain_limit(saver):
+    config, items = None, []
+    for step in range(1, 10):
+        items = items + [{'step': step}]
+        config = put(saver, step, {'previous_actions': items}, parent = config)
+
+    # A full copy, then `max_delta_chain` appended suffixes, then a full copy again
+    assert blob_types(saver, 'previous_actions') == ['msgpack', 'append', 'append', 'append'] * 2 + ['msgpack']
+    for step in range(1, 10):
+        checkpoint_tuple = saver.get_tuple({'configurable': {**THREAD['configurable'], 'checkpoint_id': f'{step:04d}'}})
+        assert checkpoint_tuple.checkpoint['channel_values']['previous_actions'] == [{'step': index} for index in range(1, step + 1)]
+
+def test_rewritten_lists_and_other_values_are_stored_in_full(saver):
+    put(saver, 1, {'previous_actions': [1, 2], 'output': 'a'})
+    put(saver, 2, {'previous_actions': [1, 2, 3], 'output': 'b'})
+    # Folding the history drops the oldest records
+    put(saver, 3, {'previous_actions': [3, 4], 'output': 'c'})
+
+    assert blob_types(saver, 'previous_actions') == ['msgpack', 'append', 'msgpack']
+    assert saver.get_tuple(THREAD).checkpoint['channel_values'] == {'previous_actions': [3, 4], 'output': 'c'}
+
+def test_a_new_saver_reads_the_delta_chain_and_starts_a_full_copy(saver):
+    for step in range(1, 4):
+        put(saver, step, {'previous_actions': list(range(step))})
+
+    reopened = SQLiteCheckpointSaver(saver.path, max_delta_chain = 3)
+    put(reopened, 4, {'previous_actions': list(range(4))})
+
+    assert blob_types(reopened, 'previous_actions') == ['msgpack', 'append', 'append', 'msgpack']
+    assert reopened.get_tuple({'configurable': {'thread_id': 'run-1', 'checkpoint_id': '0003'}}).checkpoint['channel_values'] == {'previous_actions': [0, 1, 2]}
+    reopened.close()
+
+def test_list_with_before_limit_and_filter(saver):
+    config = None
+    for step in range(1, 6):
+        config = put(saver, step, {'output': str(step)}, parent = config)
+    put(saver, 1, {'output': 'x'}, thread = {'configurable': {'thread_id': 'run-2', 'checkpoint_ns': ''}})
+
+    ids = [item.checkpoint['id'] for item in saver.list(THREAD)]
+    before = [item.checkpoint['id'] for item in saver.list(THREAD, before = {'configurable': {'checkpoint_id': '0004'}}, limit = 2)]
+    filtered = [item.checkpoint['id'] for item in saver.list(THREAD, filter = {'step': 2})]
+
+    assert ids == ['0005', '0004', '0003', '0002', '0001']
+    assert before == ['0003', '0002']
+    assert filtered == ['0002']
+    assert len(list(saver.list(None))) == 6
+    assert saver.get_tuple(THREAD).parent_config['configurable']['checkpoint_id'] == '0004'
+
+def test_put_writes_are_returned_as_pending_writes(saver):
+    config = put(saver, 1, {'output': ''})
+
+    saver.put_writes(config, [('output', 'done'), ('scraped_data', [1])], task_id = 'task-1')
+    # A retried task keeps its first regular writes
+    saver.put_writes(config, [('output', 'again')], task_id = 'task-1')
+
+    assert saver.get_tuple(THREAD).pending_writes == [('task-1', 'output', 'done'), ('task-1', 'scraped_data', [1])]
+
+def test_delete_thread_removes_only_that_thread(saver):
+    put(saver, 1, {'previous_actions': [1]})
+    put(saver, 2, {'previous_actions': [1, 2]})
+    other = {'configurable': {'thread_id': 'run-2', 'checkpoint_ns': ''}}
+    put(saver, 1, {'previous_actions': [9]}, thread = other)
+
+    saver.delete_thread('run-1')
+
+    assert saver.get_tuple(THREAD) is None
+    assert list(saver.list(THREAD)) == []
+    assert saver.get_tuple(other).checkpoint['channel_values'] == {'previous_actions': [9]}
+    # The delta chain starts over, the deleted versions are not referenced
+    put(saver, 3, {'previous_actions': [1, 2, 3]})
+    assert saver.get_tuple(THREAD).checkpoint['channel_values'] == {'previous_actions': [1, 2, 3]}
+
+class StepState(TypedDict):
+    steps: Annotated[List[str], operator.add]
+    output: str
+
+def test_graph_resumes_from_the_saved_checkpoint(saver):
+    calls = []
+
+    def work(state: StepState) -> dict:
+        calls.append(len(state['steps']))
+        return {'steps': [f'step {len(state["steps"]) + 1}']}
+
+    def finish(state: StepState) -> dict:
+        return {'output': ', '.join(state['steps'])}
+
+    def route(state: StepState) -> str:
+        return 'finish' if len(state['steps']) >= 6 else 'work'
+
+    graph = StateGraph(StepState)
+    graph.add_node('work', work)
+    graph.add_node('finish', finish)
+    graph.set_entry_point('work')
+    graph.add_conditional_edges('work', route)
+    graph.add_edge('finish', END)
+    config = {'configurable': {'thread_id': 'graph-run'}}
+
+    # The first process stops before finishing, a second one resumes from the file
+    interrupted = graph.compile(checkpointer = saver, interrupt_before = ['finish'])
+    interrupted.invoke({'steps': [], 'output': ''}, config)
+    reopened = SQLiteCheckpointSaver(saver.path)
+    resumed = graph.compile(checkpointer = reopened)
+    snapshot = resumed.get_state(config)
+    result = resumed.invoke(None, config)
+    reopened.close()
+
+    assert snapshot.next == ('finish',)
+    assert snapshot.values['steps'] == [f'step {index}' for index in range(1, 7)]
+    assert result['output'] == ', '.join(f'step {index}' for index in range(1, 7))
+    assert calls == [0, 1, 2, 3, 4, 5]
+    assert 'append' in blob_types(saver, 'steps')
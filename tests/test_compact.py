@@ -0,0 +1,174 @@
+from src.dom import DOM
+from src.dom.compact import (
+    INFORMATIVE_FIELDS,
+    INTERACTIVE_FIELDS,
+    PACKED_FORMAT_VERSION,
+    SCROLLABLE_FIELDS,
+    CompactElements,
+    StringTable,
+    decode_packed_state,
+    json_default
+)
+from typing import Any, Dict, List
+import json
+import pytest
+
+INTERACTIVE = [
+    {
+        'tag': 'a', 'role': 'link', 'name': 'Next page', 'attributes': {'href': '/p/2', 'class': 'btn'},
+        'box': {'left': 10.5, 'top': 20, 'width': 100, 'height': 20.25}, 'center': {'x': 60, 'y': 30},
+        'xpath': '/html[1]/body[1]/nav[1]/a[1]'
+    },
+    {
+        'tag': 'input', 'role': 'searchbox', 'name': 'Search "products"\né', 'attributes': {},
+        'box': None, 'center': None, 'xpath': '/html[1]/body[1]/iframe[1] >> /html[1]/body[1]/input[1]'
+    }
+]
+INFORMATIVE = [
+    {'tag': 'h1', 'role': None, 'content': 'Products', 'center': {'x': 5, 'y': 5}, 'xpath': '/html[1]/body[1]/h1[1]'},
+    {'tag': 'p', 'role': 'none', 'content': 'Next page', 'center': {'x': 5, 'y': 50}, 'xpath': None}
+]
+SCROLLABLE = [
+    {'tag': 'div', 'role': 'none', 'name': 'none', 'attributes': {'class': 'list'}, 'xpath': '/html[1]/body[1]/div[1]'}
+]
+
+@pytest.fixture
+def state() -> Dict[str, CompactElements]:
+    strings = StringTable()
+    return {
+        'interactive_elements': CompactElements.from_dicts(INTERACTIVE, INTERACTIVE_FIELDS, strings),
+        'informative_elements': CompactElements.from_dicts(INFORMATIVE, INFORMATIVE_FIELDS, strings),
+        'scrollable_elements': CompactElements.from_dicts(SCROLLABLE, SCROLLABLE_FIELDS, strings)
+    }
+
+def test_from_dicts_round_trips(state):
+    assert state['interactive_elements'].to_dicts() == INTERACTIVE
+    assert state['informative_elements'].to_dicts() == INFORMATIVE
+    assert state['scrollable_elements'].to_dicts() == SCROLLABLE
+
+def test_lists_share_one_string_table(state):
+    strings = state['interactive_elements'].strings
+    assert state['informative_elements'].strings is strings
+    assert strings.values.count('Next page') == 1
+    assert strings.add(None) == -1
+    assert strings.get(-1) is None
+
+def test_element_views_read_like_dicts(state):
+    elements = state['interactive_elements']
+    first, last = elements[0], elements[-1]
+
+    assert first['xpath'] == '/html[1]/body[1]/nav[1]/a[1]'
+    assert first.get('missing') is None
+    assert 'box' in first and 'content' not in first
+    assert dict(first) == INTERACTIVE[0]
+    assert last['center'] is None
+    with pytest.raises(IndexError):
+        elements[2]
+    with pytest.raises(KeyError):
+        first['content']
+
+def test_columns_and_slices(state):
+    elements = state['interactive_elements']
+
+    assert elements.column('xpath') == [element['xpath'] for element in INTERACTIVE]
+    assert elements.column('name') == [element['name'] for element in INTERACTIVE]
+    assert elements.attribute_values(0) == ['/p/2', 'btn']
+    assert elements[1:].to_dicts() == INTERACTIVE[1:]
+    assert elements.take([1, 0]).to_dicts() == [INTERACTIVE[1], INTERACTIVE[0]]
+
+def test_extend_shifts_frame_elements_into_the_page():
+    page = CompactElements.from_dicts(INTERACTIVE[:1], INTERACTIVE_FIELDS)
+    frame = CompactElements.from_dicts(INTERACTIVE[:1], INTERACTIVE_FIELDS)
+
+    page.extend(frame, xpath_prefix = '/html[1]/body[1]/iframe[1] >> ', offset = (100.0, 200.0))
+
+    shifted = page[1]
+    assert shifted['xpath'] == '/html[1]/body[1]/iframe[1] >> /html[1]/body[1]/nav[1]/a[1]'
+    assert shifted['box'] == {'left': 110.5, 'top': 220, 'width': 100, 'height': 20.25}
+    assert shifted['center'] == {'x': 160, 'y': 230}
+
+def test_prompt_lines_match_the_dict_format(state):
+    dom = DOM(page = None)
+    for key, elements in (('interactive_elements', INTERACTIVE), ('informative_elements', INFORMATIVE), ('scrollable_elements', SCROLLABLE)):
+        assert dom.format_elements_for_prompt(state[key]) == dom.format_elements_for_prompt(elements)
+
+def pack_state(interactive: List[Dict[str, Any]], informative: List[Dict[str, Any]], scrollable: List[Dict[str, Any]]) -> str:
+    """
+    Packs elements the way `getElementsPacked()` of `script.js` does.
+    """
+
+    strings: List[str] = []
+    ids: Dict[str, int] = {}
+
+    def add(value):
+        if value is None:
+            return -1
+        if value not in ids:
+            ids[value] = len(strings)
+            strings.append(value)
+        return ids[value]
+
+    def pack(elements, text_key, has_attributes, has_box, has_center):
+        element_ids, offsets, pairs, boxes, centers = [], [0], [], [], []
+        for element in elements:
+            xpath = element.get('xpath')
+            slash = -1 if xpath is None else xpath.rfind('/')
+            element_ids += [
+                add(element['tag']), add(element['role']), add(element[text_key]),
+                -1 if slash < 0 else add(xpath[:slash]), add(xpath if slash < 0 else xpath[slash + 1:])
+            ]
+            if has_attributes:
+                for name, value in (element.get('attributes') or {}).items():
+                    pairs += [add(name), add(value)]
+                offsets.append(len(pairs) // 2)
+            if has_box:
+                box = element.get('box') or {}
+                boxes += [box.get(key) for key in ('left', 'top', 'width', 'height')]
+            if has_center:
+                center = element.get('center') or {}
+                centers += [center.get(key) for key in ('x', 'y')]
+        return [element_ids, offsets, pairs, boxes, centers]
+
+    return json.dumps([
+        PACKED_FORMAT_VERSION,
+        strings,
+        pack(interactive, 'name', True, True, True),
+        pack(informative, 'content', False, False, True),
+        pack(scrollable, 'name', True, False, False)
+    ])
+
+@pytest.fixture
+def packed_state() -> Dict[str, CompactElements]:
+    return decode_packed_state(pack_state(INTERACTIVE, INFORMATIVE, SCROLLABLE))
+
+def test_decode_packed_state_round_trips(packed_state):
+    assert packed_state['interactive_elements'].to_dicts() == INTERACTIVE
+    assert packed_state['informative_elements'].to_dicts() == INFORMATIVE
+    assert packed_state['scrollable_elements'].to_dicts() == SCROLLABLE
+
+def test_decode_packed_state_shares_one_string_table(packed_state):
+    strings = packed_state['interactive_elements'].strings
+    assert packed_state['informative_elements'].strings is strings
+    assert packed_state['scrollable_elements'].strings is strings
+    assert strings.values.count('Next page') == 1
+
+def test_decode_packed_state_rejects_other_versions():
+    payload = json.loads(pack_state([], [], []))
+    payload[0] = PACKED_FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        decode_packed_state(json.dumps(payload))
+
+def test_decoded_elements_format_like_the_dicts(packed_state):
+    dom = DOM(page = None)
+    assert packed_state['interactive_elements'].column('xpath') == [element['xpath'] for element in INTERACTIVE]
+    assert dom.format_elements_for_prompt(packed_state['interactive_elements']) == dom.format_elements_for_prompt(INTERACTIVE)
+    assert dom.format_elements_for_prompt(packed_state['informative_elements']) == dom.format_elements_for_prompt(INFORMATIVE)
+
+def test_views_serialize_through_json_default(state):
+    elements = state['interactive_elements']
+
+    with pytest.raises(TypeError):
+        json.dumps(elements[0])
+    assert json.loads(json.dumps({'first': elements[0], 'all': elements}, default = json_default)) == {'first': INTERACTIVE[0], 'all': INTERACTIVE}
+    with pytest.raises(TypeError):
+        json.dumps(object(), default = json_default)
@@ -0,0 +1,211 @@
+from src.browser import endpoints
+from src.browser.endpoints import BrowserNode, EndpointPool
+from typing import Callable, Dict, List
+import asyncio
+import pytest
+
+class Emitter:
+    def __init__(self) -> None:
+        self.handlers: Dict[str, List[Callable]] = {}
+
+    def on(self, event: str, handler: Callable) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event: str) -> None:
+        for handler in self.handlers.get(event, []):
+            handler(self)
+
+class FakeContext(Emitter):
+    def __init__(self, browser: 'FakeBrowser') -> None:
+        super().__init__()
+        self.browser = browser
+
+class FakeBrowser(Emitter):
+    def __init__(self, endpoint: str) -> None:
+        super().__init__()
+        self.endpoint = endpoint
+        self.connected = True
+        self.fail_contexts = False
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, **kwargs) -> FakeContext:
+        if self.fail_contexts:
+            raise RuntimeError('Target closed')
+        return FakeContext(self)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def disconnect(self) -> None:
+        self.connected = False
+        self.emit('disconnected')
+
+class FakeChromium:
+    """Connects to every endpoint except the ones listed in `down`, recording each attempt."""
+
+    def __init__(self) -> None:
+        self.down: Dict[str, int] = {}
+        self.attempts: List[tuple] = []
+
+    async def _connect(self, method: str, endpoint: str) -> FakeBrowser:
+        self.attempts.append((method, endpoint))
+        if self.down.get(endpoint, 0) > 0:
+            self.down[endpoint] -= 1
+            raise ConnectionRefusedError(f"connect ECONNREFUSED {endpoint}")
+        return FakeBrowser(endpoint)
+
+    async def connect(self, endpoint: str, timeout: int) -> FakeBrowser:
+        return await self._connect('connect', endpoint)
+
+    async def connect_over_cdp(self, endpoint: str, timeout: int) -> FakeBrowser:
+        return await self._connect('connect_over_cdp', endpoint)
+
+class FakePlaywright:
+    def __init__(self) -> None:
+        self.chromium = FakeChromium()
+
+A = 'ws://node-a:3000/'
+B = 'ws://node-b:3000/'
+
+HEALTH_CHECK_INTERVAL = 3600
+
+@pytest.fixture(autouse = True)
+def no_backoff(monkeypatch):
+    """Skips the reconnection backoff, the health check keeps its interval."""
+    sleep = asyncio.sleep
+
+    async def backoff(delay):
+        await sleep(delay if delay >= HEALTH_CHECK_INTERVAL else 0)
+    monkeypatch.setattr(endpoints.asyncio, 'sleep', backoff)
+
+def make_pool(endpoint_list = (A, B), down = None, **kwargs) -> EndpointPool:
+    playwright = FakePlaywright()
+    playwright.chromium.down = dict(down or {})
+    return EndpointPool(playwright, list(endpoint_list), health_check_interval = HEALTH_CHECK_INTERVAL, **kwargs)
+
+@pytest.mark.parametrize('endpoint, protocol', [
+    ('ws://localhost:3000/', 'playwright'),
+    ('wss://production-sfo.browserless.io?token=abc', 'playwright'),
+    ('http://localhost:9222', 'cdp'),
+    ('https://chrome.example.com', 'cdp'),
+    ('ws://localhost:9222/devtools/browser/4f1c', 'cdp')
+])
+def test_detect_protocol(endpoint, protocol):
+    assert BrowserNode.detect_protocol(endpoint) == protocol
+    assert BrowserNode(endpoint).protocol == protocol
+
+def test_connect_uses_the_protocol_of_each_node():
+    async def run():
+        pool = make_pool([A, 'http://localhost:9222'])
+        await pool.connect()
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(run())
+    assert sorted(pool.playwright.chromium.attempts) == [('connect', A), ('connect_over_cdp', 'http://localhost:9222')]
+    assert all(node.browser is None for node in pool.nodes)
+
+def test_new_contexts_go_to_the_least_loaded_node():
+    async def run():
+        pool = make_pool()
+        await pool.connect()
+        contexts = [await pool.new_context() for _ in range(4)]
+        loads = [node.active_contexts for node in pool.nodes]
+        contexts[0].emit('close')
+        contexts[2].emit('close')
+        contexts[0].emit('close')
+        after_close = [node.active_contexts for node in pool.nodes]
+        await pool.close()
+        return pool, contexts, loads, after_close
+
+    pool, contexts, loads, after_close = asyncio.run(run())
+    assert loads == [2, 2]
+    assert [context.browser.endpoint for context in contexts] == [A, B, A, B]
+    assert after_close == [0, 2]
+
+def test_new_context_skips_a_disconnected_node():
+    async def run():
+        pool = make_pool()
+        await pool.connect()
+        first = await pool.new_context()
+        pool.nodes[0].browser.disconnect()
+        alive = pool.is_context_alive(first)
+        contexts = [await pool.new_context() for _ in range(2)]
+        stats = pool.stats()
+        await pool.close()
+        return first, alive, contexts, stats
+
+    first, alive, contexts, stats = asyncio.run(run())
+    assert first.browser.endpoint == A
+    assert not alive
+    assert [context.browser.endpoint for context in contexts] == [B, B]
+    assert [(node['healthy'], node['active_contexts'], node['last_error']) for node in stats] == [(False, 0, 'disconnected'), (True, 2, None)]
+
+def test_new_context_falls_back_when_a_node_fails():
+    async def run():
+        pool = make_pool()
+        await pool.connect()
+        pool.nodes[0].browser.fail_contexts = True
+        context = await pool.new_context()
+        pool.nodes[1].browser.fail_contexts = True
+        with pytest.raises(ConnectionError, match = 'Target closed'):
+            await pool.new_context()
+        await pool.close()
+        return pool, context
+
+    pool, context = asyncio.run(run())
+    assert context.browser.endpoint == B
+    assert pool.nodes[0].last_error == 'Target closed'
+
+def test_connect_retries_with_backoff():
+    async def run():
+        pool = make_pool(down = {A: 2})
+        await pool.connect()
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool.playwright.chromium.attempts.count(('connect', A)) == 3
+    assert (pool.nodes[0].failures, pool.nodes[0].last_error) == (0, None)
+
+def test_connect_keeps_going_without_an_unreachable_node():
+    async def run():
+        pool = make_pool(down = {A: 5}, max_retries = 2)
+        await pool.connect()
+        context = await pool.new_context()
+        await pool.close()
+        return pool, context
+
+    pool, context = asyncio.run(run())
+    assert context.browser.endpoint == B
+    assert pool.nodes[0].failures == 2
+    assert 'ECONNREFUSED' in pool.nodes[0].last_error
+
+def test_connect_raises_when_no_node_is_reachable():
+    async def run():
+        pool = make_pool(down = {A: 5, B: 5}, max_retries = 2)
+        with pytest.raises(ConnectionError, match = 'Could not connect to any browser endpoint'):
+            await pool.connect()
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool._health_task is None
+
+def test_health_check_reconnects_disconnected_nodes():
+    async def run():
+        pool = make_pool()
+        await pool.connect()
+        await pool.new_context()
+        pool.nodes[0].browser.disconnect()
+        attempts = len(pool.playwright.chromium.attempts)
+        await pool.health_check()
+        context = await pool.new_context()
+        await pool.close()
+        return pool, attempts, context
+
+    pool, attempts, context = asyncio.run(run())
+    assert pool.playwright.chromium.attempts[attempts:] == [('connect', A)]
+    assert context.browser.endpoint == A
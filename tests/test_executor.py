@@ -0,0 +1,51 @@
+from src.agent.executor import AgentExecutor
+from src.tools.scraper import ScraperTool
+from types import SimpleNamespace
+
+class FakePage:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+def make_executor(**kwargs) -> AgentExecutor:
+    browser = SimpleNamespace(user_agent = 'Mozilla/5.0', page = None)
+    return AgentExecutor(model = None, browser = browser, **kwargs)
+
+def test_second_initialization_rebinds_the_same_tools():
+    executor = make_executor()
+    first_page, second_page = FakePage('first'), FakePage('second')
+    executor._finish_initialization(first_page)
+    tools = list(executor.tools)
+    system_prompt = executor._system_prompt
+    executor._tools_by_name['scraper'].last_seen_markdown = '# Products'
+
+    executor._finish_initialization(second_page)
+
+    assert len(executor.tools) == len(tools)
+    assert all(tool is previous for tool, previous in zip(executor.tools, tools))
+    assert executor._system_prompt is system_prompt
+    assert executor._page is second_page and executor._browser.page is second_page
+    assert executor.dom.page is second_page
+    assert all(tool.page is second_page for tool in executor.tools if tool.page is not None)
+    assert all(tool.dom is executor.dom for tool in executor.tools if tool.dom is not None)
+    assert executor._tools_by_name['scraper'].last_seen_markdown == ''
+
+def test_tools_are_rebuilt_when_the_tool_set_changes():
+    executor = make_executor()
+    executor._finish_initialization(FakePage('first'))
+    tools = list(executor.tools)
+    assert 'view_region' not in executor._tools_by_name
+
+    executor.page_state_mode = 'vision'
+    executor._finish_initialization(FakePage('second'))
+
+    assert 'view_region' in executor._tools_by_name
+    assert not any(tool is previous for tool, previous in zip(executor.tools, tools))
+    assert '- view_region: ' in executor._system_prompt
+
+def test_scraper_reset_clears_the_last_seen_markdown():
+    tool = ScraperTool(page = FakePage('first'), dom = None, model = None, scraper_response_json_format = None)
+    tool.last_seen_markdown = '# Products\n\n- Lamp'
+
+    tool.reset()
+
+    assert tool.last_seen_markdown == ''
@@ -0,0 +1,160 @@
+from src.fetch import HttpFetcher, extract_body, fetch_body_html, needs_javascript, visible_text_length
+from typing import Any, Dict, List
+import asyncio
+import httpx
+import pytest
+
+PARAGRAPH = '<p>' + 'Static pages carry their whole content in the HTML sent by the server. ' * 5 + '</p>'
+ARTICLE = f'<html><head><title>News</title><style>p {{ color: red }}</style></head><body><article><h1>Title</h1>{PARAGRAPH}</article></body></html>'
+SPA_SHELL = '<html><head><script src="/bundle.js"></script></head><body><div id="root"></div></body></html>'
+NOSCRIPT = f'<html><body><noscript>Please enable JavaScript to use this app.</noscript><div class="content">{PARAGRAPH}</div></body></html>'
+SERVER_RENDERED_SPA = f'<html><body><div id="__next"><main>{PARAGRAPH * 2}</main></div></body></html>'
+ANGULAR = f'<html><body><app-root ng-version="17.0.0"><p>{PARAGRAPH}</p></app-root></body></html>'
+LONG_ARTICLE = f'<html><body><noscript>Enable JavaScript for comments</noscript>{PARAGRAPH * 10}</body></html>'
+
+@pytest.mark.parametrize('html, expected', [
+    (ARTICLE, False),
+    (SPA_SHELL, True),
+    ('<html><body><p>Loading...</p></body></html>', True),
+    (NOSCRIPT, True),
+    (SERVER_RENDERED_SPA, False),
+    (ANGULAR, True),
+    # Plenty of text wins over the hints
+    (LONG_ARTICLE, False)
+], ids = ['article', 'spa_shell', 'near_empty', 'noscript', 'server_rendered_spa', 'angular_marker', 'long_article'])
+def test_needs_javascript(html, expected):
+    assert needs_javascript(html) is expected
+
+@pytest.mark.parametrize('html, expected', [
+    ('<p>Hello   <b>world</b></p>', len('Hello world')),
+    ('<script>var text = "not visible";</script><style>.a {}</style><p>Shown</p>', len('Shown')),
+    ('<svg><text>icon</text></svg><template><p>later</p></template>', 0),
+    ('', 0)
+])
+def test_visible_text_length(html, expected):
+    assert visible_text_length(html) == expected
+
+def test_extract_body():
+    assert extract_body('<html><head></head><BODY class="x"><p>In</p></BODY></html>') == '<p>In</p>'
+    assert extract_body('<p>No body</p>') == '<p>No body</p>'
+
+def serve(pages: Dict[str, Any], requests: List[httpx.Request]) -> HttpFetcher:
+    """A fetcher whose client answers from `pages`, path → (status, content type, body)."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        page = pages.get(request.url.path)
+        if page is None:
+            return httpx.Response(404, text = 'Not found')
+        if isinstance(page, str):
+            return httpx.Response(302, headers = {'Location': page})
+        status, content_type, body = page
+        headers = {'Content-Type': content_type} if content_type else {}
+        return httpx.Response(status, headers = headers, content = body.encode('utf-8'))
+
+    fetcher = HttpFetcher()
+    fetcher._client = httpx.AsyncClient(transport = httpx.MockTransport(handler), follow_redirects = True)
+    return fetcher
+
+PAGES = {
+    '/article': (200, 'text/html; charset=utf-8', ARTICLE),
+    '/app': (200, 'text/html', SPA_SHELL),
+    '/notes.txt': (200, 'text/plain', 'Plain text notes'),
+    '/empty.txt': (200, 'text/plain', '   '),
+    '/untyped': (200, None, ARTICLE),
+    '/data.json': (200, 'application/json', '{"a": 1}'),
+    '/report.pdf': (200, 'application/pdf', '%PDF-1.4'),
+    '/error': (500, 'text/html', ARTICLE),
+    '/moved': '/article'
+}
+
+@pytest.mark.parametrize('path, status, needs_js, has_html', [
+    ('/article', 200, False, True),
+    ('/app', 200, True, True),
+    ('/notes.txt', 200, False, True),
+    ('/empty.txt', 200, True, True),
+    ('/untyped', 200, False, True),
+    ('/data.json', 200, True, False),
+    ('/report.pdf', 200, True, False),
+    ('/error', 500, True, False),
+    ('/missing', 404, True, False)
+])
+def test_fetch_classifies_responses(path, status, needs_js, has_html):
+    fetcher = serve(PAGES, [])
+
+    result = asyncio.run(fetcher.fetch(f'https://site.test{path}'))
+
+    assert (result['status'], result['needs_js'], bool(result['html'])) == (status, needs_js, has_html)
+    assert (result['error'] is None) == has_html
+
+def test_fetch_follows_redirects_and_reports_the_final_url():
+    fetcher = serve(PAGES, [])
+
+    result = asyncio.run(fetcher.fetch('https://site.test/moved'))
+
+    assert result['url'] == 'https://site.test/article'
+    assert not result['needs_js']
+
+def test_fetch_leaves_large_responses_and_errors_to_the_browser():
+    fetcher = serve(PAGES, [])
+    fetcher.max_bytes = 100
+
+    large = asyncio.run(fetcher.fetch('https://site.test/article'))
+
+    def fail(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError('connection refused', request = request)
+    fetcher._client = httpx.AsyncClient(transport = httpx.MockTransport(fail))
+    failed = asyncio.run(fetcher.fetch('https://site.test/article'))
+
+    assert large['needs_js'] and large['error'].startswith('Unsuitable response (200')
+    assert (failed['status'], failed['needs_js'], failed['error']) == (0, True, 'connection refused')
+
+class FakePage:
+    def __init__(self, opened: List[str]) -> None:
+        self.opened = opened
+
+    async def goto(self, url: str, **kwargs) -> None:
+        self.opened.append(url)
+
+    async def wait_for_load_state(self, *args, **kwargs) -> None:
+        pass
+
+    def locator(self, selector: str) -> 'FakePage':
+        return self
+
+    async def inner_html(self) -> str:
+        return '<div id="root"><p>Rendered</p></div>'
+
+    async def close(self) -> None:
+        pass
+
+class FakeContext:
+    def __init__(self, cookies: List[Dict[str, str]]) -> None:
+        self._cookies = cookies
+        self.opened: List[str] = []
+
+    async def cookies(self, url: str) -> List[Dict[str, str]]:
+        return self._cookies
+
+    async def new_page(self) -> FakePage:
+        return FakePage(self.opened)
+
+def test_fetch_body_html_sends_the_browser_cookies_and_falls_back_to_the_browser():
+    requests: List[httpx.Request] = []
+    fetcher = serve(PAGES, requests)
+    context = FakeContext([{'name': 'session', 'value': 'abc', 'domain': 'site.test', 'path': '/'}])
+
+    body, tier = asyncio.run(fetch_body_html('https://site.test/article', context, fetcher))
+    rendered, rendered_tier = asyncio.run(fetch_body_html('https://site.test/app', context, fetcher))
+
+    assert tier == 'http' and body == extract_body(ARTICLE)
+    assert (rendered_tier, rendered) == ('browser', '<div id="root"><p>Rendered</p></div>')
+    assert context.opened == ['https://site.test/app']
+    assert [request.headers.get('cookie') for request in requests] == ['session=abc', 'session=abc']
+
+def test_fetch_body_html_without_fetcher_uses_the_browser():
+    context = FakeContext([])
+
+    _, tier = asyncio.run(fetch_body_html('https://site.test/article', context, None))
+
+    assert tier == 'browser'
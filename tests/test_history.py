@@ -0,0 +1,93 @@
+from src.agent.history import HistoryManager
+from src.dom.compact import INFORMATIVE_FIELDS, CompactElements
+from typing import Any, Dict
+
+def action(tool_name: str, ok: bool = True, items: int = 0, **tool_args: Any) -> Dict[str, Any]:
+    return {
+        'thought': f'{tool_name} step',
+        'tool_name': tool_name,
+        'tool_args': tool_args,
+        'tool_response': f'Successfully scraped {items} items.' if items else 'done',
+        'ok': ok,
+        'items': items
+    }
+
+def test_record_compacts_the_response_and_keeps_the_outcome():
+    history = HistoryManager(max_thought_chars = 10)
+
+    scraped = history.record('x' * 30, 'scraper', {'user_input': 'q'}, [{'a': 1}] * 3, ok = True, items = 3)
+    failed = history.record('click', 'click', {'xpath': '/a'}, {'error': 'not found'}, ok = False)
+
+    assert scraped['thought'] == 'x' * 10 + '... [20 more characters]'
+    assert scraped['tool_response'] == 'Successfully scraped 3 items.'
+    assert (scraped['ok'], scraped['items']) == (True, 3)
+    assert failed['tool_response'] == 'Error: not found'
+    assert (failed['ok'], failed['items']) == (False, 0)
+
+def test_compact_response_serializes_element_views():
+    elements = CompactElements.from_dicts([{'tag': 'p', 'role': None, 'content': 'Hi', 'center': None, 'xpath': '/p[1]'}], INFORMATIVE_FIELDS)
+
+    response = HistoryManager().compact_response({'element': elements[0], 'at': object})
+
+    assert response.startswith('{"element": {"tag": "p", "role": null, "content": "Hi", "center": null, "xpath": "/p[1]"}, "at": "<class')
+
+def test_fold_waits_for_a_full_batch():
+    history = HistoryManager(detailed_steps = 8, summary_every = 10)
+    actions = [action('click') for _ in range(17)]
+
+    kept, summary = history.fold(actions, None)
+
+    assert kept is actions
+    assert summary is None
+
+def test_fold_summarizes_and_drops_the_oldest_steps():
+    history = HistoryManager(detailed_steps = 8, summary_every = 10)
+    actions = (
+        [action('navigate', url = 'https://a.com'), action('scraper', items = 5), action('click', ok = False)]
+        + [action('click') for _ in range(15)]
+    )
+
+    kept, summary = history.fold(actions, None)
+
+    assert kept == actions[10:]
+    assert summary['steps'] == 10
+    assert summary['tools'] == {'navigate': 1, 'scraper': 1, 'click': 8}
+    assert summary['urls'] == ['https://a.com']
+    assert (summary['errors'], summary['scraped_items']) == (1, 5)
+    assert summary['milestones'] == ['Step 2: scraper -> Successfully scraped 5 items.']
+
+def test_fold_keeps_the_state_bounded_over_a_long_run():
+    history = HistoryManager(detailed_steps = 8, summary_every = 10, max_urls = 3, max_milestones = 2)
+    actions, summary = [], None
+    for step in range(100):
+        actions.append(action('navigate', url = f'https://site.com/{step}') if step % 2 else action('scraper', items = 1))
+        actions, summary = history.fold(actions, summary)
+        assert len(actions) < history.detailed_steps + history.summary_every
+
+    assert summary['steps'] + len(actions) == 100
+    assert summary['steps'] == 90
+    assert summary['tools'] == {'scraper': 45, 'navigate': 45}
+    assert summary['scraped_items'] == 45
+    assert summary['urls'] == ['https://site.com/85', 'https://site.com/87', 'https://site.com/89']
+    assert summary['milestones'] == ['Step 87: scraper -> Successfully scraped 1 items.', 'Step 89: scraper -> Successfully scraped 1 items.']
+
+def test_fold_moves_a_revisited_url_to_the_end():
+    history = HistoryManager(detailed_steps = 0, summary_every = 3)
+    actions = [action('navigate', url = url) for url in ('https://a.com', 'https://b.com', 'https://a.com')]
+
+    _, summary = history.fold(actions, None)
+
+    assert summary['urls'] == ['https://b.com', 'https://a.com']
+
+def test_render_numbers_the_steps_after_the_summary():
+    history = HistoryManager(detailed_steps = 2, summary_every = 2)
+    actions, summary = history.fold([action('navigate', url = 'https://a.com'), action('click'), action('scraper', items = 2), action('click')], None)
+
+    lines = history.render(actions, summary).split('\n')
+
+    assert lines[0] == 'Steps 1-2 (summarized): navigate x1, click x1.'
+    assert lines[1] == 'Visited URLs: https://a.com'
+    assert lines[2] == 'Items scraped in these steps: 0. Failed steps: 0.'
+    assert lines[3] == 'Step 3: Called tool: `scraper`'
+    assert lines[5] == 'LAST ACTION:'
+    assert history.describe_summary(None) == []
@@ -0,0 +1,69 @@
+from src.agent.planner import RulePlanner
+from typing import Any, Dict, List
+import pytest
+
+TOOLS = ['navigate', 'scraper', 'batch_scrape', 'click', 'finish']
+
+def state(query: str, actions: List[Dict[str, Any]] = None, scraped_data: List[Any] = None) -> Dict[str, Any]:
+    return {'input': query, 'previous_actions': actions or [], 'scraped_data': scraped_data or []}
+
+def scrape(ok: bool = True, items: int = 3, tool_name: str = 'scraper') -> Dict[str, Any]:
+    return {'thought': '', 'tool_name': tool_name, 'tool_args': {}, 'tool_response': '', 'ok': ok, 'items': items}
+
+def test_first_step_navigates_to_the_url_of_the_query():
+    planner = RulePlanner()
+
+    response = planner.plan(state('Scrape the product names from www.shop.com/items.'), TOOLS)
+
+    assert response['tool_name'] == 'navigate'
+    assert response['tool_args'] == {'url': 'https://www.shop.com/items'}
+    assert response['thought'].startswith('(rule-based) ')
+    assert planner.planned == 1
+
+def test_several_urls_are_scraped_in_one_batch():
+    query = 'Extract the titles of https://a.com/1 and https://b.com/2'
+
+    response = RulePlanner().plan(state(query), TOOLS)
+
+    assert response['tool_name'] == 'batch_scrape'
+    assert response['tool_args'] == {'urls': ['https://a.com/1', 'https://b.com/2'], 'user_input': query}
+
+def test_several_urls_are_navigated_one_by_one_without_batch_scrape():
+    response = RulePlanner().plan(state('Extract the titles of https://a.com and https://b.com'), ['navigate', 'scraper'])
+
+    assert response['tool_name'] == 'navigate'
+    assert response['tool_args'] == {'url': 'https://a.com'}
+
+@pytest.mark.parametrize('query', ['What is the weather today?', 'Scrape the cheapest laptops'])
+def test_queries_without_a_url_go_to_the_model(query):
+    assert RulePlanner().plan(state(query), TOOLS) is None
+
+def test_finishes_after_a_successful_scrape():
+    query = 'Scrape the product names from https://shop.com'
+    planner = RulePlanner()
+
+    response = planner.plan(state(query, [scrape()], [{'name': 'A'}]), TOOLS)
+
+    assert response['tool_name'] == 'finish'
+
+@pytest.mark.parametrize('action, scraped_data', [
+    (scrape(ok = False, items = 0), [{'name': 'A'}]),
+    (scrape(items = 0), [{'name': 'A'}]),
+    (scrape(), []),
+    (scrape(tool_name = 'click'), [{'name': 'A'}])
+])
+def test_does_not_finish_without_new_items(action, scraped_data):
+    query = 'Scrape the product names from https://shop.com'
+
+    assert RulePlanner().plan(state(query, [action], scraped_data), TOOLS) is None
+
+@pytest.mark.parametrize('query', [
+    'Scrape the first 3 pages of https://shop.com',
+    'Click on login at https://shop.com then extract the profile',
+    'Scrape https://shop.com and summarize the reviews'
+])
+def test_queries_asking_for_more_than_scraping_are_left_to_the_model(query):
+    planner = RulePlanner()
+
+    assert not planner.is_simple_scrape(query)
+    assert planner.plan(state(query, [scrape()], [{'name': 'A'}]), TOOLS) is None
@@ -0,0 +1,193 @@
+from src.browser.pool import ContextPool
+from typing import List, Optional
+import asyncio
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.connected = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+class FakePage:
+    def __init__(self) -> None:
+        self.url = None
+
+    async def goto(self, url: str) -> None:
+        self.url = url
+
+class FakeContext:
+    def __init__(self, browser: Optional[FakeBrowser]) -> None:
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self) -> FakePage:
+        return FakePage()
+
+    async def close(self) -> None:
+        self.closed = True
+
+class Factory:
+    """Creates fake contexts on one browser, waiting for `gate` before each one once it is set."""
+
+    def __init__(self) -> None:
+        self.browser = FakeBrowser()
+        self.gate: Optional[asyncio.Event] = None
+        self.created: List[FakeContext] = []
+
+    async def __call__(self) -> FakeContext:
+        if self.gate is not None:
+            await self.gate.wait()
+        context = FakeContext(self.browser)
+        self.created.append(context)
+        return context
+
+async def settle() -> None:
+    """Lets the background refills scheduled by the pool run to completion."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_fill_warms_contexts_on_a_blank_page():
+    async def run():
+        factory = Factory()
+        pool = ContextPool(factory, size = 2)
+        await pool.fill()
+        await pool.fill()
+        return factory, pool
+
+    factory, pool = asyncio.run(run())
+    assert len(factory.created) == 2
+    assert [entry.page.url for entry in pool._idle] == ['about:blank', 'about:blank']
+
+def test_acquire_leases_a_warm_context_and_refills():
+    async def run():
+        factory = Factory()
+        pool = ContextPool(factory, size = 2)
+        await pool.fill()
+        warm = [entry.context for entry in pool._idle]
+        context, page = await pool.acquire()
+        await settle()
+        return factory, pool, warm, context, page
+
+    factory, pool, warm, context, page = asyncio.run(run())
+    assert context in warm
+    assert page.url == 'about:blank'
+    assert len(pool._idle) == 2
+    assert len(factory.created) == 3
+    assert context not in [entry.context for entry in pool._idle]
+
+def test_release_closes_the_context_and_refills():
+    async def run():
+        factory = Factory()
+        pool = ContextPool(factory, size = 1)
+        await pool.fill()
+        first, _ = await pool.acquire()
+        await settle()
+        await pool.release(first)
+        second, _ = await pool.acquire()
+        await pool.release(second)
+        await settle()
+        return factory, pool, first, second
+
+    factory, pool, first, second = asyncio.run(run())
+    assert first.closed and second.closed
+    assert first is not second
+    assert pool._leased == {}
+    assert len(pool._idle) == 1
+    assert not pool._idle[0].context.closed
+
+def test_acquire_creates_a_context_when_the_pool_is_empty():
+    async def run():
+        factory = Factory()
+        pool = ContextPool(factory, size = 1)
+        context, _ = await pool.acquire()
+        await settle()
+        return factory, pool, context
+
+    factory, pool, context = asyncio.run(run())
+    assert context is factory.created[0]
+    assert len(pool._idle) == 1
+
+def test_acquire_skips_contexts_of_a_disconnected_browser():
+    async def run():
+        factory = Factory()
+        pool = ContextPool(factory, size = 2)
+        await pool.fill()
+        stale = [entry.context for entry in pool._idle]
+        factory.browser.connected = False
+        factory.browser = FakeBrowser()
+        context, _ = await pool.acquire()
+        return stale, context
+
+    stale, context = asyncio.run(run())
+    assert all(entry.closed for entry in stale)
+    assert context not in stale
+    assert context.browser.is_connected()
+
+def test_release_of_an_unknown_context_closes_it():
+    async def run():
+        pool = ContextPool(Factory(), size = 1)
+        context = FakeContext(None)
+        await pool.release(context)
+        return pool, context
+
+    pool, context = asyncio.run(run())
+    assert context.closed
+    assert pool._tasks == set()
+
+def test_failed_warm_ups_are_skipped(capsys):
+    calls = []
+
+    async def factory():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError('browser crashed')
+        return FakeContext(None)
+
+    async def run():
+        pool = ContextPool(factory, size = 2)
+        await pool.fill()
+        return pool
+
+    pool = asyncio.run(run())
+    assert len(pool._idle) == 1
+    assert 'Error warming browser context: browser crashed' in capsys.readouterr().out
+
+def test_close_cancels_a_pending_fill():
+    async def run():
+        factory = Factory()
+        factory.gate = asyncio.Event()
+        pool = ContextPool(factory, size = 2)
+        pool._schedule_fill()
+        await settle()
+        pending = set(pool._tasks)
+        warming = pool._warming
+        await pool.close()
+        return factory, pool, pending, warming
+
+    factory, pool, pending, warming = asyncio.run(run())
+    assert warming == 2
+    assert all(task.cancelled() for task in pending)
+    assert factory.created == []
+    assert (pool._idle, pool._leased, pool._tasks, pool._warming) == ([], {}, set(), 0)
+
+def test_contexts_warmed_after_close_are_disposed():
+    async def run():
+        factory = Factory()
+        pool = ContextPool(factory, size = 1)
+        leased, _ = await pool.acquire()
+        await settle()
+        factory.gate = asyncio.Event()
+        pool.size = 3
+        fill = asyncio.create_task(pool.fill())
+        await settle()
+        await pool.close()
+        factory.gate.set()
+        await fill
+        return factory, pool, leased
+
+    factory, pool, leased = asyncio.run(run())
+    assert len(factory.created) == 4
+    assert leased.closed
+    assert all(context.closed for context in factory.created)
+    assert pool._idle == []
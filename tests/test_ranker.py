@@ -0,0 +1,122 @@
+from src.dom.compact import INTERACTIVE_FIELDS, CompactElements
+from src.dom.ranker import ElementRanker
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+def element(name: str, tag: str = 'a', role: str = 'link', attributes: Optional[Dict[str, str]] = None, index: int = 0) -> Dict[str, Any]:
+    return {
+        'tag': tag, 'role': role, 'name': name, 'attributes': attributes or {},
+        'box': {'left': 0, 'top': index, 'width': 10, 'height': 10}, 'center': {'x': 5, 'y': index + 5},
+        'xpath': f'/html[1]/body[1]/a[{index + 1}]'
+    }
+
+def page(names: List[str]) -> List[Dict[str, Any]]:
+    return [element(name, index = index) for index, name in enumerate(names)]
+
+def test_bm25_ranks_matching_elements_first():
+    elements = page(['Home', 'Laptop deals', 'Cheap laptop laptop bags', 'About us', 'Contact'])
+
+    scores = ElementRanker().score(elements, 'find cheap laptop')
+
+    order = list(np.argsort(-scores, kind = 'stable'))
+    assert order[:2] == [2, 1]
+    assert scores[0] == scores[3] == scores[4] == 0
+
+def test_plan_terms_weigh_less_than_query_terms():
+    elements = page(['Price list', 'Reviews'])
+
+    scores = ElementRanker(plan_weight = 0.5).score(elements, 'price', plan = 'open the reviews')
+
+    assert scores[0] > scores[1] > 0
+
+def test_terms_match_word_prefixes_and_underscored_words():
+    elements = [
+        element('Buy', tag = 'button', role = 'button', attributes = {'id': 'add_to_cart'}),
+        element('Prices', index = 1),
+        element('Supercart', index = 2),
+        element('Other', index = 3)
+    ]
+
+    scores = ElementRanker().score(elements, 'cart price')
+
+    assert scores[0] > 0
+    assert scores[1] > 0
+    # A term only matches at the start of a word
+    assert scores[2] == 0
+    assert scores[3] == 0
+
+def test_rank_keeps_the_top_elements_in_page_order():
+    names = [f'Item {index}' for index in range(10)]
+    names[7] = 'Blue widget'
+    names[2] = 'Widget'
+    elements = page(names)
+
+    ranked = ElementRanker(top_n = 2).rank(elements, 'widget')
+
+    assert [item['name'] for item in ranked['elements']] == ['Widget', 'Blue widget']
+    assert ranked['dropped'] == 8
+    assert ranked['dropped_by_role'] == {'link': 8}
+
+def test_small_pages_are_left_untouched():
+    elements = page(['One', 'Two'])
+
+    ranked = ElementRanker(top_n = 5).rank(elements, 'anything')
+
+    assert ranked['elements'] is elements
+    assert ranked['dropped'] == 0
+    assert ElementRanker.describe_dropped(ranked) == ''
+
+def test_landmarks_are_kept_and_capped():
+    elements = page(['Shoes', 'Hats', 'Bags', 'Product catalog', 'Socks', 'Belts']) + [
+        element('Search', tag = 'input', role = 'searchbox', index = 6),
+        element('Next page', index = 7),
+        element('2', index = 8),
+        element('Load more', tag = 'button', role = 'button', index = 9)
+    ]
+    ranker = ElementRanker(top_n = 1, max_landmarks = 3)
+
+    landmarks = ranker.landmarks(elements)
+    ranked = ranker.rank(elements, 'open the catalog')
+
+    assert list(np.flatnonzero(landmarks)) == [6, 7, 8, 9]
+    # The first landmarks on the page are kept, then the best scored element
+    assert [item['name'] for item in ranked['elements']] == ['Product catalog', 'Search', 'Next page', '2']
+
+def test_compact_elements_stay_compact():
+    names = ['Home', 'Widget', 'About', 'Contact', 'Blue widget', 'Help']
+    elements = page(names)
+    compact = CompactElements.from_dicts(elements, INTERACTIVE_FIELDS)
+    ranker = ElementRanker(top_n = 2)
+
+    ranked = ranker.rank(compact, 'widget')
+
+    assert isinstance(ranked['elements'], CompactElements)
+    assert ranked['elements'].to_dicts() == [elements[1], elements[4]]
+    assert ranked['dropped_by_role'] == ranker.rank(elements, 'widget')['dropped_by_role']
+    assert list(ranker.score(compact, 'widget')) == list(ranker.score(elements, 'widget'))
+
+def test_describe_dropped_lists_the_roles_by_count():
+    elements = page(['Widget', 'Home', 'About']) + [
+        element('Go', tag = 'button', role = 'none', index = 3),
+        element('Stop', tag = 'button', role = 'none', index = 4),
+        element('Name', tag = 'img', role = '', index = 5)
+    ]
+
+    ranked = ElementRanker(top_n = 1).rank(elements, 'widget')
+
+    # Elements without a role are counted by tag, ties keep the page order
+    assert list(ranked['dropped_by_role'].items()) == [('link', 2), ('button', 2), ('img', 1)]
+    assert ElementRanker.describe_dropped(ranked) == (
+        '(5 less relevant elements are not listed: 2 link, 2 button, 1 img. Scroll or refine the plan to bring them up.)'
+    )
+
+def test_embedding_similarity_is_added_to_the_score():
+    elements = page(['Sofa', 'Lamp'])
+    vectors = {'Sofa link a ': [1.0, 0.0], 'Lamp link a ': [0.0, 1.0]}
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        return [vectors.get(text, [0.9, 0.1]) for text in texts]
+
+    scores = ElementRanker(embed = embed).score(elements, 'couch')
+
+    assert scores[0] > scores[1]
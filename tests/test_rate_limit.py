@@ -0,0 +1,123 @@
+from src.models import rate_limit
+from src.models.rate_limit import (
+    FREE_TIER_LIMITS,
+    RateLimiter,
+    TokenBucket,
+    configure_rate_limit,
+    estimate_tokens,
+    get_rate_limiter,
+    is_rate_limit_error,
+    retry_after
+)
+import asyncio
+import pytest
+
+class RateLimitError(Exception):
+    status_code = 429
+
+class ServerError(Exception):
+    status_code = 503
+
+@pytest.fixture(autouse = True)
+def overrides(monkeypatch):
+    monkeypatch.setattr(rate_limit, '_OVERRIDES', {})
+
+def flaky(failures):
+    """A call raising the given errors in turn, then answering 'ok'."""
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return 'ok'
+    return call, calls
+
+def test_no_cap_applies_by_default():
+    async def run():
+        return get_rate_limiter('gemini/gemini-2.5-flash')
+
+    limiter = asyncio.run(run())
+    assert (limiter.rpm, limiter.tpm) == (None, None)
+    assert limiter.concurrency.max_limit == 8
+
+def test_configured_limits_apply_to_new_and_existing_limiters():
+    async def run():
+        existing = get_rate_limiter('groq/llama-3.1-8b-instant')
+        configure_rate_limit('groq/llama-3.1-8b-instant', **FREE_TIER_LIMITS['groq/llama-3.1-8b-instant'])
+        configure_rate_limit('gemini/gemini-2.5-pro', rpm = 5, max_concurrency = 2)
+        return existing, get_rate_limiter('gemini/gemini-2.5-pro'), get_rate_limiter('groq/llama-3.1-8b-instant')
+
+    existing, created, shared = asyncio.run(run())
+    assert shared is existing
+    assert (existing.rpm, existing.tpm) == (30, 6000)
+    assert (created.rpm, created.tpm, created.concurrency.max_limit) == (5, None, 2)
+
+def test_limiters_are_kept_per_event_loop():
+    async def run():
+        return get_rate_limiter('groq/llama-3.3-70b-versatile')
+
+    assert asyncio.run(run()) is not asyncio.run(run())
+
+def test_throttled_calls_are_retried_with_backoff():
+    limiter = RateLimiter(rpm = 600, base_delay = 0.001, max_delay = 0.01)
+    call, calls = flaky([RateLimitError('429 Too Many Requests'), ServerError('overloaded')])
+
+    assert asyncio.run(limiter.run(call)) == 'ok'
+    assert len(calls) == 3
+    assert limiter.throttled == 1
+    # Halved once by the 429, then grown back a little by the success
+    assert limiter.concurrency.limit < limiter.concurrency.max_limit
+    assert limiter.concurrency.in_flight == 0
+
+def test_errors_other_than_throttling_are_raised_at_once():
+    limiter = RateLimiter(base_delay = 0.001)
+    call, calls = flaky([ValueError('bad request')])
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.run(call))
+    assert len(calls) == 1
+    assert limiter.concurrency.in_flight == 0
+
+def test_throttling_is_raised_once_retries_are_exhausted():
+    limiter = RateLimiter(max_retries = 2, base_delay = 0.001, max_delay = 0.01)
+    call, calls = flaky([RateLimitError('rate limit')] * 5)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(limiter.run(call))
+    assert len(calls) == 3
+    assert limiter.throttled == 2
+    assert limiter.concurrency.limit == limiter.concurrency.min_limit
+
+def test_token_bucket_waits_for_the_refill():
+    async def run():
+        # 6000 tokens per minute refill 100 tokens per second
+        bucket = TokenBucket(6000)
+        assert await bucket.acquire(6000) == 0
+        return await bucket.acquire(5)
+
+    assert asyncio.run(run()) == pytest.approx(0.05, abs = 0.02)
+
+def test_token_bucket_lets_oversized_requests_through_when_full():
+    async def run():
+        bucket = TokenBucket(100)
+        return await bucket.acquire(1000), bucket.tokens
+
+    waited, tokens = asyncio.run(run())
+    assert waited == 0
+    assert tokens == pytest.approx(0, abs = 0.1)
+
+def test_rate_limit_errors_and_retry_delays_are_recognized():
+    assert is_rate_limit_error(RateLimitError('slow down'))
+    assert is_rate_limit_error(Exception('RESOURCE_EXHAUSTED: quota'))
+    assert not is_rate_limit_error(ServerError('unavailable'))
+    assert retry_after(Exception('Please retry in 12.5s')) == 12.5
+    assert retry_after(Exception('"retryDelay": "1500ms"')) == 1.5
+    assert retry_after(Exception('failed')) is None
+
+def test_estimate_tokens_counts_images_at_a_fixed_cost():
+    text = [{'role': 'user', 'content': 'x' * 400}]
+    image = [{'role': 'user', 'content': [{'type': 'image_url', 'image_url': {'url': 'data:' + 'A' * 100000}}]}]
+
+    assert estimate_tokens(text) == 104
+    assert estimate_tokens(image) == rate_limit.IMAGE_PART_TOKENS + 4
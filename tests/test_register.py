@@ -0,0 +1,85 @@
+from src.tools.register import (
+    _load_tool_module,
+    format_annotation,
+    generate_tools_markdown,
+    get_tool_classes,
+    get_tool_modules
+)
+from src.tools.web_search import WebSearchTool
+from typing import Any, Dict, List, Literal, Optional, Union
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def args_of(markdown: str) -> List[str]:
+    """The name, type and default of every argument listed in the tools markdown."""
+    prefix = '    - Args: '
+    return [line[len(prefix):].split(' - ')[0] for line in markdown.split('\n') if line.startswith(prefix)]
+
+@pytest.mark.parametrize('annotation, expected', [
+    (int, 'int'),
+    (Optional[str], 'Optional[str]'),
+    (Optional[List[str]], 'Optional[List[str]]'),
+    (list[str] | None, 'Optional[list[str]]'),
+    (Optional[Union[int, str]], 'Optional[Union[int, str]]'),
+    (List[Dict[str, Any]], 'List[Dict[str, Any]]'),
+    (Literal['up', 'down'], "Literal['up', 'down']"),
+    (tuple[int, ...], 'tuple[int, ...]')
+])
+def test_format_annotation_keeps_the_inner_types(annotation, expected):
+    assert format_annotation(annotation) == expected
+
+def test_tools_markdown_shows_the_argument_types():
+    markdown = generate_tools_markdown([WebSearchTool])
+
+    assert markdown.startswith('- web_search: ')
+    assert args_of(markdown) == [
+        '`query` (Optional[str], default = None)',
+        '`queries` (Optional[List[str]], default = None)',
+        '`max_results` (int, default = 10)'
+    ]
+
+def test_research_markdown_shows_the_variants_type():
+    from src.tools.research import ResearchTool
+
+    assert '`variants` (Optional[List[str]], default = None)' in args_of(generate_tools_markdown([ResearchTool]))
+
+def test_view_region_markdown_shows_the_region_types():
+    from src.tools.view_region import ViewRegionTool
+
+    assert args_of(generate_tools_markdown([ViewRegionTool])) == [
+        '`element_id` (Optional[int], default = None)',
+        '`x` (Optional[float], default = None)',
+        '`y` (Optional[float], default = None)',
+        '`width` (Optional[float], default = None)',
+        '`height` (Optional[float], default = None)',
+        '`padding` (int, default = 40)'
+    ]
+
+def test_registry_does_not_import_ignored_tools():
+    # Run in a fresh interpreter, the tool modules imported by other tests stay in sys.modules
+    script = (
+        "import sys\n"
+        "from src.tools.register import get_tool_registry\n"
+        "registry = get_tool_registry(('get_html', 'scroll_and_scrape'))\n"
+        "print(sorted(name for name in sys.modules if name.startswith('src.tools.')))\n"
+        "print(sorted(registry))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], capture_output = True, text = True, cwd = ROOT, check = True)
+    modules, names = result.stdout.strip().split('\n')[-2:]
+
+    assert 'src.tools.get_html' not in modules and 'src.tools.scroll_and_scrape' not in modules
+    assert 'src.tools.scraper' in modules and 'src.tools.get_markdown' in modules
+    assert 'get_html' not in names and 'scroll_and_scrape' not in names and "'scraper'" in names
+
+def test_tool_modules_are_loaded_once_per_process():
+    tool_classes = get_tool_classes()
+    before = _load_tool_module.cache_info()
+
+    assert get_tool_classes() == tool_classes
+    after = _load_tool_module.cache_info()
+    assert after.misses == before.misses
+    assert after.hits == before.hits + len(get_tool_modules())
@@ -0,0 +1,111 @@
+from src.models import BaseModel
+from src.models.router import OUTPUT, PLANNER, SCRAPER, RoutedModel, is_json_response
+from types import SimpleNamespace
+from typing import Any, Dict, List
+import asyncio
+import pytest
+
+def completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices = [SimpleNamespace(message = SimpleNamespace(content = content))])
+
+class StubModel(BaseModel):
+    """Answers every call with the same content and records the calls."""
+
+    def __init__(self, model: str, content: str = '{"thought": "ok"}') -> None:
+        self.model = model
+        self.content = content
+        self.calls: List[Dict[str, Any]] = []
+        self.configured: Dict[str, Any] = {}
+
+    async def generate(self, messages, **kwargs) -> Any:
+        self.calls.append({'messages': messages, **kwargs})
+        return completion(self.content)
+
+    def configure(self, **kwargs) -> None:
+        self.configured.update(kwargs)
+
+MESSAGES = [{'role': 'user', 'content': 'Plan the next step'}]
+
+@pytest.fixture
+def models():
+    return StubModel('fast'), StubModel('strong')
+
+@pytest.mark.parametrize('call_site, target', [
+    (PLANNER, 'fast'),
+    (OUTPUT, 'fast'),
+    (SCRAPER, 'strong'),
+    (None, 'strong'),
+    ('unknown', 'strong')
+])
+def test_routes_by_call_site(models, call_site, target):
+    assert RoutedModel(*models).route(MESSAGES, call_site) == target
+
+def test_escalate_and_large_prompts_go_to_the_strong_model(models):
+    router = RoutedModel(*models, max_fast_prompt_tokens = 100)
+
+    assert router.route(MESSAGES, PLANNER, escalate = True) == 'strong'
+    assert router.route(MESSAGES, OUTPUT, escalate = True) == 'strong'
+    assert router.route([{'role': 'user', 'content': 'x' * 1000}], PLANNER) == 'strong'
+
+def test_strong_call_sites_can_be_configured(models):
+    router = RoutedModel(*models, strong_call_sites = {OUTPUT})
+
+    assert router.route(MESSAGES, OUTPUT) == 'strong'
+    assert router.route(MESSAGES, SCRAPER) == 'strong'
+    assert router.route(MESSAGES, PLANNER) == 'fast'
+
+def test_generate_calls_the_routed_model_and_counts_it(models):
+    fast, strong = models
+    router = RoutedModel(fast, strong)
+
+    async def run():
+        await router.generate(MESSAGES, call_site = PLANNER, temperature = 0)
+        await router.generate(MESSAGES, call_site = SCRAPER)
+        await router.generate(MESSAGES, call_site = PLANNER, escalate = True)
+
+    asyncio.run(run())
+
+    assert len(fast.calls) == 1 and len(strong.calls) == 2
+    # The routing hints are not passed on, the other parameters are
+    assert fast.calls[0] == {'messages': MESSAGES, 'temperature': 0}
+    assert router.stats() == {'fast': 1, 'strong': 2, 'escalated': 0}
+
+def test_invalid_json_from_the_fast_model_is_retried_on_the_strong_model():
+    fast, strong = StubModel('fast', content = 'Sure! I will click the button.'), StubModel('strong')
+    router = RoutedModel(fast, strong)
+
+    response = asyncio.run(router.generate(MESSAGES, call_site = PLANNER))
+
+    assert response.choices[0].message.content == '{"thought": "ok"}'
+    assert len(fast.calls) == len(strong.calls) == 1
+    assert router.stats() == {'fast': 0, 'strong': 1, 'escalated': 1}
+
+def test_invalid_json_is_kept_when_escalation_is_off():
+    fast, strong = StubModel('fast', content = 'Plain text report'), StubModel('strong')
+    router = RoutedModel(fast, strong, escalate_invalid_json = False)
+
+    response = asyncio.run(router.generate(MESSAGES, call_site = OUTPUT))
+
+    assert response.choices[0].message.content == 'Plain text report'
+    assert strong.calls == []
+    assert router.stats() == {'fast': 1, 'strong': 0, 'escalated': 0}
+
+@pytest.mark.parametrize('content, expected', [
+    ('{"tool_name": "finish"}', True),
+    ('```json\n{"tool_name": "finish"}\n```', True),
+    ('["not", "an", "object"]', False),
+    ('Not JSON', False),
+    ('', False)
+])
+def test_is_json_response(content, expected):
+    assert is_json_response(completion(content)) is expected
+    assert not is_json_response(SimpleNamespace(choices = []))
+
+def test_configure_and_model_name_cover_both_models(models):
+    fast, strong = models
+    router = RoutedModel(fast, strong)
+
+    router.configure(temperature = 0.2)
+
+    assert router.model == 'fast|strong'
+    assert fast.configured == strong.configured == {'temperature': 0.2}
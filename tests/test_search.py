@@ -0,0 +1,154 @@
+from src.cache import DiskCache
+from src.search import SearchBackend, SearchResult, WebSearch, normalize_url, reciprocal_rank_fusion
+from typing import Dict, List
+import asyncio
+import pytest
+
+class StubBackend(SearchBackend):
+    """
+    Answers from a fixed query → results table and counts the calls, queries missing from the table fail.
+    """
+
+    name = 'stub'
+
+    def __init__(self, answers: Dict[str, List[SearchResult]], latency: float = 0.0) -> None:
+        self.answers = answers
+        self.latency = latency
+        self.queries: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        self.queries.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if query not in self.answers:
+                raise RuntimeError(f'no answer for {query}')
+            return self.answers[query][:max_results]
+        finally:
+            self.in_flight -= 1
+
+def result(url: str, title: str = '') -> SearchResult:
+    return SearchResult(title = title or url, url = url, snippet = '')
+
+ANSWERS = {
+    'python': [result('https://python.org'), result('https://docs.python.org')],
+    'rust': [result('https://rust-lang.org')],
+    'nothing': []
+}
+
+@pytest.fixture
+def cache(tmp_path) -> DiskCache:
+    return DiskCache(str(tmp_path), ttl = 60)
+
+def test_search_hits_the_cache_on_repeated_queries(cache):
+    backend = StubBackend(ANSWERS)
+    search = WebSearch(backend = backend, cache = cache)
+
+    first = asyncio.run(search.search('python'))
+    second = asyncio.run(search.search('  Python '))
+
+    assert first == second == ANSWERS['python']
+    assert backend.queries == ['python']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_search_misses_on_another_query_or_result_count(cache):
+    backend = StubBackend(ANSWERS)
+    search = WebSearch(backend = backend, cache = cache)
+
+    asyncio.run(search.search('python'))
+    asyncio.run(search.search('python', max_results = 1))
+    asyncio.run(search.search('rust'))
+
+    assert backend.queries == ['python', 'python', 'rust']
+
+def test_search_without_cache_always_calls_the_backend():
+    backend = StubBackend(ANSWERS)
+    search = WebSearch(backend = backend, cache = False)
+
+    asyncio.run(search.search('python'))
+    asyncio.run(search.search('python'))
+
+    assert search.cache is None
+    assert backend.queries == ['python', 'python']
+
+def test_failed_and_empty_searches_are_not_cached(cache):
+    backend = StubBackend(ANSWERS)
+    search = WebSearch(backend = backend, cache = cache)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(search.search('unknown'))
+    assert asyncio.run(search.search('nothing')) == []
+
+    backend.answers = {**ANSWERS, 'unknown': [result('https://example.com')]}
+    assert asyncio.run(search.search('unknown')) == [result('https://example.com')]
+    asyncio.run(search.search('nothing'))
+
+    assert backend.queries == ['unknown', 'nothing', 'unknown', 'nothing']
+    assert cache.stats()['entries'] == 1
+
+def test_search_many_deduplicates_queries_and_reports_failures(cache):
+    backend = StubBackend(ANSWERS)
+    search = WebSearch(backend = backend, cache = cache)
+
+    results = asyncio.run(search.search_many(['python', 'rust', 'python', 'unknown']))
+
+    assert list(results) == ['python', 'rust', 'unknown']
+    assert sorted(backend.queries) == ['python', 'rust', 'unknown']
+    assert results['python'] == ANSWERS['python']
+    assert results['unknown'].startswith('Error: ')
+
+    # Only the failed query reaches the backend again
+    asyncio.run(search.search_many(['python', 'rust', 'unknown']))
+    assert sorted(backend.queries) == ['python', 'rust', 'unknown', 'unknown']
+
+def test_search_many_limits_concurrency():
+    queries = [f'query {index}' for index in range(6)]
+    backend = StubBackend({query: [] for query in queries}, latency = 0.01)
+    search = WebSearch(backend = backend, cache = False, max_concurrency = 2)
+
+    asyncio.run(search.search_many(queries))
+
+    assert len(backend.queries) == 6
+    assert backend.max_in_flight == 2
+
+@pytest.mark.parametrize('url, expected', [
+    ('http://www.Example.com/path/', 'https://example.com/path'),
+    ('https://example.com', 'https://example.com/'),
+    ('https://example.com/a#section', 'https://example.com/a'),
+    ('https://example.com/a?utm_source=x&b=2&a=1&gclid=y', 'https://example.com/a?a=1&b=2'),
+    ('https://example.com/a?ref=home&q=', 'https://example.com/a?q='),
+    ('ftp://example.com/file', 'ftp://example.com/file')
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+def test_reciprocal_rank_fusion_ranks_pages_found_by_several_queries_first():
+    fused = reciprocal_rank_fusion([
+        [result('https://a.com', 'A'), result('https://b.com', 'B')],
+        [result('https://c.com', 'C'), result('http://www.b.com/', 'B again')]
+    ], k = 60)
+
+    assert [item['url'] for item in fused] == ['https://b.com', 'https://a.com', 'https://c.com']
+    assert fused[0]['queries'] == 2
+    assert fused[0]['score'] == pytest.approx(1 / 62 + 1 / 62)
+    assert fused[1]['score'] == pytest.approx(1 / 61)
+
+def test_reciprocal_rank_fusion_keeps_the_best_ranked_occurrence():
+    fused = reciprocal_rank_fusion([
+        [result('https://x.com', 'X'), result('https://b.com/?utm_medium=mail', 'Low')],
+        [result('https://b.com', 'High')]
+    ])
+
+    merged = next(item for item in fused if normalize_url(item['url']) == 'https://b.com/')
+    assert (merged['title'], merged['url'], merged['queries']) == ('High', 'https://b.com', 2)
+
+def test_reciprocal_rank_fusion_counts_a_page_once_per_list_and_skips_missing_urls():
+    fused = reciprocal_rank_fusion([[result('https://a.com'), result('https://a.com/'), SearchResult(title = 'No url', url = '', snippet = '')]])
+
+    assert len(fused) == 1
+    assert fused[0]['queries'] == 1
+    assert fused[0]['score'] == pytest.approx(1 / 61)